@@ -20,6 +20,18 @@ divshare = 0.44
 # Remaining amount is held until death
 cgsplit = [0.034, 0.496]
 
+# Change in corporate tax liabilities for each year 2018-2027
+ctaxrev = {"2018": -94.38 * 10**9,
+           "2019": -95.83 * 10**9,
+           "2020": -79.939 * 10**9,
+           "2021": -56.961 * 10**9,
+           "2022": -31.9 * 10**9,
+           "2023": -7.383 * 10**9,
+           "2024": 9.777 * 10**9,
+           "2025": 14.129 * 10**9,
+           "2026": -9.033 * 10**9,
+           "2027": -57.566 * 10**9}
+
 # Choose distribution inputs and assumptions of burden split
 # Assumption for how nonprofit stakholders split a windfall
 nonprofit_split = {"services": 0.208, "compensation": 0.78, "donors": 0, "foreign": 0.012}
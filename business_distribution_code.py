@@ -13,12 +13,74 @@ accordingly:
     State and local governments: slgDistribution()
     Nonprofit organizations: npDistribution()
     Households: hhEquityDistribution()
-Note: This requires that you have already compiled the following files:
+Note: This requires that you have already compiled the following file:
     distributional_code.py
-    equity_imputation_code.py
 """
 
-def npDistribution(calc1, ctaxch, split):
+def advanceEquity(equity2016, year):
+    """
+    This function takes the imputed equity amount for 2016 and advances it to
+    the requested year, using the CBO estimates of nominal corporate profits
+    as the growth factor. The CBO numbers go from 2015 thtrough 2027, and are
+    from the June 2017 report.
+    """
+    assert year in range(2015, 2028)
+    EQtotal = [2088.1, 2085.8, 2093.9, 2097.9, 2117.7, 2148.1, 2192.6, 2252.8,
+               2334.8, 2424.0, 2517.1, 2619.5, 2724.6]
+    equity = equity2016 * EQtotal[year - 2015] / EQtotal[1]
+    return equity
+
+def makeBurdenAllocator(calc1, equity=None, dshare=None, wtshare=None,
+                        mtr_ira=None):
+    """
+    This function computes once, for the baseline calc1 of a given year, the
+    unit-level allocation vectors and their weighted totals used by
+    npDistribution, slgDistribution and hhEquityDistribution, so that the
+    burden of any change in corporate tax liability (and any split) can be
+    allocated by scaling them, without repeating the aggregation work.
+    Inputs:
+        calc1: baseline calculator, for which calc_all must have been called
+        equity, dshare, wtshare: as used by hhEquityDistribution (for the
+            same year as calc1); the household allocation is not
+            available if equity is None
+        mtr_ira: average marginal tax rate on IRA distributions in calc1,
+            which is computed if it is None
+    Returns a dictionary of the allocation vectors and totals.
+    """
+    # The marginal tax rate calculation replaces the arrays of calc1, so it
+    # is done before any of them is stored
+    if equity is not None and mtr_ira is None:
+        mtr_ira = iraMTR(calc1)
+    wgt = calc1.array('s006')
+    allocator = {"wgt": wgt}
+    # Vectors used to allocate the nonprofit and state and local burdens
+    allocator["services"] = calc1.array('benefit_value_total')
+    allocator["comp"] = calc1.array('e00200')
+    allocator["giving"] = calc1.array('e19800') + calc1.array('e20100')
+    allocator["taxes"] = (calc1.array('e18400') + calc1.array('e18500') -
+                          calc1.array('e00700'))
+    for name in ["services", "comp", "giving", "taxes"]:
+        allocator[name + "_total"] = sum(allocator[name] * wgt)
+    if equity is None:
+        return allocator
+    # Vectors used to allocate the household burden
+    assert len(equity) == len(wgt)
+    assert len(dshare) == len(wgt)
+    assert len(wtshare) == len(wgt)
+    allocator["equity"] = equity
+    allocator["equity_total"] = sum(equity * wgt)
+    allocator["dshare"] = dshare
+    allocator["wtshare"] = wtshare
+    qdiv = calc1.array('e00650')
+    tdiv = calc1.array('e00600')
+    qdivshare = (sum(qdiv * calc1.array('s006')) /
+                 sum(tdiv * calc1.array('s006')))
+    allocator["divsplit"] = np.where(tdiv > 0, qdiv / (tdiv + 0.00001),
+                                     qdivshare)
+    allocator["mtr_ira"] = mtr_ira
+    return allocator
+
+def npDistribution(calc1, ctaxch, split, allocator=None):
     """
     This function produces an estimate of how much incomes change based on the
     change in corporate equity income to nonprofits.
@@ -34,6 +96,8 @@ def npDistribution(calc1, ctaxch, split):
             "donors": reduce compensation using distribution of 
                       e19800 + e20100
             "foreign": reduce provision of foreign aid
+        allocator: result of makeBurdenAllocator for calc1, which is
+            computed if it is None
     Returns a tuple of the changes  to be added to:
         mcare_ben: for nontaxable services
         e00200p: for compensation
@@ -43,22 +107,20 @@ def npDistribution(calc1, ctaxch, split):
             split['foreign'] == 1.0)
     assert (min(split['services'], split['compensation'], split['donors'],
                 split['foreign']) >= 0)
+    if allocator is None:
+        allocator = makeBurdenAllocator(calc1)
     # Calculate total change in each category, excluding foreign aid
     totch_services = -ctaxch * npshare * split['services']
     totch_comp = -ctaxch * npshare * split['compensation']
     totch_giving = -ctaxch * npshare * split['donors']
-    # Actual amounts in Tax-Calculator
-    services = calc1.array('benefit_value_total')
-    comp = calc1.array('e00200')
-    giving = calc1.array('e19800') + calc1.array('e20100')
-    wgt = calc1.array('s006')
     # Distribute to each type
-    services_ch = totch_services * services / sum(services * wgt)
-    comp_ch = totch_comp * comp / sum(comp * wgt)
-    giving_ch = totch_giving * giving / sum(giving * wgt)
+    services_ch = (totch_services * allocator["services"] /
+                   allocator["services_total"])
+    comp_ch = totch_comp * allocator["comp"] / allocator["comp_total"]
+    giving_ch = totch_giving * allocator["giving"] / allocator["giving_total"]
     return (services_ch, comp_ch, giving_ch)
 
-def slgDistribution(calc1, ctaxch, split):
+def slgDistribution(calc1, ctaxch, split, allocator=None):
     """
     This function produces an estimate of how much incomes change based on the
     change in corporate equity income to state and local governments.
@@ -71,6 +133,8 @@ def slgDistribution(calc1, ctaxch, split):
             "benefits": reduce spending proportional to government benefits
             "compensation": reduce compensation using distribution of e00200
             "taxes": raise taxes, using e18400 + e18500 - e00700
+        allocator: result of makeBurdenAllocator for calc1, which is
+            computed if it is None
     Returns a tuple of the changes  to be added to:
         mcaid_ben: for nontaxable services
         e00200p: for compensation
@@ -78,20 +142,19 @@ def slgDistribution(calc1, ctaxch, split):
     """
     assert split["benefits"] + split["compensation"] + split["taxes"] == 1.
     assert min(split["benefits"], split["compensation"], split["taxes"]) >= 0
+    if allocator is None:
+        allocator = makeBurdenAllocator(calc1)
     totch_benefits = -ctaxch * slgshare * split["benefits"]
     totch_comp = -ctaxch * slgshare * split["compensation"]
     totch_tax = -ctaxch * slgshare * split["taxes"]
-    benefits = calc1.array('benefit_value_total')
-    comp = calc1.array('e00200')
-    taxes = (calc1.array('e18400') + calc1.array('e18500') -
-             calc1.array('e00700'))
-    wgt = calc1.array('s006')
-    benefits_ch = totch_benefits * benefits / sum(benefits * wgt)
-    comp_ch = totch_comp * comp / sum(comp * wgt)
-    taxes_ch = totch_tax * taxes / sum(taxes * wgt)
+    benefits_ch = (totch_benefits * allocator["services"] /
+                   allocator["services_total"])
+    comp_ch = totch_comp * allocator["comp"] / allocator["comp_total"]
+    taxes_ch = totch_tax * allocator["taxes"] / allocator["taxes_total"]
     return (benefits_ch, comp_ch, taxes_ch)
 
-def hhEquityDistribution(calc1, equity, dshare, wtshare, ctaxch):
+def hhEquityDistribution(calc1, equity, dshare, wtshare, ctaxch,
+                         mtr_ira=None, allocator=None):
     """
     This function produces an estimate of how much incomes change base on the
     change in corporate equity income to households. This includes separate
@@ -103,6 +166,12 @@ def hhEquityDistribution(calc1, equity, dshare, wtshare, ctaxch):
         ctaxch: change in corporate tax liability ($)
             Note: ctaxch should be positive for a tax hike, 
                   and negative for a tax cut
+        mtr_ira: average marginal tax rate on IRA distributions (e01400)
+            in calc1, which is computed if it is None
+        allocator: result of makeBurdenAllocator for calc1, equity, dshare
+            and wtshare, which is computed if it is None; otherwise its
+            arrays (and its mtr_ira, if mtr_ira is not None) must be equal
+            to the arguments, which is asserted
     Note that the year should be the same for calc1, equity and ctaxch.
     Process:
         The corporate tax change is allocated proportional to equity.
@@ -122,24 +191,30 @@ def hhEquityDistribution(calc1, equity, dshare, wtshare, ctaxch):
                 Equity in accounts not taxed at withdrawal
                 Equity in accounts taxed at withdrawal, after withdrawal tax
     """
-    wgt = calc1.array('s006')
-    assert len(equity) == len(wgt)
-    assert len(dshare) == len(wgt)
-    assert len(wtshare) == len(wgt)
     assert divshare >= 0
     assert divshare <= 1
     assert len(cgsplit) == 2
     assert min(cgsplit) >= 0
     assert sum(cgsplit) <= 1
-    ctax_tot = -ctaxch * hhshare * equity / sum(equity * wgt)
+    if allocator is None:
+        allocator = makeBurdenAllocator(calc1, equity, dshare, wtshare,
+                                        mtr_ira)
+    else:
+        # The allocator must have been made for calc1 and the same household
+        # arrays (equal ones, if they were advanced again to the year)
+        assert "equity" in allocator
+        assert len(allocator["wgt"]) == len(calc1.array('s006'))
+        for name, array in [("equity", equity), ("dshare", dshare),
+                            ("wtshare", wtshare)]:
+            assert (allocator[name] is array or
+                    np.array_equal(allocator[name], array))
+        assert mtr_ira is None or mtr_ira == allocator["mtr_ira"]
+    ctax_tot = (-ctaxch * hhshare * allocator["equity"] /
+                allocator["equity_total"])
     # Direct tax burden
     ctax_direct = ctax_tot * dshare
     # Tax burden on dividend income
-    qdiv = calc1.array('e00650')
-    tdiv = calc1.array('e00600')
-    qdivshare = (sum(qdiv * calc1.array('s006')) /
-                 sum(tdiv * calc1.array('s006')))
-    divsplit = np.where(tdiv > 0, qdiv / (tdiv + 0.00001), qdivshare)
+    divsplit = allocator["divsplit"]
     ctax_qdiv = (ctax_direct * divshare * divsplit)
     ctax_nqdiv = (ctax_direct * divshare * (1 - divsplit))
     # Tax burden on capital gains
@@ -147,42 +222,92 @@ def hhEquityDistribution(calc1, equity, dshare, wtshare, ctaxch):
     ctax_ltcg = ctax_direct * (1 - divshare) * cgsplit[1]
     ctax_urcg = ctax_direct * (1 - divshare) * (1 - cgsplit[0] - cgsplit[1])
     # Indirect tax burden
-    mtr_ira = sum(calc1.mtr('e01400',calc_all_already_called=True)[2] *
-                  calc1.array('e01400') * wgt) / sum(calc1.array('e01400') * wgt)
+    mtr_ira = allocator["mtr_ira"]
     ctax_wt = ctax_tot * (1 - dshare) * wtshare * (1 - mtr_ira)
     ctax_wnt = ctax_tot * (1 - dshare) * (1 - wtshare)
     return (ctax_qdiv, ctax_qdiv + ctax_nqdiv,
             ctax_stcg, ctax_ltcg, ctax_wt + ctax_urcg + ctax_wnt)
 
+def iraMTR(calc1):
+    """
+    Returns the weighted average marginal tax rate on IRA distributions
+    (e01400) in calc1, for which calc_all must already have been called.
+    """
+    wgt = calc1.array('s006')
+    mtr_ira = sum(calc1.mtr('e01400',calc_all_already_called=True)[2] *
+                  calc1.array('e01400') * wgt) / sum(calc1.array('e01400') * wgt)
+    return mtr_ira
+
+def makeBaselineContext(calcA, year, rerankby, rescaleby, exclude, screen,
+                        calculated=False):
+    """
+    This function computes once everything about the baseline calcA for the
+    given year that is used by the business tax distribution functions, so
+    that the static, dynamic and component tables for the year can share it.
+    If calculated is True, calcA must already be in the year with calc_all
+    called (as for the calculators passed by Calculator.run_years), and it
+    is used as the baseline calculator instead of a copy.
+    Returns a dictionary with:
+        "year": the year
+        "calc": calcA or its copy advanced to the year, with results calculated
+        "mtr_ira": the average marginal tax rate on IRA distributions
+        "order": the measures used to order units (see distOrderBase)
+    The baseline calculator must not be changed by its users.
+    """
+    assert year in range(2018, 2028)
+    if calculated:
+        assert calcA.current_year == year
+        calc1 = calcA
+    else:
+        calc1 = copy.deepcopy(calcA)
+        calc1.advance_to_year(year)
+        calc1.calc_all()
+    baseline = {"year": year, "calc": calc1, "mtr_ira": iraMTR(calc1),
+                "order": distOrderBase(calc1, 'expanded', rerankby,
+                                       rescaleby, exclude, screen)}
+    return baseline
+
 def applyBtaxDistribution(calcA, calcB, year, equity, dshare, wtshare,
                           npsplit, slgsplit,
-                          rerankby, rescaleby, exclude, screen):
+                          rerankby, rescaleby, exclude, screen,
+                          baseline=None, allocator=None):
     """
     This function applies the distributional analysis using information in
     calcA and making changes to calcB. It only operates for the given year.
     The equity imputation must be for 2016. 
+    baseline is the result of makeBaselineContext for calcA, the year and
+    the same ranking arguments, which is computed here if it is None.
+    allocator is the result of makeBurdenAllocator for the baseline
+    calculator and the equity advanced to the year, dshare and wtshare,
+    which is computed here if it is None.
     Returns a DataFrame object with income groups, the percent change in
     after-tax income, and the dollar change in after-tax income.
     """
     # Advance inputs to the year requested
     assert year in range(2018, 2028)
-    calc1 = copy.deepcopy(calcA)
-    calc1.advance_to_year(year)
-    calc1.calc_all()
+    if baseline is None:
+        baseline = makeBaselineContext(calcA, year, rerankby, rescaleby,
+                                       exclude, screen)
+    assert baseline["year"] == year
+    calc1 = baseline["calc"]
     calc2 = copy.deepcopy(calcB)
     calc2.advance_to_year(year)
     calc2.calc_all()
     equity2 = advanceEquity(equity, year)
+    if allocator is None:
+        allocator = makeBurdenAllocator(calc1, equity2, dshare, wtshare,
+                                        baseline["mtr_ira"])
     ctaxchange = ctaxrev[str(year)]
     # Obtain changes for nonprofit response
     (ben_ch1, comp_ch1, giving_ch1) = npDistribution(calc1, ctaxchange,
-                                                     npsplit)
+                                                     npsplit, allocator)
     (ben_ch2, comp_ch2, taxes_ch2) = slgDistribution(calc1, ctaxchange,
-                                                     slgsplit)
+                                                     slgsplit, allocator)
     (qdiv_ch3, tdiv_ch3,
      stcg_ch3, ltcg_ch3,
      free_ch3) = hhEquityDistribution(calc1, equity2, dshare,
-                                      wtshare, ctaxchange)
+                                      wtshare, ctaxchange,
+                                      baseline["mtr_ira"], allocator)
     # Update incomes in calc2
     calc2.incarray('mcaid_ben', np.array(ben_ch1 + ben_ch2))
     calc2.incarray('e00200p', np.array(comp_ch1 + comp_ch2))
@@ -198,9 +323,11 @@ def applyBtaxDistribution(calcA, calcB, year, equity, dshare, wtshare,
     calc2.calc_all()
     # Produce the distributional comparison
     pchange = distTable_km(calc1, calc2, 'expanded', 'aftertax_income', "pch",
-                           rerankby, rescaleby, exclude, screen)
+                           rerankby, rescaleby, exclude, screen,
+                           baseline["order"])
     dchange = distTable_km(calc1, calc2, 'expanded', 'aftertax_income', "dch",
-                           rerankby, rescaleby, exclude, screen)
+                           rerankby, rescaleby, exclude, screen,
+                           baseline["order"])
     rowlabel = ['Bottom decile', 'Second decile', 'Third decile',
                 'Fourth decile', 'Fifth decile', 'Sixth decile',
                 'Seventh decile', 'Eighth decile', 'Ninth decile',
@@ -219,17 +346,21 @@ def fullDistComparison(calcA, calcB, year, equity, dshare, wtshare,
         Individual income tax cuts without corporate tax cuts
         Corporate tax cuts without individual income tax cuts
         Individual and corporate tax cuts
+    The baseline (calcA) and its burden allocation vectors are computed
+    only once for the three components.
     """
-    calc1 = copy.deepcopy(calcA)
+    baseline = makeBaselineContext(calcA, year, rerankby, rescaleby,
+                                   exclude, screen)
+    calc1 = baseline["calc"]
     calc2 = copy.deepcopy(calcB)
-    calc1.advance_to_year(year)
-    calc1.calc_all()
     calc2.advance_to_year(year)
     calc2.calc_all()
     pchange_iit = distTable_km(calc1, calc2, 'expanded', 'aftertax_income',
-                               'pch', rerankby, rescaleby, exclude, screen)
+                               'pch', rerankby, rescaleby, exclude, screen,
+                               baseline["order"])
     dchange_iit = distTable_km(calc1, calc2, 'expanded', 'aftertax_income',
-                               'dch', rerankby, rescaleby, exclude, screen)
+                               'dch', rerankby, rescaleby, exclude, screen,
+                               baseline["order"])
     rowlabel = ['Bottom decile', 'Second decile', 'Third decile',
                 'Fourth decile', 'Fifth decile', 'Sixth decile',
                 'Seventh decile', 'Eighth decile', 'Ninth decile',
@@ -237,12 +368,17 @@ def fullDistComparison(calcA, calcB, year, equity, dshare, wtshare,
     iit_table = pd.DataFrame({"Income groups": rowlabel,
                               "IIT, percent": pchange_iit,
                               "IIT, average": dchange_iit})
-    cit_table = applyBtaxDistribution(calcA, calcA, year, equity, dshare,
+    # calculators already advanced to the year are not advanced again
+    allocator = makeBurdenAllocator(calc1, advanceEquity(equity, year),
+                                    dshare, wtshare, baseline["mtr_ira"])
+    cit_table = applyBtaxDistribution(calcA, calc1, year, equity, dshare,
                                       wtshare, npsplit, slgsplit, rerankby,
-                                      rescaleby, exclude, screen)
-    all_table = applyBtaxDistribution(calcA, calcB, year, equity, dshare,
+                                      rescaleby, exclude, screen, baseline,
+                                      allocator)
+    all_table = applyBtaxDistribution(calcA, calc2, year, equity, dshare,
                                       wtshare, npsplit, slgsplit, rerankby,
-                                      rescaleby, exclude, screen)
+                                      rescaleby, exclude, screen, baseline,
+                                      allocator)
     iit_table["CIT, percent"] = cit_table["Percent"]
     iit_table["CIT, average"] = cit_table["Average ($)"]
     iit_table["Both, percent"] = all_table["Percent"]
@@ -250,6 +386,171 @@ def fullDistComparison(calcA, calcB, year, equity, dshare, wtshare,
     return iit_table
 
 
+def makeAssumptionGrid(alternatives):
+    """
+    This function returns a list of assumption sets, one for every
+    combination of the alternative values of the burden assumptions.
+    Inputs:
+        alternatives: dictionary mapping the name of each assumption to
+            vary to the list of its alternative values. Acceptable names:
+                "hhshare", "npshare", "slgshare", "divshare", "cgsplit",
+                "nonprofit_split", "slgov_split"
+    Assumptions not in alternatives keep their values from assumptions.py.
+    Each assumption set is a dictionary mapping every name to its value.
+    """
+    defaults = {"hhshare": hhshare, "npshare": npshare,
+                "slgshare": slgshare, "divshare": divshare,
+                "cgsplit": cgsplit, "nonprofit_split": nonprofit_split,
+                "slgov_split": slgov_split}
+    assert set(alternatives) <= set(defaults)
+    names = sorted(alternatives)
+    grid = []
+    for values in itertools.product(*[alternatives[name]
+                                      for name in names]):
+        assumptions = dict(defaults)
+        assumptions.update(zip(names, values))
+        grid.append(assumptions)
+    return grid
+
+def burdenDeltaMatrix(allocator, ctaxch, grid):
+    """
+    This function produces, for every assumption set in grid, the changes
+    in incomes that applyBtaxDistribution adds to the reform calculator.
+    Inputs:
+        allocator: result of makeBurdenAllocator for the baseline
+            calculator, equity, dshare and wtshare
+        ctaxch: change in corporate tax liability
+        grid: list of assumption sets (see makeAssumptionGrid)
+    Returns a dictionary mapping the name of each income variable to change
+    to a matrix with the changes for each assumption set in its rows.
+    """
+    assert "equity" in allocator
+    npsplit = pd.DataFrame([a["nonprofit_split"] for a in grid])
+    slgsplit = pd.DataFrame([a["slgov_split"] for a in grid])
+    assert np.allclose(npsplit[["services", "compensation", "donors",
+                                "foreign"]].sum(axis=1), 1.)
+    assert np.allclose(slgsplit[["benefits", "compensation",
+                                 "taxes"]].sum(axis=1), 1.)
+    assert npsplit.min().min() >= 0 and slgsplit.min().min() >= 0
+    # Scalar assumptions as columns, with one row for each assumption set
+    def column(values):
+        return np.array(values, dtype=float).reshape(-1, 1)
+    npshare_s = column([a["npshare"] for a in grid])
+    slgshare_s = column([a["slgshare"] for a in grid])
+    hhshare_s = column([a["hhshare"] for a in grid])
+    divshare_s = column([a["divshare"] for a in grid])
+    cgsplit_s = np.array([a["cgsplit"] for a in grid], dtype=float)
+    assert ((divshare_s >= 0) & (divshare_s <= 1)).all()
+    assert cgsplit_s.shape == (len(grid), 2)
+    assert cgsplit_s.min() >= 0 and (cgsplit_s.sum(axis=1) <= 1).all()
+    stcg_s = cgsplit_s[:, :1]
+    ltcg_s = cgsplit_s[:, 1:]
+    # Shares of each total received by each unit
+    def unitShare(name):
+        return (allocator[name] / allocator[name + "_total"]).reshape(1, -1)
+    services = unitShare("services")
+    comp = unitShare("comp")
+    giving = unitShare("giving")
+    taxes = unitShare("taxes")
+    # Nonprofit and state and local government responses
+    services_ch = -ctaxch * (npshare_s * column(npsplit["services"]) +
+                             slgshare_s * column(slgsplit["benefits"]))
+    comp_ch = -ctaxch * (npshare_s * column(npsplit["compensation"]) +
+                         slgshare_s * column(slgsplit["compensation"]))
+    giving_ch = -ctaxch * npshare_s * column(npsplit["donors"])
+    taxes_ch = -ctaxch * slgshare_s * column(slgsplit["taxes"])
+    # Household response
+    ctax_tot = -ctaxch * hhshare_s * unitShare("equity")
+    dshare_u = allocator["dshare"].reshape(1, -1)
+    wtshare_u = allocator["wtshare"].reshape(1, -1)
+    ctax_direct = ctax_tot * dshare_u
+    ctax_qdiv = ctax_direct * divshare_s * allocator["divsplit"]
+    ctax_cg = ctax_direct * (1 - divshare_s)
+    ctax_free = (ctax_cg * (1 - stcg_s - ltcg_s) +
+                 ctax_tot * (1 - dshare_u) * (1 - wtshare_u +
+                                              wtshare_u *
+                                              (1 - allocator["mtr_ira"])))
+    comp_matrix = comp_ch * comp
+    deltas = {"mcaid_ben": services_ch * services,
+              "e00200p": comp_matrix,
+              "e00200": comp_matrix,
+              "e19800": giving_ch * giving,
+              "e18400": taxes_ch * taxes,
+              "e00650": ctax_qdiv,
+              "e00600": ctax_direct * divshare_s,
+              "p22250": ctax_cg * stcg_s,
+              "p23250": ctax_cg * ltcg_s,
+              "e00400": ctax_free}
+    return deltas
+
+def burdenSensitivity(calcA, calcB, year, equity, dshare, wtshare, grid,
+                      rerankby, rescaleby, exclude, screen, max_copies=4):
+    """
+    This function produces the distributional analysis of
+    applyBtaxDistribution for every assumption set in grid (see
+    makeAssumptionGrid). The baseline and the reform calculator are
+    computed only once, and the reform calculator is evaluated with the
+    income changes of the assumption sets by one calc_all call for each
+    chunk of at most max_copies sets, on a calculator that stacks one copy
+    of its records for each set in the chunk. The memory used grows with
+    max_copies (each copy holds all the records), not with the size of
+    the grid.
+    Returns a long-format DataFrame with one row for each assumption set
+    and income group, including the values of the assumptions.
+    """
+    assert max_copies >= 1
+    baseline = makeBaselineContext(calcA, year, rerankby, rescaleby,
+                                   exclude, screen)
+    calc1 = baseline["calc"]
+    allocator = makeBurdenAllocator(calc1, advanceEquity(equity, year),
+                                    dshare, wtshare, baseline["mtr_ira"])
+    calc2 = copy.deepcopy(calcB)
+    calc2.advance_to_year(year)
+    calc2.calc_all()
+    aftertax1 = calc1.array('aftertax_income')
+    aftertax2 = []
+    for start in range(0, len(grid), max_copies):
+        chunk = grid[start:start + max_copies]
+        deltas = burdenDeltaMatrix(allocator, ctaxrev[str(year)], chunk)
+        calcT = calc2.tile(len(chunk))
+        for var in deltas:
+            calcT.incarray(var, deltas[var].ravel())
+        calcT.calc_all()
+        # copies, so that the stacked records are freed with calcT
+        aftertax2.extend(aftertax.copy() for aftertax in
+                         calcT.scenario_arrays('aftertax_income'))
+        del calcT, deltas
+    rowlabel = ['Bottom decile', 'Second decile', 'Third decile',
+                'Fourth decile', 'Fifth decile', 'Sixth decile',
+                'Seventh decile', 'Eighth decile', 'Ninth decile',
+                'Next 5%', 'Next 4%', 'Top 1%', 'All units']
+    tables = []
+    for i in range(len(grid)):
+        measures = (aftertax1, aftertax2[i])
+        pchange = distTable_km(calc1, None, 'expanded', 'aftertax_income',
+                               "pch", rerankby, rescaleby, exclude, screen,
+                               baseline["order"], measures)
+        dchange = distTable_km(calc1, None, 'expanded', 'aftertax_income',
+                               "dch", rerankby, rescaleby, exclude, screen,
+                               baseline["order"], measures)
+        table1 = pd.DataFrame({"Assumption set": i,
+                               "Income group": rowlabel,
+                               "Percent": pchange,
+                               "Average ($)": dchange})
+        # Flatten the assumptions into one column for each value
+        for name in sorted(grid[i]):
+            value = grid[i][name]
+            if isinstance(value, dict):
+                for key in value:
+                    table1[name + "[" + key + "]"] = value[key]
+            elif isinstance(value, list):
+                for j in range(len(value)):
+                    table1[name + "[" + str(j) + "]"] = value[j]
+            else:
+                table1[name] = value
+        tables.append(table1)
+    return pd.concat(tables, ignore_index=True)
+
 def equityDistribution(eq, deqsh, calc1, rerankby, rescaleby,
                        exclude, screen):
     """
@@ -72,10 +72,32 @@ equitydist = equityDistribution(equity, dshare, calc_pre, RANKING, SCALING,
 equitydist.to_csv('business_dist_tables/equity_table.csv', index=False)
 
 # Generate the distributional tables for every year
-for year in YEARLIST:
-    dtab = fullDistComparison(calc_pre, calc_tcja, year,
-                              equity, dshare, wtshare,
-                              nonprofit_split, slgov_split,
-                              RANKING, SCALING, EXCLUDING, SCREENING)
-    dtab.to_csv('business_dist_tables/mainfullstatic' + str(year) + '.csv',
-                index=False)
+Calculator.run_years(lambda: (copy.deepcopy(calc_pre),
+                              copy.deepcopy(calc_tcja)),
+                     YEARLIST,
+                     functools.partial(year_workers.writeFullDistTable,
+                                       equity=equity, dshare=dshare,
+                                       wtshare=wtshare,
+                                       npsplit=nonprofit_split,
+                                       slgsplit=slgov_split,
+                                       rerankby=RANKING, rescaleby=SCALING,
+                                       exclude=EXCLUDING, screen=SCREENING),
+                     max_workers=YEAR_WORKERS)
+
+# Sensitivity of the distributional tables to the burden assumptions, which
+# calculates the reform again for every assumption set (see
+# BURDEN_SENSITIVITY in main_executor.py)
+if BURDEN_SENSITIVITY:
+    sensitivity_grid = makeAssumptionGrid({
+        "hhshare": [0.5, hhshare, 0.8],
+        "divshare": [0.3, divshare, 0.6],
+        "slgov_split": [slgov_split,
+                        {"benefits": 0.5, "compensation": 0.5, "taxes": 0.0}]})
+    for year in YEARLIST:
+        sens_table = burdenSensitivity(calc_pre, calc_tcja, year,
+                                       equity, dshare, wtshare,
+                                       sensitivity_grid,
+                                       RANKING, SCALING, EXCLUDING, SCREENING,
+                                       max_copies=SENSITIVITY_COPIES)
+        sens_table.to_csv('business_dist_tables/sensitivity' + str(year) +
+                          '.csv', index=False)
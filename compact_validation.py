@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+This file checks whether compact Records storage (float32 for the input
+variables marked as such in records_variables.json, small integer flags,
+shared zero columns) is accurate enough for our tables.
+For each year it builds the pre-TCJA and TCJA calculators with full float64
+storage and with compact storage, produces the Kallen-Mathur level and
+change tables with each, and reports the maximum absolute and relative
+deviation of every table column.
+It assumes that main_executor.py has defined puf_columns_path,
+policy_cache_path, param and make_calculator, and that
+`distributional_code.py` and `assumptions.py` have already been executed.
+"""
+from taxcalc.utils import table_deviation
+
+puf_template_compact = Records(puf_columns_path, compact=True)
+
+def make_compact_calculator(refdict = {}, year=2018):
+    """
+    Same as make_calculator, but using compact Records storage.
+    """
+    assert year in range(2014, 2028)
+    assert type(refdict) is dict
+    pol = Policy.cached(refdict, cache_dir=policy_cache_path)
+    beh = Behavior()
+    rec = Records.from_template(puf_template_compact)
+    calc1 = Calculator(pol, rec, beh)
+    calc1.advance_to_year(year)
+    calc1.calc_all()
+    return calc1
+
+def compactDeviation(years=YEARLIST):
+    """
+    Returns a DataFrame with the maximum absolute and relative deviation
+    of each column of the level and change tables for each year, when
+    computed using compact instead of full-precision Records storage.
+    """
+    results = []
+    for year in years:
+        calc1 = make_calculator(param['policy'], year)
+        calc2 = make_calculator({}, year)
+        calc1c = make_compact_calculator(param['policy'], year)
+        calc2c = make_compact_calculator({}, year)
+        for (name, tablefunc) in [('level', levelTable_km),
+                                  ('change', changeTable_km)]:
+            table_full = tablefunc(calc1, calc2, RANKING, SCALING,
+                                   EXCLUDING, SCREENING)
+            table_compact = tablefunc(calc1c, calc2c, RANKING, SCALING,
+                                      EXCLUDING, SCREENING)
+            dev = table_deviation(table_full, table_compact)
+            dev['year'] = year
+            dev['table'] = name
+            results.append(dev)
+    return pd.concat(results)
+
+compact_dev = compactDeviation()
+print('Maximum relative deviation from compact storage: ' +
+      str(compact_dev['max_rel_dev'].max()))
+compact_dev.to_csv('intermediate_results/compact_deviation.csv')
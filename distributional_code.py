@@ -282,7 +282,88 @@ def getRankScale(calc1, rerankby, rescaleby):
     scale = np.power(hhsize_scale, rescaleby['elast_size'])
     return (rank, scale)
 
-def getExclude(calc, exclude, income='expanded'):
+def makeMasks(calc, income='expanded'):
+    """
+    Returns a dictionary in which getExclude and getScreen store the
+    boolean mask of each exclude and screen element for calc and the income
+    measure, so that each mask is computed only once. The masks are only
+    valid for the current state of calc (a new dictionary is needed after
+    its year or its records change).
+    """
+    return {"calc": calc, "income": income, "masks": {}}
+
+def getMask(masks, key):
+    """
+    Returns the boolean mask of the exclude or screen element key (one of
+    the elements of getExclude, or "status:" or "child:" followed by one of
+    the elements of getScreen) from masks, computing it if needed.
+    """
+    if key in masks["masks"]:
+        return masks["masks"][key]
+    calc = masks["calc"]
+    if key in ["neginc", "zeroinc", "supertax", "bottom5", "under5k",
+               "under10k"]:
+        inc = np.asarray(getIncome(calc, masks["income"]))
+    if key == "neginc":
+        mask = inc < 0
+    elif key == "zeroinc":
+        mask = inc == 0
+    elif key == "supertax":
+        mask = calc.array('combined') > inc
+    elif key == "bottom5":
+        # Cumulative weight in the income distribution (ties are ordered by
+        # weight and then by position)
+        wgt = np.asarray(calc.array('s006'))
+        order = np.lexsort((np.arange(len(wgt)), wgt, inc))
+        cwgt = np.empty(len(wgt))
+        cwgt[order] = np.cumsum(wgt[order]) / sum(wgt[order])
+        mask = cwgt < 0.05
+    elif key == "under5k":
+        mask = inc < 5000
+    elif key == "under10k":
+        mask = inc < 10000
+    elif key == "dependents":
+        mask = calc.array('XTOT') == 0
+    elif key == "separate":
+        mask = calc.array('MARS') == 3
+    elif key.startswith("status:"):
+        status = key[len("status:"):]
+        mars = calc.array('MARS')
+        if status == "single":
+            mask = mars == 1
+        elif status == "head":
+            mask = mars == 4
+        elif status == "married":
+            mask = mars == 2
+        elif status == "married_sep":
+            mask = mars == 3
+        elif status == "not_joint":
+            mask = mars != 2
+        elif status == "not_sep":
+            mask = mars != 3
+        elif status == "not_married":
+            mask = (mars != 2) & (mars != 3)
+        else:
+            mask = np.ones(len(mars), dtype=bool)
+    elif key.startswith("child:"):
+        child = key[len("child:"):]
+        nu18 = calc.array('nu18')
+        if child == "0":
+            mask = nu18 == 0
+        elif child == "1":
+            mask = nu18 == 1
+        elif child == "2":
+            mask = nu18 == 2
+        elif child == "3+":
+            mask = nu18 >= 3
+        elif child == "nonzero":
+            mask = nu18 > 0
+        else:
+            mask = np.ones(len(nu18), dtype=bool)
+    masks["masks"][key] = np.asarray(mask, dtype=bool)
+    return masks["masks"][key]
+
+def getExclude(calc, exclude, income='expanded', masks=None):
     """
     Returns an array of units to drop from the analysis
     Note: this argument must be a list of strings
@@ -295,40 +376,21 @@ def getExclude(calc, exclude, income='expanded'):
         "under10k": income under $10,000
         "dependents": if filer is a dependent of others
         "separate": if filing married separate
+    masks is None or the result of makeMasks for calc and income, in which
+    the mask of each element is stored to be reused.
     """
     assert type(exclude) == list
-    inc = getIncome(calc, income)
-    tax = calc.array('combined')
-    # Figure out income distribution position
-    wgt = calc.array('s006')
-    inx = range(len(wgt))
-    (inc1, wgt1, inx1) = zip(*sorted(zip(inc, wgt, inx)))
-    cwgt1 = np.cumsum(wgt1) / sum(wgt1)
-    (inx2, cwgt) = zip(*sorted(zip(inx1, cwgt1)))
-    todrop = np.zeros(len(calc.array('s006')))
-    if exclude != []:
-        for ex in exclude:
-            assert ex in ["neginc", "zeroinc", "supertax", "bottom5",
-                          "under5k", "under10k", "dependents", "separate"]
-            if ex == "neginc":
-                todrop = np.where(inc < 0, 1, todrop)
-            if ex == "zeroinc":
-                todrop = np.where(inc == 0, 1, todrop)
-            if ex == "supertax":
-                todrop = np.where(tax > inc, 1, todrop)
-            if ex == "bottom5":
-                todrop = np.where(cwgt < 0.05, 1, todrop)
-            if ex == "under5k":
-                todrop = np.where(inc < 5000, 1, todrop)
-            if ex == "under10k":
-                todrop = np.where(inc < 10000, 1, todrop)
-            if ex == "dependents":
-                todrop = np.where(calc.array('XTOT') == 0, 1, todrop)
-            if ex == "separate":
-                todrop = np.where(calc.array('MARS') == 3, 1, todrop)
-    return todrop
+    if masks is None:
+        masks = makeMasks(calc, income)
+    assert masks["calc"] is calc and masks["income"] == income
+    todrop = np.zeros(len(calc.array('s006')), dtype=bool)
+    for ex in exclude:
+        assert ex in ["neginc", "zeroinc", "supertax", "bottom5",
+                      "under5k", "under10k", "dependents", "separate"]
+        todrop = todrop | getMask(masks, ex)
+    return todrop.astype(float)
 
-def getScreen(calc, screen):
+def getScreen(calc, screen, masks=None):
     """
     Returns an array to units to include in the final analysis
     Note: this argument must be a list of 2 strings
@@ -348,46 +410,80 @@ def getScreen(calc, screen):
         "2": 2 children under 18
         "3+": 3 or more children under 18
         "nonzero": at least one child under 18
+    masks is None or the result of makeMasks for calc, in which the mask of
+    each element is stored to be reused.
     """
     assert (type(screen) == list) and (len(screen) == 2)
     assert screen[0] in ["", "single", "head", "married", "married_sep",
                          "not_joint", "not_sep", "not_married"]
     assert screen[1] in ["", "0", "1", "2", "3+", "nonzero"]
-    if screen[0] == "single":
-        screen_status = np.where(calc.array('MARS') == 1, 1, 0)
-    elif screen[0] == "head":
-        screen_status = np.where(calc.array('MARS') == 4, 1, 0)
-    elif screen[0] == "married":
-        screen_status = np.where(calc.array('MARS') == 2, 1, 0)
-    elif screen[0] == "married_sep":
-        screen_status = np.where(calc.array('MARS') == 3, 1, 0)
-    elif screen[0] == "not_joint":
-        screen_status = np.where(calc.array('MARS') != 2, 1, 0)
-    elif screen[0] == "not_sep":
-        screen_status = np.where(calc.array('MARS') != 3, 1, 0)
-    elif screen[0] == "not_married":
-        notjoint = np.where(calc.array('MARS') != 2, 1, 0)
-        notseparated = np.where(calc.array('MARS') != 3, 1, 0)
-        screen_status = np.where(notjoint * notseparated, 1, 0)
-    else:
-        screen_status = np.ones(len(calc.array('MARS')))
-    if screen[1] == "0":
-        screen_child = np.where(calc.array('nu18') == 0, 1, 0)
-    elif screen[1] == "1":
-        screen_child = np.where(calc.array('nu18') == 1, 1, 0)
-    elif screen[1] == "2":
-        screen_child = np.where(calc.array('nu18') == 2, 1, 0)
-    elif screen[1] == "3+":
-        screen_child = np.where(calc.array('nu18') >= 3, 1, 0)
-    elif screen[1] == "nonzero":
-        screen_child = np.where(calc.array('nu18') > 0, 1, 0)
-    else:
-        screen_child = np.ones(len(calc.array('nu18')))
-    screen2 = screen_status * screen_child
-    return screen2
+    if masks is None:
+        masks = makeMasks(calc)
+    assert masks["calc"] is calc
+    screen2 = (getMask(masks, "status:" + screen[0]) &
+               getMask(masks, "child:" + screen[1]))
+    return screen2.astype(float)
         
+def distOrderBase(calc1, income, rerankby, rescaleby, exclude, screen,
+                  masks=None):
+    """
+    This function computes the measures used by distOrderPrep that depend
+    only on calc1 (the baseline), so that they can be computed once and
+    reused for every measure and every calc2 compared with the baseline.
+    masks is None or the result of makeMasks for calc1 and income, which
+    is passed to getExclude and getScreen.
+    Returns a dictionary with the income, weights, ranking and scaling
+    arrays, the units to drop and to include, and the arguments used.
+    """
+    if masks is None:
+        masks = makeMasks(calc1, income)
+    (rankA, scaleA) = getRankScale(calc1, rerankby, rescaleby)
+    base = {"inc": np.array(getIncome(calc1, income)),
+            "wgt": np.array(calc1.array('s006')),
+            "rank": rankA, "scale": scaleA,
+            "todrop": getExclude(calc1, exclude, income, masks),
+            "screen": getScreen(calc1, screen, masks),
+            "args": (income, rerankby, rescaleby, exclude, screen)}
+    return base
+
+def distOrderSort(calc1, calc2, income, measure, rerankby, rescaleby,
+                  exclude, screen, base=None, measures=None):
+    """
+    This function orders the units by income measure, including reranking,
+    and adjusts the unit weights for scaling measure, before any units are
+    removed. The arguments are the same as for distOrderPrep.
+    Returns a tuple of (order, inc, var1, var2, wgt, screen, todrop), where
+    order is the array of indices that orders the units.
+    """
+    if base is None:
+        base = distOrderBase(calc1, income, rerankby, rescaleby, exclude,
+                             screen)
+    assert base["args"] == (income, rerankby, rescaleby, exclude, screen)
+    ## Extract measures to use from calculators
+    wgtA = base["wgt"]
+    if measures is None:
+        measures = getMeasures(calc1, calc2, measure)
+    (var1A, var2A) = measures
+    rankA = base["rank"]
+    scaleA = base["scale"]
+    todropA = base["todrop"]
+    screenA = base["screen"]
+    ## Rescale incomes and order units by income (ties are ordered by the
+    ## other measures, in the same way as sorting the zipped measures)
+    inc_rescaled= base["inc"] / rankA
+    order = np.lexsort((todropA, screenA, scaleA, rankA, wgtA, var2A, var1A,
+                        inc_rescaled))
+    ## Store as arrays and apply weights
+    incC = inc_rescaled[order] * rankA[order]
+    wgtC = wgtA[order] * scaleA[order]
+    var1C = np.asarray(var1A)[order]
+    var2C = np.asarray(var2A)[order]
+    screenC = screenA[order]
+    todropC = todropA[order]
+    return (order, incC, var1C, var2C, wgtC, screenC, todropC)
+
 def distOrderPrep(calc1, calc2, income, measure, rerankby, rescaleby,
-                  exclude, screen):
+                  exclude, screen, base=None, measures=None):
     """
     This function prepares all of the relevant measures. It performs the
     following tasks:
@@ -396,27 +492,17 @@ def distOrderPrep(calc1, calc2, income, measure, rerankby, rescaleby,
         - Adjust the unit weights for scaling measure
         - Calculates the cumulative weight sum
         - Removes observations not include in the screen measure
+    base is the result of distOrderBase for calc1 and the same arguments,
+    which is computed here if it is None.
+    measures is the tuple (var1, var2) of the measure arrays for calc1 and
+    calc2, which is obtained using getMeasures if it is None (calc2 is not
+    used otherwise).
     Returns a tuple of (inc, var1, var2, wgt, cumwgt)
     """
-    ## Extract measures to use from calculators
-    wgtA = calc1.array('s006')
-    incA = getIncome(calc1, income)
-    (var1A, var2A) = getMeasures(calc1, calc2, measure)
-    (rankA, scaleA) = getRankScale(calc1, rerankby, rescaleby)
-    todropA = getExclude(calc1, exclude, income)
-    screenA = getScreen(calc1, screen)
-    ## Rescale incomes and order units by income
-    inc_rescaled= incA / rankA
-    ziplist = sorted(zip(inc_rescaled, var1A, var2A, wgtA, rankA, scaleA,
-                         screenA, todropA))
-    (incB, var1B, var2B, wgtB, rankB, scaleB, screenB, todropB) = zip(*ziplist)
-    ## Store as arrays and apply weights
-    incC = np.array(incB) * np.array(rankB)
-    wgtC = np.array(wgtB) * np.array(scaleB)
-    var1C = np.array(var1B)
-    var2C = np.array(var2B)
-    screenC = np.array(screenB)
-    todropC = np.array(todropB)
+    (order, incC, var1C, var2C,
+     wgtC, screenC, todropC) = distOrderSort(calc1, calc2, income, measure,
+                                             rerankby, rescaleby, exclude,
+                                             screen, base, measures)
     # Remove excluded units and calculate cumulative weight of others
     wgtD = np.where(todropC == 1, 0, wgtC)
     cumwgtD = np.cumsum(wgtD) / sum(wgtD)
@@ -482,7 +568,7 @@ def distTable_even(calc1, calc2, nbin, income, measure, chtype, rerankby,
     return outcome
 
 def distTable_uneven(calc1, calc2, income, measure, chtype, rerankby,
-                     rescaleby, exclude, screen):
+                     rescaleby, exclude, screen, base=None):
     """
     Returns a list of the uneven distributional analysis focusing on
     higher incomes. The entries in the list are, in order:
@@ -494,13 +580,16 @@ def distTable_uneven(calc1, calc2, income, measure, chtype, rerankby,
         - next 5% (q90 <= x < q95)
         - next 4% (q95 <= x < q99)
         - top 1% (q99 <= x)
+    base is None or the result of distOrderBase for calc1 and the same
+    arguments, computed once to be reused for several tables.
     """
     assert chtype in ["dch", "pch", "tch", "level1", "level2",
                       "total1", "total2"]
     # Pass inputs to be prepared for analysis
     (inc, var1, var2, wgt, cumwgt) = distOrderPrep(calc1, calc2, 
                                                    income, measure, rerankby,
-                                                   rescaleby, exclude, screen)
+                                                   rescaleby, exclude, screen,
+                                                   base)
     # Identify the bin for each observation
     groupid = np.zeros(len(inc))
     groupid = np.where(cumwgt >= 0.2, 1, groupid)
@@ -549,7 +638,7 @@ def distTable_uneven(calc1, calc2, income, measure, chtype, rerankby,
     return outcome
 
 def distTable_km(calc1, calc2, income, measure, chtype, rerankby,
-                 rescaleby, exclude, screen):
+                 rescaleby, exclude, screen, base=None, measures=None):
     """
     Returns a list of the uneven distributional analysis focusing on
     higher incomes. The entries in the list are, in order:
@@ -565,13 +654,15 @@ def distTable_km(calc1, calc2, income, measure, chtype, rerankby,
         - next 5% (q90 <= x < q95)
         - next 4% (q95 <= x < q99)
         - top 1% (q99 <= x)
+    base and measures are passed to distOrderPrep.
     """
     assert chtype in ["dch", "pch", "tch", "level1", "level2",
                       "total1", "total2"]
     # Pass inputs to be prepared for analysis
     (inc, var1, var2, wgt, cumwgt) = distOrderPrep(calc1, calc2, 
                                                    income, measure, rerankby,
-                                                   rescaleby, exclude, screen)
+                                                   rescaleby, exclude, screen,
+                                                   base, measures)
     # Identify the bin for each observation
     groupid = np.zeros(len(inc)) # bottom decile
     groupid = np.where(cumwgt >= 0.1, 1, groupid) # second decile
@@ -623,6 +714,322 @@ def distTable_km(calc1, calc2, income, measure, chtype, rerankby,
         outcome[12] = sum(var2 * wgt)
     return outcome
 
+def groupOutcome(wgt_sum, var1_sum, var2_sum, chtype):
+    """
+    Returns the outcome of type chtype (as in distTable_km) for groups with
+    the given sums of weights and of weighted var1 and var2.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if chtype == "pch":
+            outcome = var2_sum / var1_sum - 1
+        elif chtype == "dch":
+            outcome = (var2_sum - var1_sum) / wgt_sum
+        elif chtype == "tch":
+            outcome = var2_sum - var1_sum
+        elif chtype == "level1":
+            outcome = var1_sum / wgt_sum
+        elif chtype == "level2":
+            outcome = var2_sum / wgt_sum
+        elif chtype == "total1":
+            outcome = var1_sum
+        elif chtype == "total2":
+            outcome = var2_sum
+    return outcome
+
+def replicateOutcomes_km(var1, var2, wgt, screen, todrop, chtype):
+    """
+    Returns the distTable_km outcomes for each row of the replicate weights
+    wgt (a matrix with one row of weights for each replicate), for units
+    already ordered and weighted by distOrderSort (var1, var2, screen and
+    todrop are the ordered arrays). The groups are determined separately
+    for each replicate from its cumulative weights.
+    Returns a matrix with one row of 13 outcomes for each replicate.
+    """
+    numreps = wgt.shape[0]
+    # Cumulative weight of units not excluded, and group of each unit (12:
+    # excluded units, included only for all units; 13: screened out)
+    wgtD = np.where(todrop == 1, 0, wgt)
+    cumwgt = np.cumsum(wgtD, axis=1) / wgtD.sum(axis=1, keepdims=True)
+    bounds = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99]
+    groupid = np.searchsorted(bounds, cumwgt, side='right')
+    groupid = np.where(todrop == 1, 12, groupid)
+    groupid = np.where(screen == 1, groupid, 13)
+    cell = (np.arange(numreps).reshape(-1, 1) * 14 + groupid).ravel()
+    def cellSums(values):
+        sums = np.bincount(cell, values.ravel(), minlength=numreps * 14)
+        sums = sums.reshape(numreps, 14)
+        return np.column_stack((sums[:, :12], sums[:, :13].sum(axis=1)))
+    return groupOutcome(cellSums(wgt), cellSums(var1 * wgt),
+                        cellSums(var2 * wgt), chtype)
+
+def distTableReplicates_km(calc1, calc2, income, specs, rerankby, rescaleby,
+                           exclude, screen, numreps=100, seed=0,
+                           method="poisson", chunk_size=20, max_workers=None,
+                           base=None):
+    """
+    Returns replicates of distTable_km outcomes, computed using random
+    perturbations of the unit weights (rather than resampled units), so
+    that the units are ordered only once for each measure.
+        specs: dictionary mapping a label to a (measure, chtype) tuple
+        numreps: number of replicates
+        seed: seed of the random number generator
+        method: how the weights are perturbed
+            "poisson": each weight is multiplied by a Poisson(1) draw
+            "multinomial": each weight is multiplied by the number of times
+                           the unit is drawn in a resample of all units
+                           with replacement (the usual bootstrap)
+        chunk_size: number of replicates generated at a time; each chunk
+            uses its own random stream derived from seed, so the results
+            do not depend on max_workers
+        max_workers: if greater than one, the chunks are evaluated by a
+            pool of that many threads
+    base is the result of distOrderBase for calc1 and the same arguments,
+    which is computed here if it is None.
+    Returns a dictionary mapping each label in specs to a matrix with one
+    row of 13 outcomes for each replicate.
+    """
+    assert method in ["poisson", "multinomial"]
+    for (measure, chtype) in specs.values():
+        assert chtype in ["dch", "pch", "tch", "level1", "level2",
+                          "total1", "total2"]
+    if base is None:
+        base = distOrderBase(calc1, income, rerankby, rescaleby, exclude,
+                             screen)
+    # Order the units once for each measure
+    sorted_measures = {}
+    for (measure, chtype) in specs.values():
+        if measure not in sorted_measures:
+            sorted_measures[measure] = distOrderSort(calc1, calc2, income,
+                                                     measure, rerankby,
+                                                     rescaleby, exclude,
+                                                     screen, base)
+    nunits = len(base["wgt"])
+    numchunks = (numreps + chunk_size - 1) // chunk_size
+    streams = np.random.SeedSequence(seed).spawn(numchunks)
+    def evaluateChunk(k):
+        rng = np.random.default_rng(streams[k])
+        size = min(chunk_size, numreps - k * chunk_size)
+        if method == "poisson":
+            mult = rng.poisson(1.0, size=(size, nunits))
+        else:
+            mult = rng.multinomial(nunits, np.full(nunits, 1. / nunits),
+                                   size=size)
+        results = {}
+        for label in specs:
+            (order, inc, var1, var2,
+             wgt, screenC, todropC) = sorted_measures[specs[label][0]]
+            results[label] = replicateOutcomes_km(var1, var2,
+                                                  wgt * mult[:, order],
+                                                  screenC, todropC,
+                                                  specs[label][1])
+        return results
+    if max_workers is None or max_workers <= 1:
+        chunks = [evaluateChunk(k) for k in range(numchunks)]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+            chunks = list(pool.map(evaluateChunk, range(numchunks)))
+    return {label: np.concatenate([chunk[label] for chunk in chunks])
+            for label in specs}
+
+def distTableSE_km(calc1, calc2, income, specs, rerankby, rescaleby,
+                   exclude, screen, numreps=100, seed=0, method="poisson",
+                   alpha=0.025, chunk_size=20, max_workers=None):
+    """
+    Returns a DataFrame with the distTable_km outcomes for each label in
+    specs (a dictionary mapping a label to a (measure, chtype) tuple),
+    each followed by its replicate standard error and the bounds of its
+    100*(1-2*alpha)% percentile confidence interval. The replicates are
+    computed by distTableReplicates_km, which explains the other arguments.
+    """
+    base = distOrderBase(calc1, income, rerankby, rescaleby, exclude,
+                         screen)
+    reps = distTableReplicates_km(calc1, calc2, income, specs, rerankby,
+                                  rescaleby, exclude, screen, numreps, seed,
+                                  method, chunk_size, max_workers, base)
+    rowlabel = ['Bottom decile', 'Second decile', 'Third decile',
+                'Fourth decile', 'Fifth decile', 'Sixth decile',
+                'Seventh decile', 'Eighth decile', 'Ninth decile',
+                'Next 5%', 'Next 4%', 'Top 1%', 'All units']
+    table1 = pd.DataFrame({"Income group": rowlabel})
+    for label in specs:
+        (measure, chtype) = specs[label]
+        table1[label] = distTable_km(calc1, calc2, income, measure, chtype,
+                                     rerankby, rescaleby, exclude, screen,
+                                     base)
+        table1[label + " SE"] = np.nanstd(reps[label], axis=0, ddof=1)
+        table1[label + " CI low"] = np.nanquantile(reps[label], alpha,
+                                                   axis=0)
+        table1[label + " CI high"] = np.nanquantile(reps[label], 1 - alpha,
+                                                    axis=0)
+    return table1
+
+# Measures included in a distribution cube unless others are requested
+# (those using marginal tax rates are left out because they are costly)
+CUBE_MEASURES = ["filers", "expanded_income", "iitax", "payrolltax",
+                 "totaltax", "aftertax_income", "avgtaxrate",
+                 "avgnettaxrate", "fraczero", "fraccut", "frachike",
+                 "charity", "state_taxes", "benefits", "medicaid", "wages"]
+# Age bands of the head of the unit in the cube (with their cube index)
+CUBE_AGE_BANDS = {"": None, "under35": 0, "35to64": 1, "65plus": 2}
+
+def makeDistCube(calc1, calc2, income, rerankby, rescaleby, exclude,
+                 measures=CUBE_MEASURES, nquantiles=1000):
+    """
+    Builds the distribution cube for calc1 and calc2: the sums of the unit
+    weights and of the weighted measures (for calc1 and calc2) over a fine
+    grid of cells, by
+        - income quantile: nquantiles groups of equal cumulative weight,
+          plus one cell for the units at the top of the cumulative weight
+          and one for the excluded units
+        - filing status (MARS)
+        - number of children under 18 (0, 1, 2, 3+)
+        - age of the head of the unit (under 35, 35 to 64, 65 or more)
+    The units are ordered separately for each measure, exactly as in
+    distOrderPrep, so the tables produced from the cube (see cubeTable_km,
+    cubeTable_uneven and cubeTable_even) are the same as the tables
+    produced from the units, up to rounding.
+    Returns a dictionary with the cube sums for each measure, the
+    calculators and the arguments used.
+    """
+    base = distOrderBase(calc1, income, rerankby, rescaleby, exclude,
+                         ["", ""])
+    # Demographic cell of each unit
+    mars = np.clip(np.asarray(calc1.array('MARS')), 1, 5) - 1
+    kids = np.minimum(np.asarray(calc1.array('nu18')), 3)
+    age = np.searchsorted([35, 65], calc1.array('age_head'), side='right')
+    demog = (mars * 4 + kids) * 3 + age
+    edges = np.arange(1, nquantiles + 1) / nquantiles
+    ncells = (nquantiles + 2) * 60
+    cube = {"calc1": calc1, "calc2": calc2, "nquantiles": nquantiles,
+            "args": (income, rerankby, rescaleby, exclude), "sums": {}}
+    for measure in measures:
+        (order, inc, var1, var2,
+         wgt, screenC, todropC) = distOrderSort(calc1, calc2, income,
+                                                measure, rerankby, rescaleby,
+                                                exclude, ["", ""], base)
+        # Cumulative weight of units not excluded, as in distOrderPrep
+        wgtD = np.where(todropC == 1, 0, wgt)
+        cumwgt = np.cumsum(wgtD) / sum(wgtD)
+        qcell = np.searchsorted(edges, cumwgt, side='right')
+        qcell = np.where(todropC == 1, nquantiles + 1, qcell)
+        cell = qcell * 60 + demog[order]
+        cube["sums"][measure] = [
+            np.bincount(cell, values, minlength=ncells).reshape(
+                nquantiles + 2, 5, 4, 3)
+            for values in (wgt, var1 * wgt, var2 * wgt)]
+    return cube
+
+def cubeScreen(screen, ageband):
+    """
+    Returns a boolean array with the demographic cells of a cube (by filing
+    status, number of children and age band) to include, using the same
+    screen as getScreen and an age band in CUBE_AGE_BANDS.
+    """
+    assert (type(screen) == list) and (len(screen) == 2)
+    assert ageband in CUBE_AGE_BANDS
+    mars = np.arange(1, 6)
+    status = {"": np.ones(5, dtype=bool), "single": mars == 1,
+              "head": mars == 4, "married": mars == 2,
+              "married_sep": mars == 3, "not_joint": mars != 2,
+              "not_sep": mars != 3,
+              "not_married": (mars != 2) & (mars != 3)}
+    kids = np.arange(4)
+    child = {"": np.ones(4, dtype=bool), "0": kids == 0, "1": kids == 1,
+             "2": kids == 2, "3+": kids >= 3, "nonzero": kids > 0}
+    age = np.ones(3, dtype=bool)
+    if CUBE_AGE_BANDS[ageband] is not None:
+        age = np.arange(3) == CUBE_AGE_BANDS[ageband]
+    return (status[screen[0]].reshape(-1, 1, 1) &
+            child[screen[1]].reshape(1, -1, 1) & age.reshape(1, 1, -1))
+
+def cubeOutcome(cube, measure, chtype, screen, ageband, bounds,
+                top_included):
+    """
+    Returns the outcomes for the groups of units whose cumulative weight is
+    at least each of the bounds (and less than the next bound), followed by
+    the outcome for all units, using the cube sums. top_included indicates
+    whether the units at the top of the cumulative weight are included in
+    the last group (as in distTable_km) or not (as in distTable_even).
+    Returns None if a bound is not on the cube grid or the measure is not
+    in the cube.
+    """
+    assert chtype in ["dch", "pch", "tch", "level1", "level2",
+                      "total1", "total2"]
+    nquantiles = cube["nquantiles"]
+    if measure not in cube["sums"]:
+        return None
+    cells = [int(round(bound * nquantiles)) for bound in bounds]
+    for (cell, bound) in zip(cells, bounds):
+        if cell / nquantiles != bound:
+            return None
+    # Group of each quantile cell (excluded from all groups: ngroups)
+    ngroups = len(bounds) + 1
+    groupid = np.searchsorted(cells, np.arange(nquantiles), side='right')
+    groupid = np.append(groupid, [ngroups - 1 if top_included else ngroups,
+                                  ngroups])
+    include = cubeScreen(screen, ageband)
+    sums = []
+    for values in cube["sums"][measure]:
+        qsums = values[:, include].sum(axis=1)
+        gsums = np.bincount(groupid, qsums, minlength=ngroups + 1)
+        sums.append(np.append(gsums[:ngroups], qsums.sum()))
+    return groupOutcome(sums[0], sums[1], sums[2], chtype)
+
+def cubeTable_km(cube, measure, chtype, screen, ageband=""):
+    """
+    Returns the distTable_km outcomes for the cube calculators and
+    arguments using the cube, or using the units if the measure is not in
+    the cube or a group bound is not on the cube grid.
+    ageband restricts the units to an age band in CUBE_AGE_BANDS.
+    """
+    bounds = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99]
+    outcome = cubeOutcome(cube, measure, chtype, screen, ageband, bounds,
+                          True)
+    if outcome is None:
+        assert ageband == ""
+        (income, rerankby, rescaleby, exclude) = cube["args"]
+        outcome = distTable_km(cube["calc1"], cube["calc2"], income,
+                               measure, chtype, rerankby, rescaleby, exclude,
+                               screen)
+    return outcome
+
+def cubeTable_uneven(cube, measure, chtype, screen, ageband=""):
+    """
+    Returns the distTable_uneven outcomes for the cube calculators and
+    arguments using the cube, or using the units if the measure is not in
+    the cube or a group bound is not on the cube grid.
+    ageband restricts the units to an age band in CUBE_AGE_BANDS.
+    """
+    bounds = [0.2, 0.4, 0.6, 0.8, 0.9, 0.95, 0.99]
+    outcome = cubeOutcome(cube, measure, chtype, screen, ageband, bounds,
+                          True)
+    if outcome is None:
+        assert ageband == ""
+        (income, rerankby, rescaleby, exclude) = cube["args"]
+        outcome = distTable_uneven(cube["calc1"], cube["calc2"], income,
+                                   measure, chtype, rerankby, rescaleby,
+                                   exclude, screen)
+    return outcome
+
+def cubeTable_even(cube, nbin, measure, chtype, screen, ageband=""):
+    """
+    Returns the distTable_even outcomes for the cube calculators and
+    arguments using the cube, or using the units if the measure is not in
+    the cube or a group bound is not on the cube grid.
+    ageband restricts the units to an age band in CUBE_AGE_BANDS.
+    """
+    assert (type(nbin) == int) and (nbin > 0)
+    bounds = [i / nbin for i in range(1, nbin)]
+    outcome = cubeOutcome(cube, measure, chtype, screen, ageband, bounds,
+                          False)
+    if outcome is None:
+        assert ageband == ""
+        (income, rerankby, rescaleby, exclude) = cube["args"]
+        outcome = distTable_even(cube["calc1"], cube["calc2"], nbin, income,
+                                 measure, chtype, rerankby, rescaleby,
+                                 exclude, screen)
+    return outcome
+
 def kakwani(calc1, calc2, income, measure, rerankby, rescaleby, exclude):
     """
     Calculates the Kakwani index for the change from calc1 to calc2.
@@ -650,33 +1057,40 @@ def kakwani(calc1, calc2, income, measure, rerankby, rescaleby, exclude):
     kak = (tax_ineq - income_ineq) * np.sign(Totvar)
     return kak
 
-def levelTable_km(calc1, calc2, rerankby, rescaleby, exclude, screen):
+def levelTable_km(calc1, calc2, rerankby, rescaleby, exclude, screen,
+                  masks=None):
     """
     Builds the Kallen-Mathur distributional table for levels, pre and post.
     Measures:
         Average tax rates
         Share of income and payroll tax liability
         Share with no II tax liability
+    masks is None or the result of makeMasks for calc1, which is used for
+    the exclusions and the screen of all the measures.
     Returns a pandas DataFrame table
     """
+    base = distOrderBase(calc1, 'expanded', rerankby, rescaleby, exclude,
+                         screen, masks)
     totaltax_pre = distTable_km(calc1, calc2, 'expanded',
                                 'totaltax', 'total1', 
-                                rerankby, rescaleby, exclude, screen)
+                                rerankby, rescaleby, exclude, screen, base)
     totaltax_post = distTable_km(calc1, calc2, 'expanded',
                                  'totaltax', 'total2', 
-                                 rerankby, rescaleby, exclude, screen)
+                                 rerankby, rescaleby, exclude, screen, base)
     totalinc_pre = distTable_km(calc1, calc2, 'expanded',
                                 'expanded_income', 'total1',
-                                rerankby, rescaleby, exclude, screen)
+                                rerankby, rescaleby, exclude, screen, base)
     totalinc_post = distTable_km(calc1, calc2, 'expanded',
                                  'expanded_income', 'total2',
-                                 rerankby, rescaleby, exclude, screen)
+                                 rerankby, rescaleby, exclude, screen, base)
     fraczero_pre = distTable_km(calc1, calc2, 'expanded',
                                 'fraczero', 'level1',
-                                rerankby, rescaleby, exclude, screen) * 100
+                                rerankby, rescaleby, exclude, screen,
+                                base) * 100
     fraczero_post = distTable_km(calc1, calc2, 'expanded',
                                  'fraczero', 'level2',
-                                 rerankby, rescaleby, exclude, screen) * 100
+                                 rerankby, rescaleby, exclude, screen,
+                                base) * 100
     # Produce desired measures
     avgrate_pre = totaltax_pre / totalinc_pre * 100
     avgrate_post = totaltax_post / totalinc_post * 100
@@ -695,7 +1109,8 @@ def levelTable_km(calc1, calc2, rerankby, rescaleby, exclude, screen):
                            "No II tax liability, post (%)":fraczero_post})
     return table1
 
-def changeTable_km(calc1, calc2, rerankby, rescaleby, exclude, screen):
+def changeTable_km(calc1, calc2, rerankby, rescaleby, exclude, screen,
+                   masks=None):
     """
     Builds the Kallen-Mathur distributional table for changes.
     Measures:
@@ -704,31 +1119,35 @@ def changeTable_km(calc1, calc2, rerankby, rescaleby, exclude, screen):
         Share of the tax change
         Share receiving tax cut
         Share receiving tax hike
+    masks is None or the result of makeMasks for calc1, which is used for
+    the exclusions and the screen of all the measures.
     """
+    base = distOrderBase(calc1, 'expanded', rerankby, rescaleby, exclude,
+                         screen, masks)
     totaltax_pre = distTable_km(calc1, calc2, 'expanded',
                                 'totaltax', 'total1',
-                                rerankby, rescaleby, exclude, screen)
+                                rerankby, rescaleby, exclude, screen, base)
     totaltax_post = distTable_km(calc1, calc2, 'expanded',
                                  'totaltax', 'total2',
-                                 rerankby, rescaleby, exclude, screen)
+                                 rerankby, rescaleby, exclude, screen, base)
     totalinc_pre = distTable_km(calc1, calc2, 'expanded',
                                 'expanded_income', 'total1',
-                                rerankby, rescaleby, exclude, screen)
+                                rerankby, rescaleby, exclude, screen, base)
     totalinc_post = distTable_km(calc1, calc2, 'expanded',
                                  'expanded_income', 'total2',
-                                 rerankby, rescaleby, exclude, screen)
+                                 rerankby, rescaleby, exclude, screen, base)
     tax_ch = distTable_km(calc1, calc2, 'expanded',
                           'totaltax', 'dch',
-                          rerankby, rescaleby, exclude, screen)
+                          rerankby, rescaleby, exclude, screen, base)
     totalchange = distTable_km(calc1, calc2, 'expanded',
                                'totaltax', 'tch',
-                               rerankby, rescaleby, exclude, screen)
+                               rerankby, rescaleby, exclude, screen, base)
     taxhike = distTable_km(calc1, calc2, 'expanded',
                            'frachike', 'level2',
-                           rerankby, rescaleby, exclude, screen) * 100
+                           rerankby, rescaleby, exclude, screen, base) * 100
     taxcut = distTable_km(calc1, calc2, 'expanded',
                           'fraccut', 'level2',
-                          rerankby, rescaleby, exclude, screen) * 100
+                          rerankby, rescaleby, exclude, screen, base) * 100
     aftertax_pch = ((totalinc_post - totaltax_post) /
                     (totalinc_pre - totaltax_pre) - 1) * 100
     change_share = totalchange / totalchange[-1] * 100
@@ -744,7 +1163,7 @@ def changeTable_km(calc1, calc2, rerankby, rescaleby, exclude, screen):
                            "Share receiving tax hike (%)": taxhike})
     return table1
 
-def demogTable_km(calc1, calc2, exclude, screen):
+def demogTable_km(calc1, calc2, exclude, screen, cube=None, masks=None):
     """
     Builds the Kallen-Mathur distributional table for specific demographic 
     groups.
@@ -753,26 +1172,30 @@ def demogTable_km(calc1, calc2, exclude, screen):
         Average tax rate, post
         Dollar change in tax liability
         Percent change in after-tax income
+    cube is None or the distribution cube of calc1 and calc2 (see
+    makeDistCube) for the same ranking, scaling and exclusions, which is
+    used instead of the units.
+    masks is None or the result of makeMasks for calc1, which is used for
+    the exclusions and the screen of all the measures.
     """
     rankscale = {"w_adult": 1, "w_child": 1, "elast_size": 0}
-    totaltax_pre = distTable_km(calc1, calc2, 'expanded',
-                                'totaltax', 'total1',
-                                rankscale, rankscale, exclude, screen)
-    totaltax_post = distTable_km(calc1, calc2, 'expanded',
-                                 'totaltax', 'total2',
-                                 rankscale, rankscale, exclude, screen)
-    totalinc_pre = distTable_km(calc1, calc2, 'expanded', 
-                                'expanded_income', 'total1',
-                                rankscale, rankscale, exclude, screen)
-    totalinc_post = distTable_km(calc1, calc2, 'expanded',
-                                 'expanded_income', 'total2',
-                                 rankscale, rankscale, exclude, screen)
-    tax_ch = distTable_km(calc1, calc2, 'expanded',
-                          'totaltax', 'dch',
-                          rankscale, rankscale, exclude, screen)
-    nfilers = distTable_km(calc1, calc2, 'expanded',
-                           'filers', 'total1',
-                           rankscale, rankscale, exclude, screen)
+    if cube is None:
+        base = distOrderBase(calc1, 'expanded', rankscale, rankscale,
+                             exclude, screen, masks)
+        def table(measure, chtype):
+            return distTable_km(calc1, calc2, 'expanded', measure, chtype,
+                                rankscale, rankscale, exclude, screen, base)
+    else:
+        assert cube["calc1"] is calc1 and cube["calc2"] is calc2
+        assert cube["args"] == ('expanded', rankscale, rankscale, exclude)
+        def table(measure, chtype):
+            return cubeTable_km(cube, measure, chtype, screen)
+    totaltax_pre = table('totaltax', 'total1')
+    totaltax_post = table('totaltax', 'total2')
+    totalinc_pre = table('expanded_income', 'total1')
+    totalinc_post = table('expanded_income', 'total2')
+    tax_ch = table('totaltax', 'dch')
+    nfilers = table('filers', 'total1')
     rowlabel = ['Bottom decile', 'Second decile', 'Third decile',
                 'Fourth decile', 'Fifth decile', 'Sixth decile',
                 'Seventh decile', 'Eighth decile', 'Ninth decile',
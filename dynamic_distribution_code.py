@@ -8,59 +8,87 @@ distributional effects of the TCJA
 """
 # Update the growth factors for tax-calculator
 growthresults = pd.read_csv('intermediate_results/growdiffs.csv')
-growfact_base = pd.read_csv(path_to_growfactors + 'growfactors.csv')
-growfact_ref = copy.deepcopy(growfact_base)
 growdiffs = np.concatenate(([0,0,0,0], np.array(growthresults['gfactors'])))
-growfact_ref['ATXPY'] = growfact_base['ATXPY'] + growdiffs
-growfact_ref['ASCHF'] = growfact_base['ASCHF'] + growdiffs
-growfact_ref['ABOOK'] = growfact_base['ABOOK'] + growdiffs
-growfact_ref['AWAGE'] = growfact_base['AWAGE'] + growdiffs
-growfact_ref['ASCHCI'] = growfact_base['ASCHCI'] + growdiffs
-growfact_ref['ASCHEI'] = growfact_base['ASCHEI'] + growdiffs
-growfact_ref['AINTS'] = growfact_base['AINTS'] + growdiffs
-growfact_ref['ADIVS'] = growfact_base['ADIVS'] + growdiffs
-growfact_ref['ACGNS'] = growfact_base['ACGNS'] + growdiffs
-growfact_ref['AUCOMP'] = growfact_base['AUCOMP'] + growdiffs
-growfact_ref['AIPD'] = growfact_base['AIPD'] + growdiffs
-growfact_ref['ATXPY'] = growfact_base['ATXPY'] + growdiffs
-growfact_ref['ASCHCL'] = growfact_base['ASCHCL'] - growdiffs
-growfact_ref['ASCHEL'] = growfact_base['ASCHEL'] + growdiffs
-growfact_ref.to_csv(path_to_growfactors + 'growfactors2.csv', index=False)
 
-def make_calculator2(refdict, year, gfactorname):
+def makeGrowFactors(growdiffs):
+    """
+    Returns the baseline growth factors with the growth differences in
+    growdiffs (one for each year beginning with the first year of the growth
+    factors) added to the factors for the incomes affected by growth.
+    """
+    growfactor = GrowFactors()
+    growfactor.update_columns(['ATXPY', 'ASCHF', 'ABOOK', 'AWAGE', 'ASCHCI',
+                               'ASCHEI', 'AINTS', 'ADIVS', 'ACGNS', 'AUCOMP',
+                               'AIPD', 'ASCHEL'],
+                              growfactor.first_year, growdiffs)
+    growfactor.update_columns(['ASCHCL'], growfactor.first_year, -growdiffs)
+    return growfactor
+
+growfactors_ref = makeGrowFactors(growdiffs)
+
+def make_calculator2(refdict, year, growfactor):
     """
     Thus is a special version of the make_calculator function that allows for
-    alternative growth factors. It creates a calculator advanced to the given
-    year and calculates tax results.
+    alternative growth factors (a GrowFactors object). It creates a calculator
+    advanced to the given year and calculates tax results.
     Note: Passing an empty dictionary to refdict produces a current law 
     calculator.
     """
     assert year in range(2014, 2028)
     assert type(refdict) is dict
-    growfactor = GrowFactors(path_to_growfactors + gfactorname)
-    pol = Policy()
+    pol = Policy.cached(refdict, cache_dir=policy_cache_path)
     beh = Behavior()
-    rec = Records(puf_path, gfactors=growfactor)
-    if refdict != {}:
-        pol.implement_reform(refdict)
+    rec = Records.from_template(puf_template, gfactors=growfactor)
+    rec.seek_year(year, records_checkpoint_path)
     calc1 = Calculator(pol, rec, beh)
     calc1.advance_to_year(year)
     calc1.calc_all()
     return calc1
 
-calc_tcjaD = make_calculator2({}, 2018, 'growfactors2.csv')
+calc_tcjaD = make_calculator2({}, 2018, growfactors_ref)
 
 # Static and dynamic comparison for each given year
-for year in YEARLIST:
-    static_table1 = applyBtaxDistribution(calc_pre, calc_tcja, year,
-                                          equity, dshare, wtshare,
-                                          nonprofit_split, slgov_split,
-                                          RANKING, SCALING, EXCLUDING, SCREENING)
-    dynamic_table1 = applyBtaxDistribution(calc_pre, calc_tcjaD, year,
-                                           equity, dshare, wtshare,
-                                           nonprofit_split, slgov_split,
-                                           RANKING, SCALING, EXCLUDING, SCREENING)
-    combined_table1 = static_table1.merge(dynamic_table1, on="Income group")
-    combined_table1.to_csv('dynamic_tables/dynamicdist' + str(year) + '.csv')
+Calculator.run_years(lambda: (copy.deepcopy(calc_pre),
+                              copy.deepcopy(calc_tcja),
+                              copy.deepcopy(calc_tcjaD)),
+                     YEARLIST,
+                     functools.partial(year_workers.writeDynamicDistTable,
+                                       equity=equity, dshare=dshare,
+                                       wtshare=wtshare,
+                                       npsplit=nonprofit_split,
+                                       slgsplit=slgov_split,
+                                       rerankby=RANKING, rescaleby=SCALING,
+                                       exclude=EXCLUDING, screen=SCREENING),
+                     max_workers=YEAR_WORKERS)
 
 
+# Static and dynamic comparison for several growth scenarios
+def dynamicDistScenarios(growdiffs_list, labels, years=YEARLIST):
+    """
+    Returns a dictionary containing, for each year in years, the table
+    combining the static distributional analysis with the dynamic analysis
+    for each growth scenario, which is specified by its growth differences
+    in growdiffs_list (as used by makeGrowFactors) and its label in labels.
+    Each scenario's data are copied from the parsed PUF template and aged
+    to year_to_use using its own growth factors (reusing the checkpoints
+    written by earlier runs). The scenarios are aged one after the other in
+    this process, and then Calculator.run_years advances all the calculators
+    through the years together. All the scenarios are compared with the same
+    baseline calculator (calc_pre) for each year by
+    year_workers.scenarioDistTable, which is called for the different years
+    in parallel only if YEAR_WORKERS is set.
+    """
+    assert len(growdiffs_list) == len(labels)
+    # Ages each scenario in turn (sequentially, in this process)
+    def makeCalcs():
+        calcsD = [make_calculator2({}, year_to_use, makeGrowFactors(diffs))
+                  for diffs in growdiffs_list]
+        return [copy.deepcopy(calc_pre), copy.deepcopy(calc_tcja)] + calcsD
+    func = functools.partial(year_workers.scenarioDistTable, list(labels),
+                             equity=equity, dshare=dshare, wtshare=wtshare,
+                             npsplit=nonprofit_split, slgsplit=slgov_split,
+                             rerankby=RANKING, rescaleby=SCALING,
+                             exclude=EXCLUDING, screen=SCREENING)
+    tables = Calculator.run_years(makeCalcs, years, func,
+                                  max_workers=YEAR_WORKERS)
+    return dict(zip(years, tables))
@@ -336,16 +336,3 @@ def imputeOtherFA(calc1):
         else:
             oassets[i] = prob2 * np.exp(oaavg + 0.5 * oasd**2)
     return oassets
-    
-def advanceEquity(equity2016, year):
-    """
-    This function takes the imputed equity amount for 2016 and advances it to
-    the requested year, using the CBO estimates of nominal corporate profits
-    as the growth factor. The CBO numbers go from 2015 thtrough 2027, and are
-    from the June 2017 report.
-    """
-    assert year in range(2015, 2028)
-    EQtotal = [2088.1, 2085.8, 2093.9, 2097.9, 2117.7, 2148.1, 2192.6, 2252.8,
-               2334.8, 2424.0, 2517.1, 2619.5, 2724.6]
-    equity = equity2016 * EQtotal[year - 2015] / EQtotal[1]
-    return equity
@@ -17,20 +17,14 @@ on (screening). For instructions on which to choose, see the explanation in
 """
 Section 1: Main distributional analysis for each year
 """
-calc1 = copy.deepcopy(calc_pre)
-calc2 = copy.deepcopy(calc_tcja)
-
-for year in YEARLIST:
-    calc1.advance_to_year(year)
-    calc1.calc_all()
-    calc2.advance_to_year(year)
-    calc2.calc_all()
-    tableL = levelTable_km(calc1, calc2, RANKING, SCALING, EXCLUDING,
-                           SCREENING)
-    tableC = changeTable_km(calc1, calc2, RANKING, SCALING, EXCLUDING,
-                            SCREENING)
-    tableL.to_csv('indiv_dist_tables/tableL' + str(year) + '.csv', index=False)
-    tableC.to_csv('indiv_dist_tables/tableC' + str(year) + '.csv', index=False)
+# Age the data once and write the tables for each year (see YEAR_WORKERS)
+Calculator.run_years(lambda: (copy.deepcopy(calc_pre),
+                              copy.deepcopy(calc_tcja)),
+                     YEARLIST,
+                     functools.partial(year_workers.writeYearTables,
+                                       rerankby=RANKING, rescaleby=SCALING,
+                                       exclude=EXCLUDING, screen=SCREENING),
+                     max_workers=YEAR_WORKERS)
 
 
 # Labels for income groups
@@ -367,40 +361,51 @@ tableS4.to_csv('indiv_dist_tables/tableS_excluded.csv', index=False)
 """
 Section 6: Distributional analysis for specific demographic groups
 """
+# Aggregate the units once; the tables for each group use these sums
+demog_rankscale = {"w_adult": 1, "w_child": 1, "elast_size": 0}
+demog_cube = makeDistCube(calc_pre, calc_tcja, 'expanded', demog_rankscale,
+                          demog_rankscale, ["neginc"])
+
 # Married filing jointly
 excluding = ["neginc"]
 screening = ["married", ""]
-tableD_married = demogTable_km(calc_pre, calc_tcja, excluding, screening)
+tableD_married = demogTable_km(calc_pre, calc_tcja, excluding, screening,
+                               demog_cube)
 tableD_married.to_csv('indiv_dist_tables/tableD_married.csv', index=False)
 
 # Not married
 excluding = ["neginc"]
 screening = ["not_married", ""]
-tableD_married = demogTable_km(calc_pre, calc_tcja, excluding, screening)
+tableD_married = demogTable_km(calc_pre, calc_tcja, excluding, screening,
+                               demog_cube)
 tableD_married.to_csv('indiv_dist_tables/tableD_notmarried.csv', index=False)
 
 # No children in unit
 excluding = ["neginc"]
 screening = ["", "0"]
-tableD_nokids = demogTable_km(calc_pre, calc_tcja, excluding, screening)
+tableD_nokids = demogTable_km(calc_pre, calc_tcja, excluding, screening,
+                              demog_cube)
 tableD_nokids.to_csv('indiv_dist_tables/tableD_nokids.csv', index=False)
 
 # 1 child
 excluding = ["neginc"]
 screening = ["", "1"]
-tableD_1kid = demogTable_km(calc_pre, calc_tcja, excluding, screening)
+tableD_1kid = demogTable_km(calc_pre, calc_tcja, excluding, screening,
+                            demog_cube)
 tableD_1kid.to_csv('indiv_dist_tables/tableD_1kid.csv', index=False)
 
 # 2 children
 excluding = ["neginc"]
 screening = ["", "2"]
-tableD_2kids = demogTable_km(calc_pre, calc_tcja, excluding, screening)
+tableD_2kids = demogTable_km(calc_pre, calc_tcja, excluding, screening,
+                             demog_cube)
 tableD_2kids.to_csv('indiv_dist_tables/tableD_2kids.csv', index=False)
 
 # 3+ children
 excluding = ["neginc"]
 screening = ["", "3+"]
-tableD_3pluskids = demogTable_km(calc_pre, calc_tcja, excluding, screening)
+tableD_3pluskids = demogTable_km(calc_pre, calc_tcja, excluding, screening,
+                                 demog_cube)
 tableD_3pluskids.to_csv('indiv_dist_tables/tableD_3pluskids.csv', index=False)
 
 """
@@ -477,3 +482,32 @@ for y in year_options:
                            ["neginc", "supertax"]))
     kakwani_table[str(y)] = reslist
 kakwani_table.to_csv('indiv_dist_tables/kakwani.csv', index=False)
+
+"""
+Section 8: Progressivity panel for every year and equivalence scale
+"""
+progressivity_rankings = {
+    "Main": RANKING,
+    "None": {"w_adult": 1, "w_child": 1, "elast_size": 0},
+    "Size": {"w_adult": 1, "w_child": 1, "elast_size": 1},
+    "Oxford": {"w_adult": 0.7, "w_child": 0.5, "elast_size": 1},
+    "OECD": {"w_adult": 0.5, "w_child": 0.3, "elast_size": 1}}
+progressivity_table = progressivityPanel(calc_pre, calc_tcja,
+                                         range(2018, 2028), 'expanded',
+                                         ['iitax', 'payrolltax', 'totaltax'],
+                                         progressivity_rankings, SCALING,
+                                         EXCLUDING)
+progressivity_table.to_csv('indiv_dist_tables/progressivity.csv',
+                           index=False)
+
+"""
+Section 9: Sampling uncertainty of the main change estimates
+"""
+se_specs = {"Pct change in after-tax income": ('aftertax_income', 'pch'),
+            "Avg tax change": ('totaltax', 'dch'),
+            "Share with tax cut": ('fraccut', 'level2')}
+tableSE = distTableSE_km(calc_pre, calc_tcja, 'expanded', se_specs,
+                         RANKING, SCALING, EXCLUDING, SCREENING,
+                         numreps=500, seed=2018, max_workers=os.cpu_count())
+tableSE.to_csv('indiv_dist_tables/tableSE' + str(year_to_use) + '.csv',
+               index=False)
@@ -37,24 +37,23 @@ def calcLaborResponse(calc1, calc2, elast_sub):
                     wgt) / sum((wagep + wages) * wgt))
     return response
 
-def allLaborChanges(calcA, calcB, elast_sub):
+def allLaborChanges(calcA, calcB, elast_sub, max_workers=None):
     """
-    Calculates and saves the labor effect for every year.
+    Calculates and saves the labor effect for every year, using max_workers
+    worker processes if it is greater than one (see Calculator.run_years).
     """
     assert startyear in range(2015, 2027)
     assert elast_sub >= 0
-    calc1 = copy.deepcopy(calcA)
-    calc2 = copy.deepcopy(calcB)
-    labeffect = []
-    for year in range(2014, 2028):
-        if year < startyear:
-            labeffect.append(0)
-        else:
-            calc1.advance_to_year(year)
-            calc1.calc_all()
-            calc2.advance_to_year(year)
-            calc2.calc_all()
-            labeffect.append(calcLaborResponse(calc1, calc2, elast_sub))
+    # The years from startyear; worker processes import calcLaborResponse
+    # from year_workers.py, which executes this file
+    labeffect = Calculator.run_years(lambda: (copy.deepcopy(calcA),
+                                              copy.deepcopy(calcB)),
+                                     range(startyear, 2028),
+                                     functools.partial(
+                                         year_workers.calcLaborResponse,
+                                         elast_sub=elast_sub),
+                                     max_workers=max_workers)
+    labeffect = [0] * (startyear - 2014) + labeffect
     labresults = pd.DataFrame({"Year": range(2014, 2028),
                                "pch_labor": labeffect})
     labresults.to_csv("intermediate_results/laborresults.csv", index=False)
@@ -142,33 +141,28 @@ def calcTauE(calc):
     MTR = taxableshare * tau_taxableequity
     return MTR
     
-def allOwnerTaxes(calcA, calcB):
-    """
-    Calculates and saves the labor effect for every year.
-    """
-    mtr_nc_base = []
-    mtr_e_base = []
-    mtr_d_c_base = []
-    mtr_d_nc_base = []
-    mtr_nc_ref = []
-    mtr_e_ref = []
-    mtr_d_c_ref = []
-    mtr_d_nc_ref = []
-    calc1 = copy.deepcopy(calcA)
-    calc2 = copy.deepcopy(calcB)
-    for year in range(2014, 2028):
-        calc1.advance_to_year(year)
-        calc1.calc_all()
-        calc2.advance_to_year(year)
-        calc2.calc_all()
-        mtr_nc_base.append(calcTauNC(calc1))
-        mtr_nc_ref.append(calcTauNC(calc2))
-        mtr_e_base.append(calcTauE(calc1))
-        mtr_e_ref.append(calcTauE(calc2))
-        mtr_d_c_base.append(calcTauDc(calc1))
-        mtr_d_c_ref.append(calcTauDc(calc2))
-        mtr_d_nc_base.append(calcTauDnc(calc1))
-        mtr_d_nc_ref.append(calcTauDnc(calc2))
+def ownerTaxes(calc1, calc2):
+    """
+    Calculates the owner level tax rates for the current year of the
+    baseline and reform calculators.
+    """
+    return (calcTauNC(calc1), calcTauNC(calc2), calcTauE(calc1),
+            calcTauE(calc2), calcTauDc(calc1), calcTauDc(calc2),
+            calcTauDnc(calc1), calcTauDnc(calc2))
+
+def allOwnerTaxes(calcA, calcB, max_workers=None):
+    """
+    Calculates and saves the labor effect for every year, using max_workers
+    worker processes if it is greater than one (see Calculator.run_years).
+    """
+    yearresults = Calculator.run_years(lambda: (copy.deepcopy(calcA),
+                                                copy.deepcopy(calcB)),
+                                       range(2014, 2028),
+                                       year_workers.ownerTaxes,
+                                       max_workers=max_workers)
+    (mtr_nc_base, mtr_nc_ref, mtr_e_base, mtr_e_ref, mtr_d_c_base,
+     mtr_d_c_ref, mtr_d_nc_base, mtr_d_nc_ref) = (list(taus) for taus in
+                                                  zip(*yearresults))
     results = pd.DataFrame({"Year": range(2014, 2028),
                             "tau_nc_base": mtr_nc_base,
                             "tau_nc_ref": mtr_nc_ref,
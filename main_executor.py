@@ -13,16 +13,38 @@ os.chdir('C:/Users/cody_/Documents/GitHub/tax-distributor/')
 import numpy as np
 import pandas as pd
 import copy
+import concurrent.futures
+import functools
+import itertools
 from scipy.stats import norm
 
 # Import local version of taxcalc
 import taxcalc
 from taxcalc import *
+# Functions that Calculator.run_years calls for each year of the tables
+import year_workers
 
     
 puf_path = 'data_files/puf09112018.csv'
 path_to_growfactors = 'taxcalc/'
 scfresults_path = 'data_files/scf_results.csv'
+puf_columns_path = 'data_files/puf09112018_columns'
+# Reformed Policy objects are cached in memory and pickled in this directory
+policy_cache_path = 'data_files/policy_cache'
+# Records extrapolated to each year are saved in this directory
+records_checkpoint_path = 'data_files/records_checkpoints'
+
+# Number of worker processes used by Calculator.run_years to calculate the
+# years of each table in parallel; None calculates them one at a time in
+# this process. The code below the __name__ check is not run by the worker
+# processes, which import the functions they call from year_workers.py.
+YEAR_WORKERS = None
+
+# Whether business_tables_code.py writes the tables of the sensitivity of the
+# business tax distribution to the burden assumptions, for which the reform
+# is calculated with at most SENSITIVITY_COPIES copies of the PUF at a time
+BURDEN_SENSITIVITY = False
+SENSITIVITY_COPIES = 4
 
 # Code for creating calculators
 def make_calculator(refdict = {}, year=2018):
@@ -33,91 +55,89 @@ def make_calculator(refdict = {}, year=2018):
     """
     assert year in range(2014, 2028)
     assert type(refdict) is dict
-    pol = Policy()
+    pol = Policy.cached(refdict, cache_dir=policy_cache_path)
     beh = Behavior()
-    rec = Records(puf_path)
-    if refdict != {}:
-        pol.implement_reform(refdict)
+    rec = Records.from_template(puf_template)
+    rec.seek_year(year, records_checkpoint_path)
     calc1 = Calculator(pol, rec, beh)
     calc1.advance_to_year(year)
     calc1.calc_all()
     return calc1
 
-# Make the pre-TCJA and TCJA calculators
-year_to_use = 2018
-YEARLIST = [2019, 2023, 2027]
-param = Calculator.read_json_param_objects('taxcalc/reforms/2017_law.json', None)
-calc_pre = make_calculator(param['policy'], year_to_use)
-calc_tcja = make_calculator({}, year_to_use)
+if __name__ == '__main__':
+    # Convert the PUF to a columnar (one .npy file per variable) directory,
+    # which Records memory-maps instead of parsing and validating the CSV
+    # file; it is converted again whenever the CSV file has changed since
+    if not Records.columns_match_source(puf_path, puf_columns_path):
+        Records.write_columns(puf_path, puf_columns_path)
+    # Load the PUF data, weights and ratios once; calculators copy this
+    # template
+    puf_template = Records(puf_columns_path, share_zeros=True)
 
-# Change in corporate tax liabilities for each year 2018-2027
-ctaxrev = {"2018": -94.38 * 10**9,
-           "2019": -95.83 * 10**9,
-           "2020": -79.939 * 10**9,
-           "2021": -56.961 * 10**9,
-           "2022": -31.9 * 10**9,
-           "2023": -7.383 * 10**9,
-           "2024": 9.777 * 10**9,
-           "2025": 14.129 * 10**9,
-           "2026": -9.033 * 10**9,
-           "2027": -57.566 * 10**9}
+    # Make the pre-TCJA and TCJA calculators
+    year_to_use = 2018
+    YEARLIST = [2019, 2023, 2027]
+    param = Calculator.read_json_param_objects('taxcalc/reforms/2017_law.json', None)
+    calc_pre = make_calculator(param['policy'], year_to_use)
+    calc_tcja = make_calculator({}, year_to_use)
 
-# Define all the assumptions we will use
-exec(open('assumptions.py').read())
+    # Define all the assumptions we will use
+    exec(open('assumptions.py').read())
 
-# Execute the necessary code for distributional analysis (in general)
-exec(open('distributional_code.py').read())
+    # Execute the necessary code for distributional analysis (in general)
+    exec(open('distributional_code.py').read())
+    exec(open('progressivity_code.py').read())
 
-# Run the individual income tax distributional analysis
-exec(open('indiv_tables_code.py').read())
+    # Run the individual income tax distributional analysis
+    exec(open('indiv_tables_code.py').read())
 
-# Run the equity imputations
-exec(open('equity_imputation_code.py').read())
-(equity1, dshare1, wtshare1) = imputeAllEquityInfo(calc_pre)
-equity = np.array(equity1)
-dshare = np.array(dshare1)
-wtshare = np.array(wtshare1)
+    # Run the equity imputations
+    exec(open('equity_imputation_code.py').read())
+    (equity1, dshare1, wtshare1) = imputeAllEquityInfo(calc_pre)
+    equity = np.array(equity1)
+    dshare = np.array(dshare1)
+    wtshare = np.array(wtshare1)
 
 
 
-# Execute the necessary code for the business tax distribution
-exec(open('business_distribution_code.py').read())
+    # Execute the necessary code for the business tax distribution
+    exec(open('business_distribution_code.py').read())
 
-# Run the static corporate income tax distributional analysis
-exec(open('business_tables_code.py').read())
+    # Run the static corporate income tax distributional analysis
+    exec(open('business_tables_code.py').read())
 
-"""
-If desired, run using a simple growth model, based on a first-order
-log-linearized effect using marginal incentives only.
-Alternatively, run using robustness analysis for growth effects.
-"""
-ownGrowthModel = False
-
-if ownGrowthModel:
-    # Run the NOL distortion model
-    exec(open('nolmodel.py').read())
-    allTheta(1000)
-    # Execute code for and estimate individual tax incentives
-    exec(open('labor_model.py').read())
-    calc_pre2 = make_calculator(param['policy'], 2014)
-    calc_tcja2 = make_calculator({}, 2014)
-    allLaborChanges(calc_pre2, calc_tcja2, eti)
-    allOwnerTaxes(calc_pre2, calc_tcja2)
-    # Execute the investment model and estimate changes in investment
-    exec(open('investmentmodel.py').read())
-    allInvChanges(ELAST_INV_CORP, ELAST_INV_NONCORP, SELAST_INV_MNE)
-    # Execute the growth model
-    exec(open('growthmodel.py').read())
-else:
-    # Growth effect to consider (pct change in GDP level)
-    geffect = 0.015
-    # Construct alternative file for growth effect (permanent increase in 2018)
-    growdiffs1 = np.zeros(13)
-    growdiffs1[4] = geffect
-    # Save these alternative growth rate effects to file for dynamic work
-    growdiff_tab = pd.DataFrame({"Year": range(2015, 2028),
-                                 "gfactors": growdiffs1})
-    growdiff_tab.to_csv("intermediate_results/growdiffs.csv")
-
-# Execute the dynamic distributional anaylsis
-exec(open('dynamic_distribution_code.py').read())
+    """
+    If desired, run using a simple growth model, based on a first-order
+    log-linearized effect using marginal incentives only.
+    Alternatively, run using robustness analysis for growth effects.
+    """
+    ownGrowthModel = False
+
+    if ownGrowthModel:
+        # Run the NOL distortion model
+        exec(open('nolmodel.py').read())
+        allTheta(1000)
+        # Execute code for and estimate individual tax incentives
+        exec(open('labor_model.py').read())
+        calc_pre2 = make_calculator(param['policy'], 2014)
+        calc_tcja2 = make_calculator({}, 2014)
+        allLaborChanges(calc_pre2, calc_tcja2, eti, YEAR_WORKERS)
+        allOwnerTaxes(calc_pre2, calc_tcja2, YEAR_WORKERS)
+        # Execute the investment model and estimate changes in investment
+        exec(open('investmentmodel.py').read())
+        allInvChanges(ELAST_INV_CORP, ELAST_INV_NONCORP, SELAST_INV_MNE)
+        # Execute the growth model
+        exec(open('growthmodel.py').read())
+    else:
+        # Growth effect to consider (pct change in GDP level)
+        geffect = 0.015
+        # Construct alternative file for growth effect (permanent increase in 2018)
+        growdiffs1 = np.zeros(13)
+        growdiffs1[4] = geffect
+        # Save these alternative growth rate effects to file for dynamic work
+        growdiff_tab = pd.DataFrame({"Year": range(2015, 2028),
+                                     "gfactors": growdiffs1})
+        growdiff_tab.to_csv("intermediate_results/growdiffs.csv")
+
+    # Execute the dynamic distributional anaylsis
+    exec(open('dynamic_distribution_code.py').read())
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+This file times the construction of Policy objects and the implementation
+of the 2017-law and TCJA reform files, which are repeated in every
+make_calculator call. Unlike the other scripts, it does not depend on
+main_executor.py and can be run on its own from this directory:
+
+    python policy_benchmark.py
+"""
+import timeit
+from taxcalc import Policy, Calculator
+
+REFORM_FILES = ['taxcalc/reforms/2017_law.json',
+                'taxcalc/reforms/TCJA_Reconciliation.json']
+NUMBER = 20
+REPEAT = 5
+
+
+def best_time(func):
+    """
+    Returns the best average time in milliseconds of NUMBER calls to func.
+    """
+    times = timeit.repeat(func, number=NUMBER, repeat=REPEAT)
+    return min(times) / NUMBER * 1000.
+
+
+def policy_timings():
+    """
+    Returns a list of (description, milliseconds) pairs.
+    """
+    results = [('Policy()', best_time(Policy))]
+    for reffile in REFORM_FILES:
+        refdict = Calculator.read_json_param_objects(reffile, None)['policy']
+
+        def construct_and_reform():
+            """
+            Constructs a Policy object and implements the reform.
+            """
+            pol = Policy()
+            pol.implement_reform(refdict, print_warnings=False)
+        results.append(('Policy() and implement_reform ' + reffile,
+                        best_time(construct_and_reform)))
+    return results
+
+
+if __name__ == '__main__':
+    for (desc, msec) in policy_timings():
+        print('{:>9.2f} ms  {}'.format(msec, desc))
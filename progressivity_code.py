@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+This file provides the code for the summary progressivity indices of the
+tax measures under any two sets of policies.
+Note that this is not intended to be run on its own. It assumes that the
+code in `distributional_code.py` has already been executed.
+
+All the indices are computed from a single ordering of the units by the
+ranking income (as in distOrderPrep, with the same exclusions), which is
+shared by the Lorenz curve of income and the concentration curves of
+every tax measure. For each measure, the indices are produced for the tax
+under calc1 ("pre"), under calc2 ("post") and for the change ("change"):
+    Gini, pre-tax income: Gini index of income
+    Gini, after-tax income: Gini index of income less the tax (ranked by
+                            after-tax income)
+    Concentration: concentration index of the tax
+    Kakwani: concentration index of the tax less the Gini of income
+    Suits: 1 - 2 * area under the curve of tax shares by income shares
+    Reynolds-Smolensky: Gini of income less the concentration index of
+                        after-tax income (ranked by income)
+    Effective progression: (1 - after-tax Gini) / (1 - pre-tax Gini)
+For the change, the Kakwani and Suits indices are multiplied by the sign of
+the total change, as in kakwani.
+"""
+
+def concentrationCurve(var, wgt):
+    """
+    Returns the concentration index of var for units already ordered by
+    the ranking income, with weights wgt, and the cumulative share of var
+    (the concentration curve) at each unit.
+    """
+    popshare = np.cumsum(wgt) / np.sum(wgt)
+    cumvar = np.cumsum(var * wgt)
+    varshare = cumvar / cumvar[-1]
+    conc = np.dot(popshare - varshare, wgt) / np.sum(wgt) * 2
+    return (conc, varshare)
+
+def suitsIndex(taxshare, incshare):
+    """
+    Returns the Suits index for the concentration curve of a tax and the
+    share of income of each unit (ordered by the ranking income).
+    """
+    taxshare_prev = np.concatenate(([0.], taxshare[:-1]))
+    area = np.dot((taxshare + taxshare_prev) / 2., incshare)
+    return 1. - 2. * area
+
+def progressivityIndices(calc1, calc2, income, measures, rerankby, rescaleby,
+                         exclude, base=None):
+    """
+    Returns a DataFrame with the progressivity indices (see above) of each
+    tax measure in measures, restricted to "iitax", "payrolltax" and
+    "totaltax", for the tax under calc1, under calc2 and the change.
+    base is the result of distOrderBase for calc1 and the same arguments
+    (with no screening), which is computed here if it is None.
+    Restricts screening to none
+    """
+    assert set(measures) <= set(["iitax", "payrolltax", "totaltax"])
+    screen = ["", ""]
+    if base is None:
+        base = distOrderBase(calc1, income, rerankby, rescaleby, exclude,
+                             screen)
+    assert base["args"] == (income, rerankby, rescaleby, exclude, screen)
+    # Order units by rescaled income and drop those to be excluded
+    inc_rescaled = base["inc"] / base["rank"]
+    order = np.lexsort((base["todrop"], base["scale"], base["rank"],
+                        base["wgt"], inc_rescaled))
+    order = order[base["todrop"][order] != 1]
+    inc = base["inc"][order]
+    rank = base["rank"][order]
+    wgt = base["wgt"][order] * base["scale"][order]
+    # Lorenz curve of income, shared by all measures
+    (gini_pre, incshare) = concentrationCurve(inc, wgt)
+    incshare_unit = inc * wgt / np.sum(inc * wgt)
+    results = []
+    for measure in measures:
+        (tax1, tax2) = getMeasures(calc1, calc2, measure)
+        tax1 = np.asarray(tax1)[order]
+        tax2 = np.asarray(tax2)[order]
+        for (taxlabel, tax) in [("pre", tax1), ("post", tax2),
+                                ("change", tax2 - tax1)]:
+            (conc, taxshare) = concentrationCurve(tax, wgt)
+            kak = conc - gini_pre
+            suits = suitsIndex(taxshare, incshare_unit)
+            if taxlabel == "change":
+                kak = kak * np.sign(np.dot(tax, wgt))
+                suits = suits * np.sign(np.dot(tax, wgt))
+            # After-tax income, ranked by income and by itself
+            aftertax = inc - tax
+            (conc_after, _) = concentrationCurve(aftertax, wgt)
+            order_after = np.argsort(aftertax / rank, kind='stable')
+            (gini_post, _) = concentrationCurve(aftertax[order_after],
+                                                wgt[order_after])
+            results.append({"Measure": measure, "Tax": taxlabel,
+                            "Gini, pre-tax income": gini_pre,
+                            "Gini, after-tax income": gini_post,
+                            "Concentration": conc,
+                            "Kakwani": kak,
+                            "Suits": suits,
+                            "Reynolds-Smolensky": gini_pre - conc_after,
+                            "Effective progression": ((1 - gini_post) /
+                                                      (1 - gini_pre))})
+    return pd.DataFrame(results)
+
+def progressivityYear(calc1, calc2, income, measures, rankings, rescaleby,
+                      exclude):
+    """
+    Returns the progressivity indices for the current year of calc1 and
+    calc2 for each ranking in rankings (a dictionary mapping a label to the
+    rerankby argument), which run_years calls for each year.
+    """
+    tables = []
+    for label in rankings:
+        base = distOrderBase(calc1, income, rankings[label], rescaleby,
+                             exclude, ["", ""])
+        table1 = progressivityIndices(calc1, calc2, income, measures,
+                                      rankings[label], rescaleby, exclude,
+                                      base)
+        table1.insert(0, "Ranking", label)
+        table1.insert(0, "Year", calc1.current_year)
+        tables.append(table1)
+    return pd.concat(tables, ignore_index=True)
+
+def progressivityPanel(calcA, calcB, years, income, measures, rankings,
+                       rescaleby, exclude):
+    """
+    Returns a DataFrame with the progressivity indices for every year in
+    years and every ranking in rankings (see progressivityYear), for the
+    change from calcA to calcB. The data are aged only once for all the
+    years by Calculator.run_years.
+    """
+    func = functools.partial(progressivityYear, income=income,
+                             measures=measures, rankings=rankings,
+                             rescaleby=rescaleby, exclude=exclude)
+    tables = Calculator.run_years(lambda: (copy.deepcopy(calcA),
+                                           copy.deepcopy(calcB)),
+                                  years, func)
+    return pd.concat(tables, ignore_index=True)
@@ -9,6 +9,7 @@ from taxcalc.growfactors import *
 from taxcalc.growdiff import *
 from taxcalc.growmodel import *
 from taxcalc.records import *
+from taxcalc.scenarios import *
 from taxcalc.simpletaxio import *
 from taxcalc.taxcalcio import *
 #from taxcalc.utils import *
@@ -11,6 +11,7 @@ import os
 import json
 import re
 import copy
+import concurrent.futures
 import numpy as np
 import pandas as pd
 from taxcalc.functions import (TaxInc, SchXYZTax, GainsTax, AGIsurtax,
@@ -99,6 +100,24 @@ class Calculator(object):
     """
     # pylint: disable=too-many-public-methods
 
+    # functions called by _calc_one_year before _calc_itemded_onward
+    ONE_YEAR_FUNCTIONS = (EI_PayrollTax, DependentCare, Adj,
+                          ALD_InvInc_ec_base, CapGains, SSBenefits, UBI, AGI,
+                          ItemDedCap)
+
+    # functions called by calc_all after BenefitSurtax and BenefitLimitation
+    FINAL_FUNCTIONS = (FairShareTax, LumpSumTax, ExpandIncome, AfterTaxIncome)
+
+    # functions called by _calc_itemded_onward (some of them through
+    # _taxinc_to_amt), whose parameters are used by the sweep method
+    ITEMDED_ONWARD_FUNCTIONS = (ItemDed, AdditionalMedicareTax, StdDed,
+                                TaxInc, SchXYZTax, GainsTax, AGIsurtax,
+                                NetInvIncTax, AMT, F2441, EITC,
+                                ChildDepTaxCredit, PersonalTaxCredit,
+                                AmOppCreditParts, SchR, EducationTaxCredit,
+                                CharityCredit, NonrefundableCredits,
+                                AdditionalCTC, C1040, CTC_new, IITAX)
+
     def __init__(self, policy=None, records=None, verbose=True,
                  sync_years=True, consumption=None, behavior=None):
         # pylint: disable=too-many-arguments,too-many-branches
@@ -110,8 +129,9 @@ class Calculator(object):
             self.__records = copy.deepcopy(records)
         else:
             raise ValueError('must specify records as a Records object')
-        if self.__policy.current_year < self.__records.data_year:
-            self.__policy.set_year(self.__records.data_year)
+        # records may have been extrapolated already (see Records.seek_year)
+        if self.__policy.current_year < self.__records.current_year:
+            self.__policy.set_year(self.__records.current_year)
         if consumption is None:
             self.__consumption = Consumption(start_year=policy.start_year)
         elif isinstance(consumption, Consumption):
@@ -179,14 +199,153 @@ class Calculator(object):
         """
         # conducts static analysis of Calculator object for current_year
         assert self.__records.current_year == self.__policy.current_year
-        BenefitPrograms(self)
-        self._calc_one_year(zero_out_calc_vars)
-        BenefitSurtax(self)
-        BenefitLimitation(self)
-        FairShareTax(self.__policy, self.__records)
-        LumpSumTax(self.__policy, self.__records)
-        ExpandIncome(self.__policy, self.__records)
-        AfterTaxIncome(self.__policy, self.__records)
+        for _, step in self._calc_all_steps(zero_out_calc_vars):
+            step()
+
+    def sweep(self, param_name, values, outputs, weighted=False):
+        """
+        Return list containing, for each value in values, a dictionary
+        that maps each variable name in outputs to the variable array (or
+        to its weighted total when weighted is True) that calc_all
+        computes when the current-year value of the named policy parameter
+        is set to that value.  This Calculator object is not changed.
+        All the values share the current-year Records data:  only the
+        calculated variables are copied for each value, and the calc_all
+        functions called before the first function that uses the
+        parameter are called only once.
+        """
+        if not hasattr(self.__policy, '_' + param_name):
+            msg = '{} is not a policy parameter name'
+            raise ValueError(msg.format(param_name))
+        default = np.asarray(getattr(self.__policy, param_name))
+        steps = self._calc_all_steps()
+        first_step = len(steps)
+        for idx, (params, _) in enumerate(steps):
+            if param_name in params:
+                first_step = idx
+                break
+        # call the functions that do not use the parameter only once
+        base = copy.copy(self)
+        base.__records = self.__records.scratch_copy()
+        for _, step in base._calc_all_steps()[:first_step]:
+            step()
+
+        def evaluate(value):
+            """
+            Return outputs dictionary for one parameter value.
+            """
+            calc = copy.copy(base)
+            calc.__records = base.__records.scratch_copy()
+            calc.__policy = copy.deepcopy(self.__policy)
+            # scalar parameters must remain numpy scalars (not 0-d arrays)
+            value = np.array(value, dtype=default.dtype)[()]
+            setattr(calc.__policy, param_name, value)
+            for _, step in calc._calc_all_steps()[first_step:]:
+                step()
+            if weighted:
+                return {name: calc.weighted_total(name) for name in outputs}
+            return {name: calc.array(name) for name in outputs}
+
+        return [evaluate(value) for value in values]
+
+    @staticmethod
+    def run_years(calc_factory, years, func, max_workers=None):
+        """
+        Return list containing, for each year in years, the value returned
+        by func(calc), where calc is the Calculator object returned by
+        calc_factory() advanced to that year after calc_all has been called
+        for it.  If calc_factory returns a list or tuple of Calculator
+        objects, func is called with all of them as separate arguments.
+        The Calculator objects are advanced through the years only once,
+        in this process, and by default calc_all and func are also called
+        in this process, one year after the other.
+        When max_workers is greater than one, each year's Records data are
+        copied into shared memory (see Records.to_shared_memory), so that
+        calc_all and func are executed for the different years in parallel
+        by a pool of max_workers worker processes, which use the shared
+        Records data without copying it.  Then func and its return values
+        must be picklable, and func must be importable by the worker
+        processes:  a function defined in a module, not one defined in the
+        __main__ script (or executed in its namespace), because worker
+        processes that are spawned (as on Windows) import the __main__
+        script again, so the code of that script that calls run_years must
+        be guarded by an if __name__ == '__main__': statement.
+        The Calculator objects returned by calc_factory are left in the last
+        year.
+        """
+        calcs = calc_factory()
+        if isinstance(calcs, Calculator):
+            calcs = [calcs]
+        if max_workers is None or max_workers <= 1:
+            results = dict()
+            for year in sorted(set(years)):
+                for calc in calcs:
+                    calc.advance_to_year(year)
+                    calc.calc_all()
+                results[year] = func(*calcs)
+            return [results[year] for year in years]
+        futures = dict()
+        pending = list()  # (future, shared memory blocks) pairs
+
+        def release(blocks):
+            """
+            Close and unlink the shared memory blocks.
+            """
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+                for year in sorted(set(years)):
+                    blocks = list()
+                    tasks = list()
+                    for calc in calcs:
+                        calc.advance_to_year(year)
+                        shm, handle = calc.__records.to_shared_memory()
+                        blocks.append(shm)
+                        # calc without its Records, copied because the
+                        # task is pickled after calc is advanced further
+                        shell = copy.copy(calc)
+                        shell.__records = None
+                        shell.__stored_records = None
+                        tasks.append((copy.deepcopy(shell), handle))
+                    futures[year] = pool.submit(Calculator._run_year,
+                                                tasks, func)
+                    pending.append((futures[year], blocks))
+                    # limit the number of years held in shared memory
+                    while len(pending) > max_workers:
+                        future, blocks = pending.pop(0)
+                        concurrent.futures.wait([future])
+                        release(blocks)
+                return [futures[year].result() for year in years]
+        finally:
+            for _, blocks in pending:
+                release(blocks)
+
+    @staticmethod
+    def _run_year(tasks, func):
+        """
+        Return func called with the Calculator objects made from the
+        (Calculator without Records, Records shared memory handle) pairs
+        in tasks after calling calc_all for each of them.
+        This method is executed in the worker processes of run_years.
+        """
+        calcs = list()
+        blocks = list()
+        for shell, handle in tasks:
+            records, shm = Records.from_shared_memory(handle)
+            shell.__records = records
+            shell.calc_all()
+            calcs.append(shell)
+            blocks.append(shm)
+        # the returned value must not refer to the shared memory blocks,
+        # which are closed before it is sent to the run_years process
+        result = copy.deepcopy(func(*calcs))
+        del calcs, records, shell
+        for shm in blocks:
+            shm.close()
+        return result
 
     def weighted_total(self, variable_name):
         """
@@ -204,9 +363,17 @@ class Calculator(object):
     def dataframe(self, variable_list):
         """
         Return pandas DataFrame containing the listed variables from embedded
-        Records object.
+        Records object.  The DataFrame always holds a copy of the data, so
+        it can be modified and is not changed by later calculations.
         """
         assert isinstance(variable_list, list)
+        matrix = self.__records.column_matrix(variable_list)
+        if matrix is not None:
+            # all variables are in one column block, so make the one copy
+            # from the block (a read-only view or an already copied gather)
+            # instead of using column_stack
+            return pd.DataFrame(data=matrix, columns=variable_list,
+                                copy=not matrix.flags.writeable)
         arys = [self.array(vname) for vname in variable_list]
         pdf = pd.DataFrame(data=np.column_stack(arys), columns=variable_list)
         del arys
@@ -243,6 +410,41 @@ class Calculator(object):
         setattr(self.__records, variable_name, variable_value)
         return None
 
+    def scenario_arrays(self, variable_name):
+        """
+        Return list containing, for each scenario combined in the embedded
+        Records object by Records.tile, a numpy ndarray view of the named
+        variable for the records in that scenario.
+        """
+        variable = np.asarray(self.array(variable_name))
+        boundaries = np.cumsum(self.__records.tile_lengths)[:-1]
+        return np.split(variable, boundaries)
+
+    def tile(self, num_copies):
+        """
+        Return a new Calculator object whose embedded Records object
+        contains num_copies copies of the records of this Calculator
+        object (see Records.tile), all evaluated using the policy,
+        consumption and behavior of this Calculator object.  The copies
+        can be changed differently (for example, with the incarray method
+        and arrays that contain the change for each copy one after the
+        other) and then evaluated by a single calc_all call, and the
+        scenario_arrays method splits the results into the copies.
+        This Calculator object is not changed.
+        """
+        if int(num_copies) != num_copies or num_copies < 1:
+            raise ValueError('num_copies must be a positive integer')
+        if getattr(self.__policy, 'per_record_params', None):
+            msg = 'cannot tile a Calculator with per-record policy parameters'
+            raise ValueError(msg)
+        calc = copy.copy(self)
+        calc.__records = Records.tile([self.__records] * int(num_copies))
+        calc.__policy = copy.deepcopy(self.__policy)
+        calc.__consumption = copy.deepcopy(self.__consumption)
+        calc.__behavior = copy.deepcopy(self.__behavior)
+        calc.__stored_records = None
+        return calc
+
     def n65(self):
         """
         Return numpy ndarray containing the number of
@@ -282,8 +484,8 @@ class Calculator(object):
         that was saved in the last call to the store_records() method.
         """
         assert isinstance(self.__stored_records, Records)
-        self.__records = copy.deepcopy(self.__stored_records)
-        del self.__stored_records
+        # stored object is private, so it can be restored without a copy
+        self.__records = self.__stored_records
         self.__stored_records = None
 
     def records_current_year(self, year=None):
@@ -667,18 +869,19 @@ class Calculator(object):
             finite_diff *= -1.0
         # remember records object in order to restore it after mtr computations
         self.store_records()
-        # extract variable array(s) from embedded records object
-        variable = self.array(variable_str)
+        # copy variable array(s) from embedded records object
+        # (as float64 so finite_diff is not lost when Records is compact)
+        variable = self._float64_array(variable_str)
         if variable_str == 'e00200p':
-            earnings_var = self.array('e00200')
+            earnings_var = self._float64_array('e00200')
         elif variable_str == 'e00200s':
-            earnings_var = self.array('e00200')
+            earnings_var = self._float64_array('e00200')
         elif variable_str == 'e00900p':
-            seincome_var = self.array('e00900')
+            seincome_var = self._float64_array('e00900')
         elif variable_str == 'e00650':
-            divincome_var = self.array('e00600')
+            divincome_var = self._float64_array('e00600')
         elif variable_str == 'e26270':
-            schEincome_var = self.array('e02000')
+            schEincome_var = self._float64_array('e02000')
         # calculate level of taxes after a marginal increase in income
         self.array(variable_str, variable + finite_diff)
         if variable_str == 'e00200p':
@@ -1411,6 +1614,14 @@ class Calculator(object):
 
     # ----- begin private methods of Calculator class -----
 
+    def _float64_array(self, variable_name):
+        """
+        Return a float64 copy of named variable in embedded Records object.
+        The copy is needed because the variable array can be a view into a
+        column block whose values are overwritten when the variable is set.
+        """
+        return np.array(self.array(variable_name), dtype=np.float64)
+
     def _taxinc_to_amt(self):
         """
         Call TaxInc through AMT functions.
@@ -1429,15 +1640,41 @@ class Calculator(object):
         if zero_out_calc_vars:
             self.__records.zero_out_changing_calculated_vars()
         # pdb.set_trace()
-        EI_PayrollTax(self.__policy, self.__records)
-        DependentCare(self.__policy, self.__records)
-        Adj(self.__policy, self.__records)
-        ALD_InvInc_ec_base(self.__policy, self.__records)
-        CapGains(self.__policy, self.__records)
-        SSBenefits(self.__policy, self.__records)
-        UBI(self.__policy, self.__records)
-        AGI(self.__policy, self.__records)
-        ItemDedCap(self.__policy, self.__records)
+        for func in Calculator.ONE_YEAR_FUNCTIONS:
+            func(self.__policy, self.__records)
+        self._calc_itemded_onward()
+
+    def _calc_all_steps(self, zero_out_calc_vars=False):
+        """
+        Return list of (parameter names, function) pairs such that calling
+        the functions in order is what calc_all does, where each set of
+        parameter names contains the policy parameters used by its function.
+        BenefitSurtax and BenefitLimitation rerun _calc_itemded_onward (see
+        ComputeBenefit), so they also use its parameters.
+        """
+        pol = self.__policy
+        rec = self.__records
+        itemded_params = frozenset().union(
+            *[func.parameters for func in Calculator.ITEMDED_ONWARD_FUNCTIONS]
+        )
+        steps = [(BenefitPrograms.parameters, lambda: BenefitPrograms(self))]
+        if zero_out_calc_vars:
+            steps.append((frozenset(), rec.zero_out_changing_calculated_vars))
+        for func in Calculator.ONE_YEAR_FUNCTIONS:
+            steps.append((func.parameters, lambda func=func: func(pol, rec)))
+        steps.append((itemded_params, self._calc_itemded_onward))
+        for func in [BenefitSurtax, BenefitLimitation]:
+            steps.append((func.parameters | itemded_params,
+                          lambda func=func: func(self)))
+        for func in Calculator.FINAL_FUNCTIONS:
+            steps.append((func.parameters, lambda func=func: func(pol, rec)))
+        return steps
+
+    def _calc_itemded_onward(self):
+        """
+        Call the _calc_one_year functions beginning with ItemDed, which
+        include all the functions that use itemized-deduction haircuts.
+        """
         ItemDed(self.__policy, self.__records)
         AdditionalMedicareTax(self.__policy, self.__records)
         StdDed(self.__policy, self.__records)
@@ -1486,6 +1723,32 @@ class Calculator(object):
         CTC_new(self.__policy, self.__records)
         IITAX(self.__policy, self.__records)
 
+    def _counterfactual_iitax(self, itemded_params):
+        """
+        Return iitax array computed with the current-year values of the
+        policy parameters in the itemded_params dictionary, each of which
+        must be used only by ItemDed or later functions (for example, the
+        itemized-deduction haircuts), leaving this Calculator unchanged.
+        Only the _calc_itemded_onward part of _calc_one_year is rerun and
+        it works on a scratch copy of the embedded Records object, which
+        copies only calculated variables, so neither the Calculator nor
+        its input variables need to be copied.
+        """
+        records = self.__records
+        saved_params = {name: getattr(self.__policy, name)
+                        for name in itemded_params}
+        self.__records = records.scratch_copy()
+        try:
+            for name, value in itemded_params.items():
+                setattr(self.__policy, name, value)
+            self._calc_itemded_onward()
+            iitax = self.array('iitax')
+        finally:
+            self.__records = records
+            for name, value in saved_params.items():
+                setattr(self.__policy, name, value)
+        return iitax
+
     @staticmethod
     def _read_json_policy_reform_text(text_string,
                                       growdiff_baseline_dict,
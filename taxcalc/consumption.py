@@ -131,7 +131,10 @@ class Consumption(ParametersBase):
         for var in Consumption.RESPONSE_VARS:
             records_var = getattr(records, var)
             mpc_var = getattr(self, 'MPC_{}'.format(var))
-            records_var[:] += mpc_var * income_change
+            if records_var.flags.writeable:
+                records_var[:] += mpc_var * income_change
+            else:  # shared zeros of a compact Records object
+                setattr(records, var, records_var + mpc_var * income_change)
 
     def benval_params(self):
         """
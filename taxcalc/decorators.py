@@ -7,10 +7,19 @@ the functions.py module.
 # pylint --disable=locally-disabled decorators.py
 
 import io
+import os
 import ast
 import inspect
 import toolz
+import numpy as np
 from taxcalc.policy import Policy
+from taxcalc.vectorize import make_vectorized_apply_function
+
+
+# names of policy parameters, both with and without their leading underscore,
+# which are looked up once rather than for each decorated function
+POLICY_PARAMETER_NAMES = set(Policy.default_data(metadata=True).keys())
+POLICY_PARAMETER_NAMES.update([name[1:] for name in POLICY_PARAMETER_NAMES])
 
 
 def id_wrapper(*dec_args, **dec_kwargs):  # pylint: disable=unused-argument
@@ -26,6 +35,7 @@ def id_wrapper(*dec_args, **dec_kwargs):  # pylint: disable=unused-argument
             wrapped_f function nested in wrap function.
             """
             return fnc(*args, **kwargs)
+        wrapped_f.py_func = fnc  # as in numba-compiled functions
         return wrapped_f
     return wrap
 
@@ -43,6 +53,20 @@ except (ImportError, AttributeError):
 # jit = id_wrapper
 # DO_JIT = False
 
+# Functions decorated with iterate_jit are executed by one of two engines:
+#   'numba' loops over filing units calling the calc-style function for
+#           each unit (compiled by numba when it is available), and
+#   'numpy' calls a vectorized version of the calc-style function
+#           (see vectorize.py) once with whole arrays.
+# The engine is specified by the TAXCALC_ENGINE environment variable when
+# taxcalc is imported; the default is 'numba' if numba is available and
+# 'numpy' otherwise.
+ENGINES = ('numba', 'numpy')
+ENGINE = os.environ.get('TAXCALC_ENGINE', 'numba' if DO_JIT else 'numpy')
+if ENGINE not in ENGINES:
+    raise ValueError('TAXCALC_ENGINE={} is not in {}'.format(ENGINE,
+                                                              ENGINES))
+
 
 class GetReturnNode(ast.NodeVisitor):
     """
@@ -57,7 +81,8 @@ class GetReturnNode(ast.NodeVisitor):
         return [node.value.id]
 
 
-def create_apply_function_string(sigout, sigin, parameters):
+def create_apply_function_string(sigout, sigin, parameters,
+                                 float32_args=()):
     """
     Create a string for a function of the form::
 
@@ -79,6 +104,12 @@ def create_apply_function_string(sigout, sigin, parameters):
                 variables (as opposed to column records). This influences
                 how we construct the apply-style function
 
+    float32_args: iterable of which of the args (from in_args) are float32
+                  column records (variables in a compact Records object),
+                  whose values are converted to double precision one at a
+                  time as they are passed to jitted_f, without copying the
+                  whole column
+
     Returns
     -------
     a String representing the function
@@ -93,7 +124,12 @@ def create_apply_function_string(sigout, sigin, parameters):
     out_index = [x + "[i]" for x in out_args]
     in_index = []
     for arg, _var in zip(in_args, sigin):
-        in_index.append(arg + "[i]" if _var not in parameters else arg)
+        if _var in parameters:
+            in_index.append(arg)
+        elif _var in float32_args:
+            in_index.append("float(" + arg + "[i])")
+        else:
+            in_index.append(arg + "[i]")
     fstr.write("    " + ",".join(out_index) + " = ")
     fstr.write("jitted_f(" + ",".join(in_index) + ")\n")
     fstr.write("  return " + ",".join(out_args) + "\n")
@@ -156,8 +192,27 @@ def create_toplevel_function_string(args_out, args_in, pm_or_pf):
     return fstr.getvalue()
 
 
+def float64_arrays(func):
+    """
+    Return function that calls func after replacing each float32 array
+    argument (which is a variable in a compact Records object) with a
+    float64 copy, so that all calculations are done in double precision.
+    This is used only by the numpy engine, whose vectorized functions
+    operate on whole arrays; the numba engine instead converts each
+    float32 value as it is read (see create_apply_function_string).
+    """
+    def wrapped_f(*args):
+        """
+        wrapped_f function nested in float64_arrays function.
+        """
+        return func(*[arg.astype(np.float64)
+                      if getattr(arg, 'dtype', None) == np.float32 else arg
+                      for arg in args])
+    return wrapped_f
+
+
 def make_apply_function(func, out_args, in_args, parameters,
-                        do_jit=DO_JIT, **kwargs):
+                        do_jit=DO_JIT, float32_args=(), **kwargs):
     """
     Takes a calc-style function and creates the necessary Python code for
     an apply-style function. Will also jit the function if desired.
@@ -176,6 +231,9 @@ def make_apply_function(func, out_args, in_args, parameters,
 
     do_jit: Bool, if True, jit the resulting apply-style function
 
+    float32_args: iterable of which of the args (from in_args) are float32
+                  column records (see create_apply_function_string)
+
     Returns
     -------
     apply-style function
@@ -184,7 +242,8 @@ def make_apply_function(func, out_args, in_args, parameters,
         jitted_f = jit(**kwargs)(func)
     else:
         jitted_f = func
-    apfunc = create_apply_function_string(out_args, in_args, parameters)
+    apfunc = create_apply_function_string(out_args, in_args, parameters,
+                                          float32_args)
     func_code = compile(apfunc, "<string>", "exec")
     fakeglobals = {}
     eval(func_code,  # pylint: disable=eval-used
@@ -256,11 +315,8 @@ def iterate_jit(parameters=None, **kwargs):
         # Any name that is a parameter
         # Boolean flag is given special treatment.
         # Identify those names here
-        dd_key_list = list(Policy.default_data(metadata=True).keys())
-        allowed_parameters = dd_key_list
-        allowed_parameters += list(arg[1:] for arg in dd_key_list)
         additional_parameters = [arg for arg in in_args if
-                                 arg in allowed_parameters]
+                                 arg in POLICY_PARAMETER_NAMES]
         additional_parameters += parameters
         # Remote duplicates
         all_parameters = list(set(additional_parameters))
@@ -285,6 +341,14 @@ def iterate_jit(parameters=None, **kwargs):
                                                parameters=all_parameters,
                                                do_jit=DO_JIT,
                                                **kwargs_for_jit)
+        # the vectorized apply-style function is made when first used
+        vectorized_f = list()
+        # apply-style functions that index per-record parameters (see
+        # ScenarioPolicy) like records variables or that read float32
+        # records variables (see Records compact argument), made when first
+        # used and keyed by the sets of per-record parameter names and of
+        # float32 variable names
+        special_applied_f = dict()
 
         def wrapper(*args, **kwargs):
             """
@@ -305,13 +369,45 @@ def iterate_jit(parameters=None, **kwargs):
                                                               list(in_args),
                                                               pm_or_pf)
             func_code = compile(high_level_func, "<string>", "exec")
+            if ENGINE == 'numpy':
+                if not vectorized_f:
+                    vectorized_f.append(float64_arrays(
+                        make_vectorized_apply_function(func,
+                                                       len(all_out_args))))
+                applied_f = vectorized_f[0]
+            else:
+                per_record = frozenset(
+                    getattr(args[0], 'per_record_params', ())
+                ).intersection(in_args)
+                float32_args = frozenset(
+                    farg for farg in in_args
+                    if getattr(getattr(args[1], farg, None), 'dtype',
+                               None) == np.float32
+                )
+                key = (per_record, float32_args)
+                if not per_record and not float32_args:
+                    applied_f = applied_jitted_f
+                elif key in special_applied_f:
+                    applied_f = special_applied_f[key]
+                else:
+                    applied_f = make_apply_function(
+                        func, list(reversed(all_out_args)), in_args,
+                        parameters=[param for param in all_parameters
+                                    if param not in per_record],
+                        do_jit=DO_JIT, float32_args=float32_args,
+                        **kwargs_for_jit
+                    )
+                    special_applied_f[key] = applied_f
             fakeglobals = {}
             eval(func_code,  # pylint: disable=eval-used
-                 {"applied_f": applied_jitted_f}, fakeglobals)
+                 {"applied_f": applied_f},
+                 fakeglobals)
             high_level_fn = fakeglobals['hl_func']
             ans = high_level_fn(*args, **kwargs)
             return ans
 
+        # names of the parameters used by func (see Calculator.sweep)
+        wrapper.parameters = frozenset(all_parameters)
         return wrapper
 
     return make_wrapper
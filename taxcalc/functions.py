@@ -17,7 +17,6 @@ indexing).
 # pylint: disable=too-many-locals
 
 import math
-import copy
 import numpy as np
 from taxcalc.decorators import iterate_jit, jit
 
@@ -84,6 +83,16 @@ def BenefitPrograms(calc):
     calc.array('benefit_value_total', value)
 
 
+# names of the policy parameters used by BenefitPrograms (see
+# Calculator.sweep)
+BenefitPrograms.parameters = frozenset(['BEN_housing_repeal', 'BEN_ssi_repeal',
+                                        'BEN_snap_repeal', 'BEN_tanf_repeal',
+                                        'BEN_vet_repeal', 'BEN_wic_repeal',
+                                        'BEN_mcare_repeal', 'BEN_mcaid_repeal',
+                                        'BEN_oasdi_repeal', 'BEN_ui_repeal',
+                                        'BEN_other_repeal'])
+
+
 @iterate_jit(nopython=True)
 def EI_PayrollTax(SS_Earnings_c, e00200p, e00200s, pencon_p, pencon_s,
                   FICA_ss_trt, FICA_mc_trt, ALD_SelfEmploymentTax_hc,
@@ -1697,24 +1706,17 @@ def ComputeBenefit(calc, ID_switch):
     Calculates the value of the benefits accrued from itemizing.
     """
     # compute income tax liability with no itemized deductions allowed for
-    # the types of itemized deductions covered under the BenefitSurtax
-    no_ID_calc = copy.deepcopy(calc)
-    if ID_switch[0]:
-        no_ID_calc.policy_param('ID_Medical_hc', 1.)
-    if ID_switch[1]:
-        no_ID_calc.policy_param('ID_StateLocalTax_hc', 1.)
-    if ID_switch[2]:
-        no_ID_calc.policy_param('ID_RealEstate_hc', 1.)
-    if ID_switch[3]:
-        no_ID_calc.policy_param('ID_Casualty_hc', 1.)
-    if ID_switch[4]:
-        no_ID_calc.policy_param('ID_Miscellaneous_hc', 1.)
-    if ID_switch[5]:
-        no_ID_calc.policy_param('ID_InterestPaid_hc', 1.)
-    if ID_switch[6]:
-        no_ID_calc.policy_param('ID_Charity_hc', 1.)
-    no_ID_calc._calc_one_year()  # pylint: disable=protected-access
-    diff_iitax = no_ID_calc.array('iitax') - calc.array('iitax')
+    # the types of itemized deductions covered under the BenefitSurtax,
+    # rerunning only the calculations that use the deduction haircuts
+    haircut_names = ['ID_Medical_hc', 'ID_StateLocalTax_hc',
+                     'ID_RealEstate_hc', 'ID_Casualty_hc',
+                     'ID_Miscellaneous_hc', 'ID_InterestPaid_hc',
+                     'ID_Charity_hc']
+    no_ID_params = {name: 1. for name, switch in zip(haircut_names, ID_switch)
+                    if switch}
+    # pylint: disable=protected-access
+    no_ID_iitax = calc._counterfactual_iitax(no_ID_params)
+    diff_iitax = no_ID_iitax - calc.array('iitax')
     benefit = np.where(diff_iitax > 0., diff_iitax, 0.)
     return benefit
 
@@ -1740,6 +1742,14 @@ def BenefitSurtax(calc):
         calc.incarray('surtax', ben_surtax)
 
 
+# names of the policy parameters used by BenefitSurtax itself (see
+# Calculator.sweep)
+BenefitSurtax.parameters = frozenset(['ID_BenefitSurtax_crt',
+                                      'ID_BenefitSurtax_Switch',
+                                      'ID_BenefitSurtax_em',
+                                      'ID_BenefitSurtax_trt'])
+
+
 def BenefitLimitation(calc):
     """
     Limits the benefits of select itemized deductions to a fraction of
@@ -1779,6 +1789,14 @@ def BenefitLimitation(calc):
         calc.incarray('combined', excess_benefit)
 
 
+# names of the policy parameters used by BenefitLimitation itself (see
+# Calculator.sweep)
+BenefitLimitation.parameters = frozenset(['ID_BenefitCap_rt',
+                                          'ID_BenefitCap_Switch',
+                                          'ID_StateLocalTax_hc',
+                                          'ID_RealEstate_hc'])
+
+
 @iterate_jit(nopython=True)
 def FairShareTax(c00100, MARS, ptax_was, setax, ptax_amc,
                  FST_AGI_trt, FST_AGI_thd_lo, FST_AGI_thd_hi,
@@ -113,31 +113,12 @@ class GrowDiff(ParametersBase):
         """
         Apply updated GrowDiff values to specified GrowFactors instance.
         """
-        # pylint: disable=no-member
-        for i in range(0, self.num_years):
-            cyr = i + self.start_year
-            growfactors.update('ABOOK', cyr, self._ABOOK[i])
-            growfactors.update('ACGNS', cyr, self._ACGNS[i])
-            growfactors.update('ACPIM', cyr, self._ACPIM[i])
-            growfactors.update('ACPIU', cyr, self._ACPIU[i])
-            growfactors.update('ADIVS', cyr, self._ADIVS[i])
-            growfactors.update('AINTS', cyr, self._AINTS[i])
-            growfactors.update('AIPD', cyr, self._AIPD[i])
-            growfactors.update('ASCHCI', cyr, self._ASCHCI[i])
-            growfactors.update('ASCHCL', cyr, self._ASCHCL[i])
-            growfactors.update('ASCHEI', cyr, self._ASCHEI[i])
-            growfactors.update('ASCHEL', cyr, self._ASCHEL[i])
-            growfactors.update('ASCHF', cyr, self._ASCHF[i])
-            growfactors.update('ASOCSEC', cyr, self._ASOCSEC[i])
-            growfactors.update('ATXPY', cyr, self._ATXPY[i])
-            growfactors.update('AUCOMP', cyr, self._AUCOMP[i])
-            growfactors.update('AWAGE', cyr, self._AWAGE[i])
-            growfactors.update('ABENOTHER', cyr, self._ABENOTHER[i])
-            growfactors.update('ABENMCARE', cyr, self._ABENMCARE[i])
-            growfactors.update('ABENMCAID', cyr, self._ABENMCAID[i])
-            growfactors.update('ABENSSI', cyr, self._ABENSSI[i])
-            growfactors.update('ABENSNAP', cyr, self._ABENSNAP[i])
-            growfactors.update('ABENWIC', cyr, self._ABENWIC[i])
-            growfactors.update('ABENHOUSING', cyr, self._ABENHOUSING[i])
-            growfactors.update('ABENTANF', cyr, self._ABENTANF[i])
-            growfactors.update('ABENVET', cyr, self._ABENVET[i])
+        names = ['ABOOK', 'ACGNS', 'ACPIM', 'ACPIU', 'ADIVS', 'AINTS',
+                 'AIPD', 'ASCHCI', 'ASCHCL', 'ASCHEI', 'ASCHEL', 'ASCHF',
+                 'ASOCSEC', 'ATXPY', 'AUCOMP', 'AWAGE', 'ABENOTHER',
+                 'ABENMCARE', 'ABENMCAID', 'ABENSSI', 'ABENSNAP', 'ABENWIC',
+                 'ABENHOUSING', 'ABENTANF', 'ABENVET']
+        # one column of growth differences for each grow factor
+        diffs = np.column_stack([getattr(self, '_' + name)
+                                 for name in names])
+        growfactors.update_columns(names, self.start_year, diffs)
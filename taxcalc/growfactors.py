@@ -17,14 +17,18 @@ class GrowFactors(object):
 
     Parameters
     ----------
-    growfactors_filename: string
+    growfactors_filename: string or Pandas DataFrame
         string is name of CSV file in which grow factors reside;
+        DataFrame already contains grow factors (with the calendar years
+        either in a YEAR column or as the index), which are copied so
+        that many GrowFactors objects can be made from one DataFrame
+        without writing a CSV file for each of them;
         default value is name of file containing baseline grow factors.
 
     Raises
     ------
     ValueError:
-        if growfactors_filename is not a string.
+        if growfactors_filename is not a string or a Pandas DataFrame.
 
     Returns
     -------
@@ -60,8 +64,13 @@ class GrowFactors(object):
                 # cannot call read_egg_ function in unit tests
                 gfdf = read_egg_csv(GrowFactors.FILENAME,
                                     index_col='YEAR')  # pragma: no cover
+        elif isinstance(growfactors_filename, pd.DataFrame):
+            gfdf = growfactors_filename
+            if 'YEAR' in gfdf.columns:
+                gfdf = gfdf.set_index('YEAR')
         else:
-            raise ValueError('growfactors_filename is not a string')
+            msg = 'growfactors_filename is not a string or a DataFrame'
+            raise ValueError(msg)
         assert isinstance(gfdf, pd.DataFrame)
         # check validity of gfdf column names
         gfdf_names = set(list(gfdf))
@@ -157,3 +166,30 @@ class GrowFactors(object):
             msg = 'cannot update growfactors after they have been used'
             raise ValueError(msg)
         self.gfdf[name][year] += diff
+
+    def update_columns(self, names, first_year, diffs):
+        """
+        Add to the factors with the specified names the diffs amounts
+        for the calendar years beginning with first_year in one vectorized
+        operation.  The diffs argument is either a one-dimensional array
+        containing one amount for each year, which is added to every named
+        factor, or a two-dimensional array with one row for each year and
+        one column for each name.
+        """
+        if self.used:
+            msg = 'cannot update growfactors after they have been used'
+            raise ValueError(msg)
+        invalid = set(names) - GrowFactors.VALID_NAMES
+        if invalid:
+            msg = 'names {} not in GrowFactors.VALID_NAMES'
+            raise ValueError(msg.format(invalid))
+        diffs = np.asarray(diffs, dtype=np.float64)
+        if diffs.ndim == 1:
+            diffs = diffs[:, np.newaxis]
+        last_year = first_year + len(diffs) - 1
+        if first_year < self.first_year or last_year > self.last_year:
+            msg = 'years {}-{} not all in GrowFactors years {}-{}'
+            raise ValueError(msg.format(first_year, last_year,
+                                        self.first_year, self.last_year))
+        names = list(names)
+        self.gfdf.loc[first_year:last_year, names] += diffs
@@ -5,7 +5,10 @@ Tax-Calculator abstract base parameters class.
 # pycodestyle parameters.py
 
 import os
+import sys
+import copy
 import json
+import pickle
 import abc
 import collections as collect
 import numpy as np
@@ -22,6 +25,10 @@ class ParametersBase(object):
 
     DEFAULTS_FILENAME = None
 
+    # pickled parsed contents of each DEFAULTS_FILENAME, which are read
+    # only once
+    _DEFAULTS_CACHE = dict()
+
     @classmethod
     def default_data(cls, metadata=False, start_year=None):
         """
@@ -92,6 +99,11 @@ class ParametersBase(object):
         Called by initialize method and from some subclass methods.
         """
         if hasattr(self, '_vals'):
+            expanded = collect.OrderedDict()
+            # indexed float parameters are grouped by number of known years
+            # and by indexing rates, so that each group is inflated in one
+            # pass over the years for all of its parameters at once
+            groups = dict()
             for name, data in self._vals.items():
                 intg_val = data.get('integer_value')
                 bool_val = data.get('boolean_value')
@@ -104,11 +116,22 @@ class ParametersBase(object):
                             values = values[:known_years]
                     else:
                         index_rates = None
-                    setattr(self, name,
-                            self._expand_array(values, intg_val, bool_val,
-                                               inflate=cpi_inflated,
-                                               inflation_rates=index_rates,
-                                               num_years=self._num_years))
+                    if (cpi_inflated and not (intg_val or bool_val) and
+                            len(values) < self._num_years):
+                        key = (len(values), id(index_rates))
+                        groups.setdefault(key, (index_rates, []))
+                        groups[key][1].append(name)
+                        expanded[name] = np.array(values, np.float64)
+                    else:
+                        expanded[name] = self._expand_array(
+                            values, intg_val, bool_val,
+                            inflate=cpi_inflated,
+                            inflation_rates=index_rates,
+                            num_years=self._num_years
+                        )
+            for (num_known, _), (index_rates, names) in groups.items():
+                self._expand_group(expanded, names, num_known, index_rates)
+            self._create_param_table(expanded)
         self.set_year(self._start_year)
 
     @property
@@ -169,15 +192,92 @@ class ParametersBase(object):
             msg = 'year {} passed to set_year() must be in [{},{}] range.'
             raise ValueError(msg.format(year, self.start_year, self.end_year))
         self._current_year = year
-        year_zero_indexed = year - self._start_year
-        if hasattr(self, '_vals'):
-            for name in self._vals:
-                if isinstance(name, str):
-                    arr = getattr(self, name)
-                    setattr(self, name[1:], arr[year_zero_indexed])
+        if '_param_table' in self.__dict__:
+            # publish the current-year row of the per-year parameter table
+            # as ordinary attributes in one dictionary update, which also
+            # replaces any current-year values set since the last call
+            row = year - self._start_year
+            self.__dict__.update((name, field[row])
+                                 for name, field in self._param_views)
+
+    def __getstate__(self):
+        """
+        Return object state without the views into the parameter table,
+        which are recreated by __setstate__ (so that copy.deepcopy and
+        pickle keep each _NAME array inside the copied parameter table).
+        """
+        state = self.__dict__.copy()
+        if '_param_table' in state:
+            for name in state['_param_fields']:
+                del state['_' + name]
+            del state['_param_views']
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore object state and recreate views into the parameter table.
+        """
+        # attribute names are interned (as by setattr and pickle) so that
+        # attribute lookups can use the interpreter's fast path
+        self.__dict__.update((sys.intern(name), value)
+                             for name, value in state.items())
+        if '_param_table' in state:
+            self._set_param_views()
+
+    def __deepcopy__(self, memo):
+        """
+        Return a deep copy that shares the contents of each parameter's
+        metadata dictionary in _vals, which are replaced but never changed
+        in place, so that copying (for example, in each Calculator
+        constructor) does not deep-copy all the parameter metadata.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        memo[id(self)] = clone
+        state = self.__getstate__()
+        vals = state.pop('_vals', None)
+        state = copy.deepcopy(state, memo)
+        if vals is not None:
+            state['_vals'] = vals.__class__(
+                (name, data.copy()) for name, data in vals.items()
+            )
+        clone.__setstate__(state)
+        return clone
 
     # ----- begin private methods of ParametersBase class -----
 
+    def _create_param_table(self, expanded):
+        """
+        Store the expanded parameter arrays in a structured array that
+        has one row for each year and one field for each parameter, which
+        is named like the parameter without its leading underscore.
+        Each _NAME attribute becomes a view of the parameter's field,
+        so in-place changes made by _update go directly into the table.
+        """
+        num_years = self._num_years
+        dtype = np.dtype([(name[1:], arr.dtype, arr.shape[1:])
+                          for name, arr in expanded.items()])
+        table = np.zeros(num_years, dtype=dtype)
+        for name, arr in expanded.items():
+            table[name[1:]] = arr[:num_years]
+        self._param_fields = frozenset(dtype.names)
+        self._param_table = table
+        self._set_param_views()
+
+    def _set_param_views(self):
+        """
+        Set each _NAME attribute to a view of its parameter table field
+        and keep the (NAME, view) pairs used by set_year, whose names are
+        interned like the names set by setattr.
+        """
+        pdict = self.__dict__
+        table = pdict['_param_table']
+        views = list()
+        for name in table.dtype.names:
+            view = table[name]
+            pdict[sys.intern('_' + name)] = view
+            views.append((sys.intern(name), view))
+        pdict['_param_views'] = tuple(views)
+
     def _validate_assump_parameter_names_types(self, revision):
         """
         Check validity of assumption parameter names and parameter types
@@ -327,21 +427,34 @@ class ParametersBase(object):
         -------
         params: dictionary
             containing complete contents of DEFAULTS_FILENAME file.
+
+        Notes
+        -----
+        The file is read and parsed only once per process, and the parsed
+        contents are cached in pickled form.  Each call returns a new,
+        completely independent dictionary made by unpickling the cached
+        contents (which is faster than both copy.deepcopy and parsing the
+        file again), so callers may change it in place.
         """
         if cls.DEFAULTS_FILENAME is None:
             msg = 'DEFAULTS_FILENAME must be overridden by inheriting class'
             raise NotImplementedError(msg)
-        path = os.path.join(os.path.abspath(os.path.dirname(__file__)),
-                            cls.DEFAULTS_FILENAME)
-        if os.path.exists(path):
-            with open(path) as pfile:
-                params_dict = json.load(pfile,
-                                        object_pairs_hook=collect.OrderedDict)
-        else:
-            # cannot call read_egg_ function in unit tests
-            params_dict = read_egg_json(
-                cls.DEFAULTS_FILENAME)  # pragma: no cover
-        return params_dict
+        pickled = ParametersBase._DEFAULTS_CACHE.get(cls.DEFAULTS_FILENAME)
+        if pickled is None:
+            path = os.path.join(os.path.abspath(os.path.dirname(__file__)),
+                                cls.DEFAULTS_FILENAME)
+            if os.path.exists(path):
+                with open(path) as pfile:
+                    params_dict = json.load(
+                        pfile, object_pairs_hook=collect.OrderedDict
+                    )
+            else:
+                # cannot call read_egg_ function in unit tests
+                params_dict = read_egg_json(
+                    cls.DEFAULTS_FILENAME)  # pragma: no cover
+            pickled = pickle.dumps(params_dict, pickle.HIGHEST_PROTOCOL)
+            ParametersBase._DEFAULTS_CACHE[cls.DEFAULTS_FILENAME] = pickled
+        return pickle.loads(pickled)
 
     def _update(self, year_mods):
         """
@@ -556,16 +669,12 @@ class ParametersBase(object):
             ans = np.zeros(num_years, dtype=x.dtype)
             ans[:len(x)] = x
             if inflate:
-                extra = []
-                cur = x[-1]
-                for i in range(0, num_years - len(x)):
-                    cur *= (1. + inflation_rates[i + len(x) - 1])
-                    cur = round(cur, 2) if cur < 9e99 else 9e99
-                    extra.append(cur)
+                rows = np.zeros((num_years, 1))
+                rows[:len(x), 0] = x
+                ParametersBase._inflate_rows(rows, len(x), inflation_rates)
+                ans[len(x):] = rows[len(x):, 0]
             else:
-                extra = [float(x[-1]) for i in
-                         range(1, num_years - len(x) + 1)]
-            ans[len(x):] = extra
+                ans[len(x):] = float(x[-1])
             return ans
 
     @staticmethod
@@ -584,17 +693,48 @@ class ParametersBase(object):
         else:
             ans = np.zeros((num_years, x.shape[1]), dtype=x.dtype)
             ans[:len(x), :] = x
-            for i in range(x.shape[0], ans.shape[0]):
-                for j in range(ans.shape[1]):
-                    if inflate:
-                        cur = (ans[i - 1, j] *
-                               (1. + inflation_rates[i - 1]))
-                        cur = round(cur, 2) if cur < 9e99 else 9e99
-                        ans[i, j] = cur
-                    else:
-                        ans[i, j] = ans[i - 1, j]
+            if inflate:
+                ParametersBase._inflate_rows(ans, len(x), inflation_rates)
+            else:
+                ans[len(x):, :] = x[-1]
             return ans
 
+    @staticmethod
+    def _inflate_rows(rows, first, inflation_rates):
+        """
+        Private method called only from _expand_1D, _expand_2D and
+        _expand_group methods.
+        Fill in each row of the 2D rows array beginning with the first row
+        by inflating all columns of the previous row at once and rounding
+        to the nearest cent, which gives exactly the same values as
+        inflating each value separately.
+        """
+        for i in range(first, rows.shape[0]):
+            cur = rows[i - 1] * (1. + inflation_rates[i - 1])
+            rows[i] = np.where(cur < 9e99, np.round(cur, 2), 9e99)
+
+    def _expand_group(self, expanded, names, num_known, inflation_rates):
+        """
+        Private method called only from set_default_vals method.
+        Expand the float parameters with specified names, each of which
+        has num_known known years of values in the expanded dictionary,
+        by inflating the columns of all of them in a single 2D array.
+        """
+        widths = [expanded[name].size // num_known for name in names]
+        rows = np.zeros((self._num_years, sum(widths)))
+        col = 0
+        for name, width in zip(names, widths):
+            rows[:num_known, col:(col + width)] = (
+                expanded[name].reshape(num_known, width)
+            )
+            col += width
+        ParametersBase._inflate_rows(rows, num_known, inflation_rates)
+        col = 0
+        for name, width in zip(names, widths):
+            shape = (self._num_years,) + expanded[name].shape[1:]
+            expanded[name] = rows[:, col:(col + width)].reshape(shape).copy()
+            col += width
+
     def _indexing_rates_for_update(self, param_name,
                                    calyear, num_years_to_expand):
         """
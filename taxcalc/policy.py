@@ -5,6 +5,11 @@ Tax-Calculator federal tax policy Policy class.
 # pycodestyle policy.py
 # pylint --disable=locally-disabled policy.py
 
+import os
+import copy
+import json
+import pickle
+import hashlib
 import numpy as np
 from taxcalc.parameters import ParametersBase
 from taxcalc.growfactors import GrowFactors
@@ -48,6 +53,9 @@ class Policy(ParametersBase):
     LAST_BUDGET_YEAR = 2027  # increases by one every calendar year
     DEFAULT_NUM_YEARS = LAST_BUDGET_YEAR - JSON_START_YEAR + 1
 
+    # in-memory cache of reformed Policy objects used by the cached method
+    _CACHE = dict()
+
     def __init__(self,
                  gfactors=None,
                  start_year=JSON_START_YEAR,
@@ -223,6 +231,61 @@ class Policy(ParametersBase):
         if self.parameter_errors and raise_errors:
             raise ValueError('\n' + self.parameter_errors)
 
+    @staticmethod
+    def cached(reform=None, gfactors=None, cache_dir=None):
+        """
+        Return a Policy object that has the specified reform implemented,
+        reusing a previously constructed and validated object when the
+        same reform has already been implemented with the same grow factors.
+
+        Parameters
+        ----------
+        reform: dictionary of one or more YEAR:MODS pairs or None
+            as used by implement_reform; None or an empty dictionary
+            implies current-law policy.
+
+        gfactors: GrowFactors class instance or None
+            as used by the Policy constructor.
+
+        cache_dir: string or None
+            name of directory in which reformed Policy objects are also
+            pickled, so that they can be reused by later runs;
+            None implies only the in-memory cache is used.
+
+        Returns
+        -------
+        class instance: Policy
+            a copy of the cached object with current_year equal to
+            start_year, which can be changed without affecting the cache.
+
+        Notes
+        -----
+        Objects are cached under a hash of the reform dictionary (written
+        as JSON with sorted keys), of the grow factors and of the
+        DEFAULTS_FILENAME contents, so editing any of them creates a new
+        cache entry rather than reusing a stale one.
+        """
+        if reform is None:
+            reform = dict()
+        key = Policy._cache_key(reform, gfactors)
+        pol = Policy._CACHE.get(key)
+        if pol is None and cache_dir is not None:
+            path = os.path.join(cache_dir, 'policy_{}.pkl'.format(key))
+            if os.path.isfile(path):
+                with open(path, 'rb') as pfile:
+                    pol = pickle.load(pfile)
+        if pol is None:
+            pol = Policy(gfactors=gfactors)
+            if reform:
+                pol.implement_reform(reform)
+            if cache_dir is not None:
+                if not os.path.isdir(cache_dir):
+                    os.makedirs(cache_dir)
+                with open(path, 'wb') as pfile:
+                    pickle.dump(pol, pfile, pickle.HIGHEST_PROTOCOL)
+        Policy._CACHE[key] = pol
+        return copy.deepcopy(pol)
+
     JSON_REFORM_SUFFIXES = {
         # MARS-indexed suffixes and list index numbers
         'single': 0,
@@ -352,6 +415,38 @@ class Policy(ParametersBase):
 
     # ----- begin private methods of Policy class -----
 
+    @staticmethod
+    def _cache_key(reform, gfactors):
+        """
+        Return hexadecimal hash of the reform dictionary, the grow factors
+        and the DEFAULTS_FILENAME contents used by the cached method, and
+        of the taxcalc version and the source code of the modules that
+        construct Policy objects, so that Policy objects pickled by other
+        code are not used.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        import taxcalc
+        from taxcalc import parameters, growfactors
+        if gfactors is not None and not isinstance(gfactors, GrowFactors):
+            raise ValueError('gfactors is not None or a GrowFactors instance')
+        hasher = hashlib.sha256()
+        hasher.update(str(taxcalc.__version__).encode('utf-8'))
+        for module_path in [parameters.__file__, __file__,
+                            growfactors.__file__]:
+            with open(module_path, 'rb') as mfile:
+                hasher.update(mfile.read())
+        hasher.update(json.dumps(reform, sort_keys=True).encode('utf-8'))
+        if gfactors is None:
+            with open(GrowFactors.FILE_PATH, 'rb') as gfile:
+                hasher.update(gfile.read())
+        else:
+            hasher.update(gfactors.gfdf.to_csv().encode('utf-8'))
+        path = os.path.join(os.path.abspath(os.path.dirname(__file__)),
+                            Policy.DEFAULTS_FILENAME)
+        with open(path, 'rb') as pfile:
+            hasher.update(pfile.read())
+        return hasher.hexdigest()
+
     def _apply_clp_cpi_offset(self, cpi_offset_clp_data, num_years):
         """
         Call this method from Policy constructor
@@ -7,6 +7,12 @@ Tax-Calculator tax-filing-unit Records class.
 
 import os
 import json
+import copy
+import shutil
+import hashlib
+import inspect
+import tempfile
+from multiprocessing import shared_memory
 import numpy as np
 import pandas as pd
 from taxcalc.growfactors import GrowFactors
@@ -20,7 +26,9 @@ class Records(object):
     Parameters
     ----------
     data: string or Pandas DataFrame
-        string describes CSV file in which records data reside;
+        string describes CSV file in which records data reside or
+        describes directory containing columnar data written by the
+        Records.write_columns() static method;
         DataFrame already contains records data;
         default value is the string 'puf.csv'
         For details on how to use your own data with the Tax-Calculator,
@@ -59,6 +67,37 @@ class Records(object):
         look at the test_Calculator_using_nonstd_input()
         function in the taxcalc/tests/test_calculate.py file.
 
+    column_block: boolean
+        specifies whether or not variables are stored as rows of one
+        contiguous two-dimensional float64 array (plus one int32 array)
+        with each variable attribute being a view of its row;
+        default value is false, which stores each variable as a
+        separate array.  Assigning to a variable attribute in this
+        storage mode copies the assigned values into the variable's row.
+
+    compact: boolean
+        specifies whether or not variables are stored using the compact
+        dtypes in the Records.COMPACT_DTYPES dictionary, which come from
+        the optional compact_type in the records_variables.json file:
+        small integer variables are stored as int8 or int16, float input
+        variables whose statutory limits keep their values far below
+        $262,144 (below which float32 rounds each value by less than one
+        cent) are stored as float32, all other float variables (including
+        s006) are stored as float64, and every all-zero input variable
+        (other than FLPDYR) shares one read-only array of zeros;
+        calculated float variables remain float64 so that computed taxes
+        and marginal tax rates retain full precision;
+        default value is false; cannot be true when column_block is true.
+
+    share_zeros: boolean
+        specifies whether or not input variables that are not in the data
+        (other than FLPDYR) share one read-only array of zeros, which saves
+        memory and copying time; a shared-zeros variable can be assigned a
+        new array (for example, by Calculator.array) but cannot be changed
+        in place; default value is false.
+        Note that, except when column_block is true, calculated variables
+        are not allocated until they are first used.
+
     Raises
     ------
     ValueError:
@@ -105,6 +144,7 @@ class Records(object):
     CPS_WEIGHTS_FILENAME = 'cps_weights.csv.gz'
     CPS_RATIOS_FILENAME = None
     VAR_INFO_FILENAME = 'records_variables.json'
+    COLUMNS_METADATA_FILENAME = 'metadata.json'
 
     def __init__(self,
                  data='puf.csv',
@@ -112,37 +152,25 @@ class Records(object):
                  gfactors=GrowFactors(),
                  weights=PUF_WEIGHTS_FILENAME,
                  adjust_ratios=PUF_RATIOS_FILENAME,
-                 start_year=PUFCSV_YEAR):
+                 start_year=PUFCSV_YEAR,
+                 column_block=False,
+                 compact=False,
+                 share_zeros=False):
         # pylint: disable=too-many-arguments,too-many-locals
         self.__data_year = start_year
         # read specified data
-        self._read_data(data, exact_calculations)
-        # check that three sets of split-earnings variables have valid values
-        msg = 'expression "{0} == {0}p + {0}s" is not true for every record'
-        tol = 0.020001  # handles "%.2f" rounding errors
-        if not np.allclose(self.e00200, (self.e00200p + self.e00200s),
-                           rtol=0.0, atol=tol):
-            raise ValueError(msg.format('e00200'))
-        if not np.allclose(self.e00900, (self.e00900p + self.e00900s),
-                           rtol=0.0, atol=tol):
-            raise ValueError(msg.format('e00900'))
-        if not np.allclose(self.e02100, (self.e02100p + self.e02100s),
-                           rtol=0.0, atol=tol):
-            raise ValueError(msg.format('e02100'))
-        # check that ordinary dividends are no less than qualified dividends
-        other_dividends = np.maximum(0., self.e00600 - self.e00650)
-        if not np.allclose(self.e00600, self.e00650 + other_dividends,
-                           rtol=0.0, atol=tol):
-            msg = 'expression "e00600 >= e00650" is not true for every record'
-            raise ValueError(msg)
-        del other_dividends
-        # check that total pension income is no less than taxable pension inc
-        nontaxable_pensions = np.maximum(0., self.e01500 - self.e01700)
-        if not np.allclose(self.e01500, self.e01700 + nontaxable_pensions,
-                           rtol=0.0, atol=tol):
-            msg = 'expression "e01500 >= e01700" is not true for every record'
-            raise ValueError(msg)
-        del nontaxable_pensions
+        self._read_data(data, exact_calculations, column_block, share_zeros)
+        # check that input variables have consistent values unless the
+        # checks were done when converting the data to columnar format
+        if not self._data_were_validated:
+            self._validate_data()
+        # optionally convert variables to compact dtypes after checking data
+        self._compact = compact
+        if compact:
+            if column_block:
+                msg = 'compact and column_block cannot both be true'
+                raise ValueError(msg)
+            self._use_compact_dtypes()
         # handle grow factors
         is_correct_type = isinstance(gfactors, GrowFactors)
         if gfactors is not None and not is_correct_type:
@@ -176,6 +204,8 @@ class Records(object):
                 self.s006 = self.WT[wt_colname] * 0.01
         # specify that variable values do not include behavioral responses
         self.behavioral_responses_are_included = False
+        # records are not a combination of scenarios (see Records.tile)
+        self._tile_lengths = None
 
     @staticmethod
     def cps_constructor(data=None,
@@ -200,6 +230,195 @@ class Records(object):
                        adjust_ratios=Records.CPS_RATIOS_FILENAME,
                        start_year=Records.CPSCSV_YEAR)
 
+    @staticmethod
+    def from_template(template, gfactors=GrowFactors()):
+        """
+        Static method returns a new Records object containing the same
+        data as the template Records object, but using the specified
+        gfactors (which can be None or a GrowFactors instance) to
+        extrapolate the data.  This eliminates the need to read and check
+        the same data, sample weights and adjustment ratios for each
+        Records object:  the template's variable arrays are copied into
+        the new object and its (never modified) sample weights and
+        adjustment ratios are shared with the new object.
+        The template must not have been extrapolated beyond its data year.
+        """
+        if not isinstance(template, Records):
+            raise ValueError('template is not a Records instance')
+        if template.current_year != template.data_year:
+            msg = 'template current_year {} is not its data_year {}'
+            raise ValueError(msg.format(template.current_year,
+                                        template.data_year))
+        if gfactors is not None and not isinstance(gfactors, GrowFactors):
+            msg = 'gfactors is neither None nor a GrowFactors instance'
+            raise ValueError(msg)
+        memo = {id(template.WT): template.WT,
+                id(template.ADJ): template.ADJ}
+        if template.gfactors is not None:
+            # avoid copying template grow factors (but never put id(None)
+            # in memo, which would replace every None in the template)
+            memo[id(template.gfactors)] = gfactors
+        recs = Records.__new__(Records)
+        recs.__setstate__(copy.deepcopy(template.__getstate__(), memo))
+        recs.gfactors = gfactors
+        return recs
+
+    @staticmethod
+    def tile(records_list):
+        """
+        Static method returns a new Records object containing the records
+        of each Records object in records_list one after the other, so
+        that several scenarios (for example, differently perturbed copies
+        of the same data) are evaluated by a single pass through each
+        tax-calculation function.  The tile_lengths property of the new
+        object contains the number of records in each scenario, and the
+        Calculator.scenario_arrays method splits a variable into its
+        scenario parts.  All the Records objects must be in the same year
+        and use the same storage mode.  The new object uses the grow
+        factors and adjustment ratios of the first Records object, so all
+        the Records objects should use the same grow factors.
+        Use a ScenarioPolicy object to specify policy parameter values
+        that differ across scenarios.
+        """
+        # pylint: disable=protected-access
+        if not records_list or not all(isinstance(recs, Records)
+                                       for recs in records_list):
+            msg = 'records_list is not a nonempty list of Records instances'
+            raise ValueError(msg)
+        first = records_list[0]
+        for recs in records_list[1:]:
+            if (recs.data_year != first.data_year or
+                    recs.current_year != first.current_year):
+                raise ValueError('records_list years are not all the same')
+            if (recs.column_block != first.column_block or
+                    recs._compact != first._compact or
+                    (recs.WT.size > 0) != (first.WT.size > 0)):
+                msg = 'records_list storage modes are not all the same'
+                raise ValueError(msg)
+            if (recs.behavioral_responses_are_included !=
+                    first.behavioral_responses_are_included):
+                msg = 'records_list behavioral responses are not all the same'
+                raise ValueError(msg)
+        states = [recs.__getstate__() for recs in records_list]
+        state = dict(states[0])
+        tile_lengths = tuple(recs.array_length for recs in records_list)
+        state['_Records__dim'] = sum(tile_lengths)
+        state['_Records__index'] = pd.RangeIndex(sum(tile_lengths))
+        state['_tile_lengths'] = tile_lengths
+        state['_data_hash'] = None
+        state['_shared_zeros'] = dict()
+        if first.column_block:
+            for block_name in ('_float_block', '_int_block'):
+                state[block_name] = np.concatenate(
+                    [recs_state[block_name] for recs_state in states], axis=1
+                )
+        if first.WT.size > 0:
+            state['WT'] = pd.concat([recs.WT for recs in records_list],
+                                    ignore_index=True)
+        shared_zero_vars = list()
+        variables = Records.USABLE_READ_VARS | Records.CALCULATED_VARS
+        for varname in variables:
+            if not any(varname in recs_state for recs_state in states):
+                continue  # column-block or unallocated calculated variable
+            parts = [getattr(recs, varname) for recs in records_list]
+            if isinstance(parts[0], pd.Series):
+                state[varname] = pd.concat(parts, ignore_index=True)
+            elif not any(part.flags.writeable for part in parts):
+                shared_zero_vars.append((varname, parts[0].dtype))
+            else:
+                state[varname] = np.concatenate(parts)
+        recs = Records.__new__(Records)
+        recs.__setstate__(state)
+        for varname, dtype in shared_zero_vars:
+            setattr(recs, varname, recs._shared_zero_array(dtype))
+        return recs
+
+    @staticmethod
+    def write_columns(data, dirpath):
+        """
+        Static method that writes the data argument, which is either a
+        string describing a CSV file or a Pandas DataFrame, to the dirpath
+        directory in a columnar binary format that can be specified as the
+        data argument of the Records class constructor.  The format is one
+        numpy .npy file for each usable input variable, whose dtype is
+        taken from the records_variables.json file, plus a metadata.json
+        file that records the variable types, the ignored variables, a hash
+        of the data (used by the seek_year method), the fact that the
+        data passed the constructor's validity checks, and, when data is a
+        CSV file, that file's size and modification time (used by the
+        columns_match_source method).
+        A Records object constructed from the directory memory-maps each
+        column file (copy-on-write) instead of parsing CSV text and skips
+        the validity checks, so loading is fast and processes reading the
+        same directory share the operating system's page cache.
+        Raises ValueError if the data fail the validity checks.
+        """
+        if Records.INTEGER_VARS is None:
+            Records.read_var_info()
+        source = None
+        if isinstance(data, pd.DataFrame):
+            taxdf = data
+        elif isinstance(data, str) and os.path.isfile(data):
+            source = Records._source_stamp(data)
+            taxdf = pd.read_csv(data)
+        else:
+            msg = 'data is neither a CSV filename nor a Pandas DataFrame'
+            raise ValueError(msg)
+        # apply the Records constructor's validity checks to the data
+        Records(data=taxdf, gfactors=None, weights=None, adjust_ratios=None)
+        variables = dict()
+        columns = dict()
+        ignored_vars = list()
+        if not os.path.isdir(dirpath):
+            os.makedirs(dirpath)
+        for varname in list(taxdf.columns.values):
+            if varname not in Records.USABLE_READ_VARS:
+                ignored_vars.append(varname)
+                continue
+            if varname in Records.INTEGER_READ_VARS:
+                dtype = np.int32
+            else:
+                dtype = np.float64
+            column = taxdf[varname].values.astype(dtype)
+            np.save(os.path.join(dirpath, '{}.npy'.format(varname)), column)
+            variables[varname] = np.dtype(dtype).name
+            columns[varname] = column
+        metadata = {'array_length': len(taxdf.index),
+                    'variables': variables,
+                    'ignored_vars': ignored_vars,
+                    'validated': True,
+                    'data_hash': Records._hash_arrays(columns),
+                    'source': source}
+        mpath = os.path.join(dirpath, Records.COLUMNS_METADATA_FILENAME)
+        with open(mpath, 'w') as mfile:
+            json.dump(metadata, mfile, indent=1, sort_keys=True)
+
+    @staticmethod
+    def columns_match_source(csv_path, dirpath):
+        """
+        Static method that returns True if the dirpath directory contains
+        columnar data written by the write_columns method from the CSV
+        file csv_path in its current state (that is, the file has the size
+        and modification time it had when the columns were written), and
+        returns False if the columns are missing or stale and need to be
+        written again.
+        """
+        mpath = os.path.join(dirpath, Records.COLUMNS_METADATA_FILENAME)
+        if not os.path.isfile(mpath) or not os.path.isfile(csv_path):
+            return False
+        with open(mpath) as mfile:
+            metadata = json.load(mfile)
+        return metadata.get('source') == Records._source_stamp(csv_path)
+
+    @staticmethod
+    def _source_stamp(csv_path):
+        """
+        Return dictionary identifying the current state of the csv_path file
+        for the columns_match_source method.
+        """
+        stat = os.stat(csv_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
     @property
     def data_year(self):
         """
@@ -221,6 +440,176 @@ class Records(object):
         """
         return self.__dim
 
+    @property
+    def tile_lengths(self):
+        """
+        Tuple containing the number of records in each of the scenarios
+        that were combined by Records.tile (or containing only
+        array_length if the Records object was not made by Records.tile).
+        """
+        if self._tile_lengths is None:
+            return (self.__dim,)
+        return self._tile_lengths
+
+    @property
+    def column_block(self):
+        """
+        True if variables are stored as rows of contiguous column blocks.
+        """
+        return self._column_rows is not None
+
+    def column_matrix(self, variable_list):
+        """
+        Return two-dimensional numpy array with one column for each variable
+        in variable_list when all the variables are stored in the same
+        column block; otherwise return None.  The returned array is a
+        read-only view of the block when the variables occupy consecutive
+        block rows and is a copy made by one gather operation otherwise.
+        """
+        if self._column_rows is None or not variable_list:
+            return None
+        locations = [self._column_rows.get(vname) for vname in variable_list]
+        if None in locations:
+            return None
+        block_names = set(loc[0] for loc in locations)
+        if len(block_names) != 1:
+            return None
+        block = getattr(self, block_names.pop())
+        rows = [loc[1] for loc in locations]
+        first = rows[0]
+        if rows == list(range(first, first + len(rows))):
+            matrix = block[first:first + len(rows)].T
+            matrix.flags.writeable = False
+            return matrix
+        return block[rows].T
+
+    def __setattr__(self, name, value):
+        """
+        Copy values assigned to a column-block variable into its block row
+        so that the variable attribute remains a view of the block.
+        """
+        column_rows = self.__dict__.get('_column_rows')
+        if column_rows is not None and name in column_rows:
+            column = self.__dict__[name]
+            if value is not column:
+                column[:] = value
+        else:
+            object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        """
+        Return state without the column-block variable views, which are
+        rebuilt from the (copied or unpickled) blocks by __setstate__.
+        """
+        state = self.__dict__.copy()
+        if self._column_rows is not None:
+            for varname in self._column_rows:
+                del state[varname]
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore state and rebuild any column-block variable views.
+        The variable information used to allocate calculated variables
+        (see __getattr__) is read if no Records object has been made in
+        this process, as in a spawned worker process (see
+        Calculator.run_years).
+        """
+        if Records.INTEGER_VARS is None:
+            Records.read_var_info()
+        self.__dict__.update(state)
+        if self._column_rows is not None:
+            self._set_column_views()
+        for zeros in self._shared_zeros.values():
+            zeros.flags.writeable = False
+
+    def __getattr__(self, name):
+        """
+        Allocate a calculated variable when it is first used.
+        This method is called only when name is not an instance attribute.
+        """
+        if ('_Records__dim' in self.__dict__ and
+                Records.CALCULATED_VARS is not None and
+                name in Records.CALCULATED_VARS):
+            if self._compact:
+                dtype = Records.COMPACT_DTYPES[name]
+            elif name in Records.INTEGER_VARS:
+                dtype = np.int32
+            else:
+                dtype = np.float64
+            var = np.zeros(self.array_length, dtype=dtype)
+            object.__setattr__(self, name, var)
+            return var
+        raise AttributeError('{} object has no attribute {}'.format(
+            self.__class__.__name__, name))
+
+    def to_shared_memory(self):
+        """
+        Return (shared_memory, handle) pair, where shared_memory is a new
+        multiprocessing.shared_memory.SharedMemory block containing a copy
+        of each writeable variable array (or, when using column blocks, of
+        each block) and handle is a small picklable object that is used by
+        Records.from_shared_memory in any process to make a Records object
+        whose variable arrays are views of the shared memory block.
+        The caller must close and unlink shared_memory when no process
+        uses the block any longer.
+        """
+        state = self.__getstate__()
+        layout = dict()
+        size = 0
+        for name, value in state.items():
+            if isinstance(value, np.ndarray) and value.flags.writeable:
+                size = -(-size // 64) * 64  # align each array on 64 bytes
+                layout[name] = (size, value.dtype.str, value.shape)
+                size += value.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, (offset, dtype, shape) in layout.items():
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf,
+                              offset=offset)
+            view[...] = state.pop(name)
+            del view
+        return shm, (shm.name, layout, state)
+
+    @staticmethod
+    def from_shared_memory(handle):
+        """
+        Static method returns (records, shared_memory) pair, where records
+        is a Records object whose variable arrays are views of the shared
+        memory block described by the handle returned by the
+        to_shared_memory method, and shared_memory is the attached
+        SharedMemory object, which must be kept open while records is used.
+        """
+        (name, layout, state) = handle
+        shm = shared_memory.SharedMemory(name=name)
+        state = dict(state)
+        for varname, (offset, dtype, shape) in layout.items():
+            state[varname] = np.ndarray(shape, dtype=dtype, buffer=shm.buf,
+                                        offset=offset)
+        recs = Records.__new__(Records)
+        recs.__setstate__(state)
+        return recs, shm
+
+    def scratch_copy(self):
+        """
+        Return a copy of this Records object for temporary calculations.
+        Calculations may change calculated variables in place, so these
+        arrays (or, when using column blocks, the blocks) are copied,
+        while the input variables and all other arrays are shared with
+        this object, so the copy is much cheaper than a deep copy.
+        Input variables must not be changed in place using the copy.
+        """
+        state = self.__getstate__()
+        if self._column_rows is not None:
+            state['_float_block'] = self._float_block.copy()
+            state['_int_block'] = self._int_block.copy()
+        else:
+            for varname in Records.CALCULATED_VARS:
+                if varname in state:
+                    state[varname] = state[varname].copy()
+        recs = Records.__new__(Records)
+        recs.__setstate__(state)
+        return recs
+
     def increment_year(self):
         """
         Add one to current year.
@@ -249,6 +638,80 @@ class Records(object):
         self.__current_year = new_current_year
         self.FLPDYR.fill(new_current_year)
 
+    def seek_year(self, year, checkpoint_dir):
+        """
+        Extrapolate the data to the specified calendar year, which cannot
+        be earlier than current_year, with the same results as calling
+        increment_year until current_year is year.  However, when an
+        earlier call has written a checkpoint for the same data, grow
+        factors, adjustment ratios and storage dtypes using the same
+        extrapolation code (see _checkpoint_key), the extrapolated
+        input variables are memory-mapped (copy-on-write) from the
+        checkpoint files in checkpoint_dir, skipping the _blowup and _adjust
+        calculations for all the intervening years.  Otherwise, the data
+        are extrapolated one year at a time and a checkpoint is written
+        for each year.
+        The data are identified by a hash of the input variables computed
+        when current_year is data_year (or read from the metadata of the
+        columnar data directory), which is kept by copies of this object,
+        so the input variables must not have been changed since then
+        except by extrapolation.
+        Raises ValueError if year is earlier than current_year or if the
+        data hash is not known and current_year is not data_year.
+        """
+        if year < self.__current_year:
+            msg = 'year {} is earlier than current_year {}'
+            raise ValueError(msg.format(year, self.__current_year))
+        assert self.behavioral_responses_are_included is False
+        if self._data_hash is None:
+            if self.__current_year != self.__data_year:
+                msg = 'data hash is unknown when current_year is not data_year'
+                raise ValueError(msg)
+            self._data_hash = Records._hash_arrays(
+                {varname: getattr(self, varname)
+                 for varname in Records.USABLE_READ_VARS}
+            )
+        key = self._checkpoint_key()
+        aged_vars = [varname for varname in Records.AGED_VARS
+                     if getattr(self, varname).flags.writeable]
+        # find the latest checkpoint no later than year
+        start_year = self.__current_year
+        for cyear in range(year, self.__current_year, -1):
+            path = os.path.join(checkpoint_dir,
+                                'records_{}_{}'.format(key, cyear))
+            if os.path.isdir(path):
+                for varname in aged_vars:
+                    vpath = os.path.join(path, '{}.npy'.format(varname))
+                    # a variable is not saved when it shares a read-only
+                    # zeros array in the Records object that saved it, in
+                    # which case its value remains zero
+                    if os.path.isfile(vpath):
+                        column = np.load(vpath, mmap_mode='c')
+                        setattr(self, varname, np.asarray(column))
+                start_year = cyear
+                self.__current_year = cyear
+                if self.WT.size > 0:
+                    wt_colname = 'WT{}'.format(cyear)
+                    self.s006 = self.WT[wt_colname] * 0.01
+                break
+        # extrapolate the remaining years and write their checkpoints
+        for cyear in range(start_year + 1, year + 1):
+            self.increment_year()
+            if not os.path.isdir(checkpoint_dir):
+                os.makedirs(checkpoint_dir)
+            path = os.path.join(checkpoint_dir,
+                                'records_{}_{}'.format(key, cyear))
+            # write each checkpoint in a temporary directory that is then
+            # renamed, so that no process reads an incomplete checkpoint
+            tmp_path = tempfile.mkdtemp(dir=checkpoint_dir)
+            for varname in aged_vars:
+                np.save(os.path.join(tmp_path, '{}.npy'.format(varname)),
+                        getattr(self, varname))
+            try:
+                os.rename(tmp_path, path)
+            except OSError:  # checkpoint written by another process
+                shutil.rmtree(tmp_path)
+
     @staticmethod
     def read_var_info():
         """
@@ -282,6 +745,16 @@ class Records(object):
                                    FIXED_CALCULATED_VARS)
         Records.CHANGING_CALCULATED_VARS = FLOAT_CALCULATED_VARS
         Records.INTEGER_VARS = Records.INTEGER_READ_VARS | INT_CALCULATED_VARS
+        Records.COMPACT_DTYPES = dict()
+        for iotype in ['read', 'calc']:
+            for varname, varinfo in vardict[iotype].items():
+                if 'compact_type' in varinfo:
+                    dtype = varinfo['compact_type']
+                elif varinfo['type'] == 'int':
+                    dtype = 'int32'
+                else:
+                    dtype = 'float64'
+                Records.COMPACT_DTYPES[varname] = np.dtype(dtype)
         return vardict
 
     # specify various sets of variable names
@@ -291,139 +764,160 @@ class Records(object):
     CALCULATED_VARS = None
     CHANGING_CALCULATED_VARS = None
     INTEGER_VARS = None
+    COMPACT_DTYPES = None
 
     # ----- begin private methods of Records class -----
 
+    # variables extrapolated by _blowup method using a single grow factor
+    BLOWUP_FACTOR_VARS = [
+        ('AWAGE', ['e00200', 'e00200p', 'e00200s', 'pencon_p', 'pencon_s']),
+        ('AINTS', ['e00300', 'e00400']),
+        ('ADIVS', ['e00600', 'e00650']),
+        ('ATXPY', ['e00700', 'e00800', 'e01400', 'e01500', 'e01700',
+                   'e03150', 'e03210', 'e03220', 'e03230', 'e03240',
+                   'e03300', 'e03400', 'e03500', 'e07240', 'e07260',
+                   'p08000', 'e09700', 'e09800', 'e09900', 'e11200',
+                   'e18400', 'e18500', 'e19800', 'e20100', 'e20400',
+                   'g20500', 'e07600', 'e32800', 'e58990', 'e62900',
+                   'e87530', 'e87521', 'cmbtp']),
+        ('ACGNS', ['e01100', 'e01200', 'p22250', 'p23250', 'e24515',
+                   'e24518']),
+        ('ASCHF', ['e02100', 'e02100p', 'e02100s']),
+        ('AUCOMP', ['e02300']),
+        ('ASOCSEC', ['e02400']),
+        ('ACPIM', ['e03270', 'e03290', 'e17500']),
+        ('ABOOK', ['e07300', 'e07400']),
+        ('AIPD', ['e19200']),
+        ('ASCHEI', ['e26270', 'e27200', 'k1bx14p', 'k1bx14s']),
+        ('ABENOTHER', ['other_ben']),
+        ('ABENMCARE', ['mcare_ben']),
+        ('ABENMCAID', ['mcaid_ben']),
+        ('ABENSSI', ['ssi_ben']),
+        ('ABENSNAP', ['snap_ben']),
+        ('ABENWIC', ['wic_ben']),
+        ('ABENHOUSING', ['housing_ben']),
+        ('ABENTANF', ['tanf_ben']),
+        ('ABENVET', ['vet_ben'])
+    ]
+
+    # variables changed by the _blowup and _adjust methods, which are
+    # saved in the checkpoints written by the seek_year method
+    AGED_VARS = ([varname for _, varnames in BLOWUP_FACTOR_VARS
+                  for varname in varnames] +
+                 ['e00900s', 'e00900p', 'e00900', 'e02000', 'e00300'])
+
+    # version of the checkpoints written by the seek_year method, which
+    # must be increased whenever their files change in a way that is not
+    # captured by the other contents of the checkpoint key
+    CHECKPOINT_FORMAT = 1
+
+    def _checkpoint_key(self):
+        """
+        Return hexadecimal hash that identifies the checkpoints written by
+        the seek_year method for this object, which covers the data hash,
+        the grow factors, the adjustment ratios and the storage dtypes, as
+        well as the checkpoint format, the taxcalc version, the aged
+        variables and the source code of the methods that extrapolate them,
+        so that checkpoints written by other code are not used.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        import taxcalc
+        hasher = hashlib.sha256()
+        hasher.update('{}:{}'.format(Records.CHECKPOINT_FORMAT,
+                                     taxcalc.__version__).encode('utf-8'))
+        hasher.update(json.dumps([Records.BLOWUP_FACTOR_VARS,
+                                  Records.AGED_VARS]).encode('utf-8'))
+        for method in [Records.increment_year, Records._blowup,
+                       Records._adjust, GrowFactors.factor_value]:
+            hasher.update(inspect.getsource(method).encode('utf-8'))
+        hasher.update(self._data_hash.encode('utf-8'))
+        if self.gfactors is not None:
+            hasher.update(self.gfactors.gfdf.to_csv().encode('utf-8'))
+        hasher.update(self.ADJ.to_csv().encode('utf-8'))
+        hasher.update(str(self._compact).encode('utf-8'))
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _hash_arrays(arrays):
+        """
+        Return hexadecimal hash of the names, dtypes and values of the
+        arrays in the arrays dictionary.
+        """
+        hasher = hashlib.sha256()
+        for name in sorted(arrays):
+            array = np.ascontiguousarray(arrays[name])
+            header = '{}:{}'.format(name, array.dtype.str)
+            hasher.update(header.encode('utf-8'))
+            hasher.update(array.data)
+        return hasher.hexdigest()
+
     def _blowup(self, year):
         """
         Apply to variables the grow factors for specified calendar year.
         """
-        # pylint: disable=too-many-locals,too-many-statements
-        AWAGE = self.gfactors.factor_value('AWAGE', year)
-        AINTS = self.gfactors.factor_value('AINTS', year)
-        ADIVS = self.gfactors.factor_value('ADIVS', year)
-        ATXPY = self.gfactors.factor_value('ATXPY', year)
+        if self._column_rows is None:
+            for fname, varnames in Records.BLOWUP_FACTOR_VARS:
+                factor = self.gfactors.factor_value(fname, year)
+                for varname in varnames:
+                    var = getattr(self, varname)
+                    if var.flags.writeable:  # skip shared zeros
+                        var *= factor
+        else:
+            # one broadcast multiply of the leading rows of the float block
+            factor = dict()
+            for fname, _ in Records.BLOWUP_FACTOR_VARS:
+                factor[fname] = self.gfactors.factor_value(fname, year)
+            fvector = np.array([factor[fname]
+                                for fname in self._blowup_row_factors])
+            self._float_block[:len(fvector)] *= fvector[:, np.newaxis]
+        # variables whose grow factor depends on the sign of their value
         ASCHCI = self.gfactors.factor_value('ASCHCI', year)
         ASCHCL = self.gfactors.factor_value('ASCHCL', year)
-        ACGNS = self.gfactors.factor_value('ACGNS', year)
         ASCHEI = self.gfactors.factor_value('ASCHEI', year)
         ASCHEL = self.gfactors.factor_value('ASCHEL', year)
-        ASCHF = self.gfactors.factor_value('ASCHF', year)
-        AUCOMP = self.gfactors.factor_value('AUCOMP', year)
-        ASOCSEC = self.gfactors.factor_value('ASOCSEC', year)
-        ACPIM = self.gfactors.factor_value('ACPIM', year)
-        ABOOK = self.gfactors.factor_value('ABOOK', year)
-        AIPD = self.gfactors.factor_value('AIPD', year)
-        self.e00200 *= AWAGE
-        self.e00200p *= AWAGE
-        self.e00200s *= AWAGE
-        self.pencon_p *= AWAGE
-        self.pencon_s *= AWAGE
-        self.e00300 *= AINTS
-        self.e00400 *= AINTS
-        self.e00600 *= ADIVS
-        self.e00650 *= ADIVS
-        self.e00700 *= ATXPY
-        self.e00800 *= ATXPY
-        self.e00900s[:] = np.where(self.e00900s >= 0,
-                                   self.e00900s * ASCHCI,
-                                   self.e00900s * ASCHCL)
-        self.e00900p[:] = np.where(self.e00900p >= 0,
-                                   self.e00900p * ASCHCI,
-                                   self.e00900p * ASCHCL)
-        self.e00900[:] = self.e00900p + self.e00900s
-        self.e01100 *= ACGNS
-        self.e01200 *= ACGNS
-        self.e01400 *= ATXPY
-        self.e01500 *= ATXPY
-        self.e01700 *= ATXPY
-        self.e02000[:] = np.where(self.e02000 >= 0,
-                                  self.e02000 * ASCHEI,
-                                  self.e02000 * ASCHEL)
-        self.e02100 *= ASCHF
-        self.e02100p *= ASCHF
-        self.e02100s *= ASCHF
-        self.e02300 *= AUCOMP
-        self.e02400 *= ASOCSEC
-        self.e03150 *= ATXPY
-        self.e03210 *= ATXPY
-        self.e03220 *= ATXPY
-        self.e03230 *= ATXPY
-        self.e03270 *= ACPIM
-        self.e03240 *= ATXPY
-        self.e03290 *= ACPIM
-        self.e03300 *= ATXPY
-        self.e03400 *= ATXPY
-        self.e03500 *= ATXPY
-        self.e07240 *= ATXPY
-        self.e07260 *= ATXPY
-        self.e07300 *= ABOOK
-        self.e07400 *= ABOOK
-        self.p08000 *= ATXPY
-        self.e09700 *= ATXPY
-        self.e09800 *= ATXPY
-        self.e09900 *= ATXPY
-        self.e11200 *= ATXPY
-        # ITEMIZED DEDUCTIONS
-        self.e17500 *= ACPIM
-        self.e18400 *= ATXPY
-        self.e18500 *= ATXPY
-        self.e19200 *= AIPD
-        self.e19800 *= ATXPY
-        self.e20100 *= ATXPY
-        self.e20400 *= ATXPY
-        self.g20500 *= ATXPY
-        # CAPITAL GAINS
-        self.p22250 *= ACGNS
-        self.p23250 *= ACGNS
-        self.e24515 *= ACGNS
-        self.e24518 *= ACGNS
-        # SCHEDULE E
-        self.e26270 *= ASCHEI
-        self.e27200 *= ASCHEI
-        self.k1bx14p *= ASCHEI
-        self.k1bx14s *= ASCHEI
-        # MISCELLANOUS SCHEDULES
-        self.e07600 *= ATXPY
-        self.e32800 *= ATXPY
-        self.e58990 *= ATXPY
-        self.e62900 *= ATXPY
-        self.e87530 *= ATXPY
-        self.e87521 *= ATXPY
-        self.cmbtp *= ATXPY
-        # BENEFITS
-        self.other_ben *= self.gfactors.factor_value('ABENOTHER', year)
-        self.mcare_ben *= self.gfactors.factor_value('ABENMCARE', year)
-        self.mcaid_ben *= self.gfactors.factor_value('ABENMCAID', year)
-        self.ssi_ben *= self.gfactors.factor_value('ABENSSI', year)
-        self.snap_ben *= self.gfactors.factor_value('ABENSNAP', year)
-        self.wic_ben *= self.gfactors.factor_value('ABENWIC', year)
-        self.housing_ben *= self.gfactors.factor_value('ABENHOUSING', year)
-        self.tanf_ben *= self.gfactors.factor_value('ABENTANF', year)
-        self.vet_ben *= self.gfactors.factor_value('ABENVET', year)
+        if self.e00900s.flags.writeable:
+            self.e00900s[:] = np.where(self.e00900s >= 0,
+                                       self.e00900s * ASCHCI,
+                                       self.e00900s * ASCHCL)
+        if self.e00900p.flags.writeable:
+            self.e00900p[:] = np.where(self.e00900p >= 0,
+                                       self.e00900p * ASCHCI,
+                                       self.e00900p * ASCHCL)
+        if self.e00900.flags.writeable:
+            self.e00900[:] = self.e00900p + self.e00900s
+        if self.e02000.flags.writeable:
+            self.e02000[:] = np.where(self.e02000 >= 0,
+                                      self.e02000 * ASCHEI,
+                                      self.e02000 * ASCHEL)
 
     def _adjust(self, year):
         """
         Adjust value of income variables to match SOI distributions
         Note: adjustment must leave variables as numpy.ndarray type
         """
-        if self.ADJ.size > 0:
+        if self.ADJ.size > 0 and self.e00300.flags.writeable:
             # Interest income
             self.e00300 *= self.ADJ['INT{}'.format(year)][self.agi_bin].values
 
-    def _read_data(self, data, exact_calcs):
+    def _read_data(self, data, exact_calcs, column_block, share_zeros):
         """
         Read Records data from file or use specified DataFrame as data.
         Specifies exact array depending on boolean value of exact_calcs.
+        Stores variables in column blocks if column_block is True.
+        Unread variables share a zeros array if share_zeros is True.
         """
         # pylint: disable=too-many-statements,too-many-branches
         if Records.INTEGER_VARS is None:
             Records.read_var_info()
         # read specified data
+        self._data_were_validated = False
+        self._data_hash = None  # computed by seek_year unless read here
         if isinstance(data, pd.DataFrame):
             taxdf = data
         elif isinstance(data, str):
-            if os.path.isfile(data):
+            if os.path.isdir(data):
+                taxdf = self._read_columns(data)
+            elif os.path.isfile(data):
                 taxdf = pd.read_csv(data)
             else:
                 # cannot call read_egg_ function in unit tests
@@ -431,22 +925,39 @@ class Records(object):
         else:
             msg = 'data is neither a string nor a Pandas DataFrame'
             raise ValueError(msg)
-        self.__dim = len(taxdf.index)
-        self.__index = taxdf.index
-        # create class variables using taxdf column names
-        READ_VARS = set()
-        self.IGNORED_VARS = set()
-        for varname in list(taxdf.columns.values):
-            if varname in Records.USABLE_READ_VARS:
-                READ_VARS.add(varname)
-                if varname in Records.INTEGER_READ_VARS:
-                    setattr(self, varname,
-                            taxdf[varname].astype(np.int32).values)
+        self._column_rows = None
+        self._shared_zeros = dict()
+        self._compact = False
+        if isinstance(taxdf, pd.DataFrame):
+            self.__dim = len(taxdf.index)
+            self.__index = taxdf.index
+            if column_block:
+                self._create_column_blocks()
+            # create class variables using taxdf column names
+            READ_VARS = set()
+            self.IGNORED_VARS = set()
+            for varname in list(taxdf.columns.values):
+                if varname in Records.USABLE_READ_VARS:
+                    READ_VARS.add(varname)
+                    if column_block:
+                        setattr(self, varname, taxdf[varname].values)
+                    elif varname in Records.INTEGER_READ_VARS:
+                        setattr(self, varname,
+                                taxdf[varname].astype(np.int32).values)
+                    else:
+                        setattr(self, varname,
+                                taxdf[varname].astype(np.float64).values)
                 else:
-                    setattr(self, varname,
-                            taxdf[varname].astype(np.float64).values)
-            else:
-                self.IGNORED_VARS.add(varname)
+                    self.IGNORED_VARS.add(varname)
+        else:
+            # taxdf is dictionary of memory-mapped columns
+            self.__dim = taxdf.pop('_array_length')
+            self.__index = pd.RangeIndex(self.__dim)
+            if column_block:
+                self._create_column_blocks()
+            READ_VARS = set(taxdf.keys())
+            for varname, column in taxdf.items():
+                setattr(self, varname, column)
         # check that MUST_READ_VARS are all present in taxdf
         if not Records.MUST_READ_VARS.issubset(READ_VARS):
             msg = 'Records data missing one or more MUST_READ_VARS'
@@ -454,15 +965,21 @@ class Records(object):
         # delete intermediate taxdf object
         del taxdf
         # create other class variables that are set to all zeros
+        # (calculated variables are created when first used by __getattr__)
         UNREAD_VARS = Records.USABLE_READ_VARS - READ_VARS
-        ZEROED_VARS = Records.CALCULATED_VARS | UNREAD_VARS
+        ZEROED_VARS = UNREAD_VARS
+        if column_block:
+            ZEROED_VARS = set()  # block rows are already zero
         for varname in ZEROED_VARS:
             if varname in Records.INTEGER_VARS:
-                setattr(self, varname,
-                        np.zeros(self.array_length, dtype=np.int32))
+                dtype = np.dtype(np.int32)
+            else:
+                dtype = np.dtype(np.float64)
+            if share_zeros and varname != 'FLPDYR':
+                setattr(self, varname, self._shared_zero_array(dtype))
             else:
                 setattr(self, varname,
-                        np.zeros(self.array_length, dtype=np.float64))
+                        np.zeros(self.array_length, dtype=dtype))
         # check for valid MARS values
         if not np.all(np.logical_and(np.greater_equal(self.MARS, 1),
                                      np.less_equal(self.MARS, 5))):
@@ -481,14 +998,156 @@ class Records(object):
         del UNREAD_VARS
         del ZEROED_VARS
 
+    def _read_columns(self, dirpath):
+        """
+        Return dictionary of columns in dirpath directory written by the
+        Records.write_columns() method, with each column memory-mapped
+        in copy-on-write mode so that extrapolating the data does not
+        change the column files.  The dictionary also contains the
+        array length under the '_array_length' key.
+        """
+        mpath = os.path.join(dirpath, Records.COLUMNS_METADATA_FILENAME)
+        if not os.path.isfile(mpath):
+            msg = 'data directory {} does not contain a {} file'
+            raise ValueError(msg.format(dirpath,
+                                        Records.COLUMNS_METADATA_FILENAME))
+        with open(mpath) as mfile:
+            metadata = json.load(mfile)
+        columns = dict()
+        for varname, dtype_name in metadata['variables'].items():
+            if varname not in Records.USABLE_READ_VARS:
+                msg = 'data directory variable {} is not a usable variable'
+                raise ValueError(msg.format(varname))
+            if varname in Records.INTEGER_READ_VARS:
+                dtype = np.dtype(np.int32)
+            else:
+                dtype = np.dtype(np.float64)
+            if np.dtype(dtype_name) != dtype:
+                msg = 'data directory variable {} has type {} not {}'
+                raise ValueError(msg.format(varname, dtype_name, dtype.name))
+            column = np.load(os.path.join(dirpath, '{}.npy'.format(varname)),
+                             mmap_mode='c')
+            if column.shape != (metadata['array_length'],):
+                msg = 'data directory variable {} has wrong length'
+                raise ValueError(msg.format(varname))
+            columns[varname] = np.asarray(column)
+        columns['_array_length'] = metadata['array_length']
+        self.IGNORED_VARS = set(metadata['ignored_vars'])
+        self._data_were_validated = metadata['validated']
+        self._data_hash = metadata.get('data_hash')
+        return columns
+
+    def _validate_data(self):
+        """
+        Raise ValueError if input variables do not have consistent values.
+        """
+        # check that three sets of split-earnings variables have valid values
+        msg = 'expression "{0} == {0}p + {0}s" is not true for every record'
+        tol = 0.020001  # handles "%.2f" rounding errors
+        if not np.allclose(self.e00200, (self.e00200p + self.e00200s),
+                           rtol=0.0, atol=tol):
+            raise ValueError(msg.format('e00200'))
+        if not np.allclose(self.e00900, (self.e00900p + self.e00900s),
+                           rtol=0.0, atol=tol):
+            raise ValueError(msg.format('e00900'))
+        if not np.allclose(self.e02100, (self.e02100p + self.e02100s),
+                           rtol=0.0, atol=tol):
+            raise ValueError(msg.format('e02100'))
+        # check that ordinary dividends are no less than qualified dividends
+        other_dividends = np.maximum(0., self.e00600 - self.e00650)
+        if not np.allclose(self.e00600, self.e00650 + other_dividends,
+                           rtol=0.0, atol=tol):
+            msg = 'expression "e00600 >= e00650" is not true for every record'
+            raise ValueError(msg)
+        del other_dividends
+        # check that total pension income is no less than taxable pension inc
+        nontaxable_pensions = np.maximum(0., self.e01500 - self.e01700)
+        if not np.allclose(self.e01500, self.e01700 + nontaxable_pensions,
+                           rtol=0.0, atol=tol):
+            msg = 'expression "e01500 >= e01700" is not true for every record'
+            raise ValueError(msg)
+        del nontaxable_pensions
+
+    def _use_compact_dtypes(self):
+        """
+        Convert each variable to its Records.COMPACT_DTYPES dtype and make
+        every all-zero input variable other than FLPDYR refer to a shared
+        read-only array of zeros.  A shared-zeros variable must be replaced
+        (for example, by Calculator.array) rather than changed in place.
+        """
+        self._shared_zeros = dict()
+        allocated_calc_vars = Records.CALCULATED_VARS & set(self.__dict__)
+        for varname in Records.USABLE_READ_VARS | allocated_calc_vars:
+            var = getattr(self, varname)
+            dtype = Records.COMPACT_DTYPES[varname]
+            if (varname in Records.USABLE_READ_VARS and
+                    varname != 'FLPDYR' and not np.any(var)):
+                setattr(self, varname, self._shared_zero_array(dtype))
+            elif var.dtype != dtype:
+                setattr(self, varname, var.astype(dtype))
+
+    def _shared_zero_array(self, dtype):
+        """
+        Return read-only array of zeros with the specified numpy dtype that
+        is shared by all the variables of that dtype known to be zero.
+        """
+        if dtype.name not in self._shared_zeros:
+            zeros = np.zeros(self.array_length, dtype=dtype)
+            zeros.flags.writeable = False
+            self._shared_zeros[dtype.name] = zeros
+        return self._shared_zeros[dtype.name]
+
+    def _create_column_blocks(self):
+        """
+        Allocate zero-valued float64 and int32 column blocks and make each
+        variable attribute a view of its block row.  The float block rows
+        are ordered so that variables grown by a single factor in _blowup
+        come first and changing calculated variables come last.
+        """
+        float_vars = Records.USABLE_READ_VARS | Records.CALCULATED_VARS
+        float_vars -= Records.INTEGER_VARS
+        blowup_vars = list()
+        self._blowup_row_factors = list()
+        for fname, varnames in Records.BLOWUP_FACTOR_VARS:
+            blowup_vars.extend(varnames)
+            self._blowup_row_factors.extend([fname] * len(varnames))
+        changing_vars = sorted(Records.CHANGING_CALCULATED_VARS)
+        other_vars = sorted(float_vars - set(blowup_vars) -
+                            set(changing_vars))
+        float_order = blowup_vars + other_vars + changing_vars
+        int_order = sorted(Records.INTEGER_VARS)
+        self._changing_row = len(float_order) - len(changing_vars)
+        self._float_block = np.zeros((len(float_order), self.array_length),
+                                     dtype=np.float64)
+        self._int_block = np.zeros((len(int_order), self.array_length),
+                                   dtype=np.int32)
+        column_rows = dict()
+        for row, varname in enumerate(float_order):
+            column_rows[varname] = ('_float_block', row)
+        for row, varname in enumerate(int_order):
+            column_rows[varname] = ('_int_block', row)
+        self._column_rows = column_rows
+        self._set_column_views()
+
+    def _set_column_views(self):
+        """
+        Set each column-block variable attribute to a view of its block row.
+        """
+        for varname, (block_name, row) in self._column_rows.items():
+            object.__setattr__(self, varname,
+                               getattr(self, block_name)[row])
+
     def zero_out_changing_calculated_vars(self):
         """
         Set to zero all variables in the Records.CHANGING_CALCULATED_VARS set.
         """
+        if self._column_rows is not None:
+            self._float_block[self._changing_row:].fill(0.)
+            return
         for varname in Records.CHANGING_CALCULATED_VARS:
-            var = getattr(self, varname)
-            var.fill(0.)
-        del var
+            var = self.__dict__.get(varname)  # unallocated variables are zero
+            if var is not None:
+                var.fill(0.)
 
     def _read_weights(self, weights):
         """
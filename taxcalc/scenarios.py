@@ -0,0 +1,136 @@
+"""
+Tax-Calculator ScenarioPolicy class, which specifies policy parameter
+values that differ across the scenarios combined by Records.tile.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle scenarios.py
+# pylint --disable=locally-disabled scenarios.py
+
+import copy
+import numpy as np
+from taxcalc.policy import Policy
+
+
+class ScenarioPolicy(Policy):
+    """
+    ScenarioPolicy is a subclass of the Policy class whose policy
+    parameter values can differ across the scenarios contained in a
+    Records object made by Records.tile, so that one Calculator pass
+    evaluates every scenario with its own policy.
+
+    The current-year value of each parameter that differs across the
+    scenario policies is an array with one value for each record (so its
+    first dimension has the length of the tiled Records object), while
+    the other parameters have their usual values, which are those of all
+    the scenario policies.  The iterate_jit-decorated functions (see
+    decorators.py) pass the value of each per-record parameter to the
+    calc-style function one record at a time.
+
+    Parameters
+    ----------
+    policies: list of Policy class instances
+        one for each scenario, all having the same start_year,
+        num_years and current_year; any reforms must be implemented
+        before constructing the ScenarioPolicy object.
+
+    tile_lengths: tuple of integers
+        number of records in each scenario (usually the tile_lengths
+        property of the Records object made by Records.tile).
+
+    Raises
+    ------
+    ValueError:
+        if policies is not a nonempty list of Policy class instances.
+        if tile_lengths does not contain one length for each policy.
+        if the policies have different years.
+        if the policies have different values for a parameter that is
+        used outside the iterate_jit-decorated functions.
+
+    Returns
+    -------
+    class instance: ScenarioPolicy
+    """
+
+    # parameters used by the functions in functions.py that work on a
+    # whole Calculator object (rather than on one record at a time),
+    # which must have the same value in every scenario
+    CALCULATOR_LEVEL_PARAMS = frozenset([
+        'BEN_housing_repeal', 'BEN_ssi_repeal', 'BEN_snap_repeal',
+        'BEN_tanf_repeal', 'BEN_vet_repeal', 'BEN_wic_repeal',
+        'BEN_mcare_repeal', 'BEN_mcaid_repeal', 'BEN_oasdi_repeal',
+        'BEN_ui_repeal', 'BEN_other_repeal',
+        'ID_BenefitSurtax_crt', 'ID_BenefitSurtax_trt',
+        'ID_BenefitSurtax_em', 'ID_BenefitSurtax_Switch',
+        'ID_BenefitCap_rt', 'ID_BenefitCap_Switch'
+    ])
+
+    def __init__(self, policies, tile_lengths):
+        # pylint: disable=super-init-not-called
+        if not policies or not all(isinstance(pol, Policy)
+                                   for pol in policies):
+            msg = 'policies is not a nonempty list of Policy instances'
+            raise ValueError(msg)
+        if len(tile_lengths) != len(policies):
+            msg = 'tile_lengths does not have one length for each policy'
+            raise ValueError(msg)
+        first = policies[0]
+        for pol in policies[1:]:
+            if (pol.start_year != first.start_year or
+                    pol.num_years != first.num_years or
+                    pol.current_year != first.current_year):
+                raise ValueError('policies years are not all the same')
+        # start with a copy of the first policy and then store the values
+        # of each parameter that differs across the scenario policies
+        self.__setstate__(copy.deepcopy(first).__getstate__())
+        self._tile_lengths = tuple(tile_lengths)
+        self._scenario_values = dict()
+        for name in sorted(self._param_fields):
+            values = [getattr(pol, '_' + name) for pol in policies]
+            if all(np.array_equal(val, values[0]) for val in values[1:]):
+                continue
+            if name in ScenarioPolicy.CALCULATOR_LEVEL_PARAMS:
+                msg = '{} cannot differ across scenario policies'
+                raise ValueError(msg.format(name))
+            # array with dimensions (num_years, num_scenarios, ...)
+            self._scenario_values[name] = np.stack(values, axis=1)
+        self.set_year(self.current_year)
+
+    @property
+    def tile_lengths(self):
+        """
+        Tuple containing the number of records in each scenario.
+        """
+        return self._tile_lengths
+
+    @property
+    def per_record_params(self):
+        """
+        Set of names of the parameters whose current-year values are
+        arrays with one value for each record.
+        """
+        return frozenset(self._scenario_values)
+
+    def set_year(self, year):
+        """
+        Set parameters to their values for the specified calendar year,
+        with the values of each parameter that differs across scenarios
+        repeated for each record in its scenario.
+        """
+        super(ScenarioPolicy, self).set_year(year)
+        if '_scenario_values' in self.__dict__:
+            row = year - self.start_year
+            for name, values in self._scenario_values.items():
+                setattr(self, name,
+                        np.repeat(values[row], self._tile_lengths, axis=0))
+
+    def implement_reform(self, reform,
+                         print_warnings=False, raise_errors=True):
+        """
+        Reforms cannot be implemented in a ScenarioPolicy object; they
+        must be implemented in the scenario policies before constructing
+        the ScenarioPolicy object.
+        """
+        # pylint: disable=unused-argument
+        msg = ('implement reforms in the scenario policies before '
+               'constructing the ScenarioPolicy object')
+        raise ValueError(msg)
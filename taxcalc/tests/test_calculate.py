@@ -2,7 +2,9 @@
 # pycodestyle test_calculate.py
 
 import os
+import re
 import json
+import inspect
 from io import StringIO
 import tempfile
 import copy
@@ -10,6 +12,7 @@ import pytest
 import numpy as np
 import pandas as pd
 from taxcalc import Policy, Records, Calculator, Behavior, Consumption
+from taxcalc import functions
 
 
 RAWINPUTFILE_FUNITS = 4
@@ -688,6 +691,107 @@ def test_calc_all(reform_file, rawinputfile):
     assert calc.reform_warnings == ''
 
 
+def test_sweep():
+    csv = (
+        u'RECID,MARS,XTOT,EIC,e00200,e00200p,e00200s,e00300,e02400,'
+        u'e18400,e19200,e19800,s006\n'
+        u'1,1,1,0,45000,45000,0,120,0,2100,0,800,1500\n'
+        u'2,2,4,2,98000,61000,37000,300,0,15400,9000,2500,1200\n'
+        u'3,4,3,2,21000,21000,0,0,0,600,0,0,2200\n'
+        u'4,1,1,0,810000,810000,0,21000,0,68000,24000,30000,300\n'
+        u'5,2,2,0,52000,52000,0,4000,31000,7000,0,1200,900\n'
+    )
+    rec = Records(data=pd.read_csv(StringIO(csv)), weights=None)
+    # BenefitSurtax does nothing unless both of its rates are reformed
+    base_reform = {'_ID_BenefitSurtax_trt': [0.3]}
+    pol = Policy()
+    pol.implement_reform({2019: base_reform})
+    calc = Calculator(policy=pol, records=rec, verbose=False)
+    calc.advance_to_year(2019)
+    calc.calc_all()
+    iitax = calc.array('iitax').copy()
+    outputs = ['iitax', 'combined', 'c04470', 'benefit_cost_total']
+    # one parameter used by each group of calc_all functions
+    for param, values in [('BEN_oasdi_repeal', [True]),
+                          ('FICA_ss_trt', [0.1, 0.15]),
+                          ('II_rt7', [0.37, 0.5]),
+                          ('ID_AllTaxes_c', [[5000.] * 5, [9e99] * 5]),
+                          ('ID_BenefitSurtax_crt', [0.02, 0.05]),
+                          ('ID_BenefitCap_rt', [0.1, 0.2]),
+                          ('LST', [500.])]:
+        results = calc.sweep(param, values, outputs)
+        assert len(results) == len(values)
+        changed = False
+        for value, result in zip(values, results):
+            pol = Policy()
+            reform = dict(base_reform)
+            reform['_' + param] = [value]
+            pol.implement_reform({2019: reform})
+            expcalc = Calculator(policy=pol, records=rec, verbose=False)
+            expcalc.advance_to_year(2019)
+            expcalc.calc_all()
+            for name in outputs:
+                assert np.array_equal(result[name], expcalc.array(name))
+            changed |= not np.array_equal(expcalc.array('combined'),
+                                          calc.array('combined'))
+        assert changed
+    totals = calc.sweep('II_rt7', [0.37, 0.5], ['iitax'], weighted=True)
+    assert totals[0]['iitax'] < totals[1]['iitax']
+    assert np.array_equal(calc.array('iitax'), iitax)
+    with pytest.raises(ValueError):
+        calc.sweep('unknown_param', [0.], outputs)
+
+
+def test_calc_all_step_parameters():
+    """
+    Check that the parameter names used by Calculator.sweep include all
+    the parameters read by the functions that take a Calculator object
+    and that ITEMDED_ONWARD_FUNCTIONS lists the functions that
+    _calc_itemded_onward calls.
+    """
+    for func in [functions.BenefitPrograms, functions.BenefitSurtax,
+                 functions.BenefitLimitation]:
+        used = re.findall(r"policy_param\('(\w+)'\)",
+                          inspect.getsource(func))
+        assert used
+        assert set(used) <= func.parameters
+    # pylint: disable=protected-access
+    source = (inspect.getsource(Calculator._calc_itemded_onward) +
+              inspect.getsource(Calculator._taxinc_to_amt))
+    called = re.findall(r'(\w+)\(self.__policy, self.__records\)', source)
+    assert ({getattr(functions, name) for name in called} ==
+            set(Calculator.ITEMDED_ONWARD_FUNCTIONS))
+
+
+def test_tile():
+    csv = (
+        u'RECID,MARS,XTOT,EIC,e00200,e00200p,e00200s,e00300,e18400,s006\n'
+        u'1,1,1,0,45000,45000,0,120,2100,1500\n'
+        u'2,2,4,2,98000,61000,37000,300,15400,1200\n'
+        u'3,4,3,2,21000,21000,0,0,600,2200\n'
+        u'4,1,1,0,810000,810000,0,21000,68000,300\n'
+    )
+    rec = Records(data=pd.read_csv(StringIO(csv)), weights=None)
+    calc = Calculator(policy=Policy(), records=rec, verbose=False)
+    calc.advance_to_year(2019)
+    calc.calc_all()
+    iitax = calc.array('iitax').copy()
+    changes = [np.zeros(4), np.array([1000., 0., 5000., -20000.])]
+    tcalc = calc.tile(len(changes))
+    assert tcalc.array_len == 8
+    assert tcalc.current_year == 2019
+    tcalc.incarray('e00300', np.concatenate(changes))
+    tcalc.calc_all()
+    for change, result in zip(changes, tcalc.scenario_arrays('iitax')):
+        expcalc = copy.deepcopy(calc)
+        expcalc.incarray('e00300', change)
+        expcalc.calc_all()
+        assert np.array_equal(result, expcalc.array('iitax'))
+    assert np.array_equal(calc.array('iitax'), iitax)
+    with pytest.raises(ValueError):
+        calc.tile(0)
+
+
 def test_translate_json_reform_suffixes_mars_non_indexed():
     # test read_json_param_objects()
     # using MARS-indexed parameter suffixes
@@ -28,6 +28,16 @@ def test_create_apply_function_string_with_params():
     assert ans == exp
 
 
+def test_create_apply_function_string_with_float32_args():
+    ans = create_apply_function_string(['a'], ['d', 'e', 'f'], ['f'],
+                                       float32_args=['e'])
+    exp = ("def ap_func(x_0,x_1,x_2,x_3):\n"
+           "  for i in range(len(x_0)):\n"
+           "    x_0[i] = jitted_f(x_1[i],float(x_2[i]),x_3)\n"
+           "  return x_0\n")
+    assert ans == exp
+
+
 def test_create_toplevel_function_string_mult_outputs():
     ans = create_toplevel_function_string(['a', 'b'], ['d', 'e'],
                                           ['pm', 'pm', 'pf', 'pm'])
@@ -339,3 +349,173 @@ def test_force_no_numba():
     # Restore numba module
     if nmba:
         sys.modules['numba'] = nmba
+
+
+def Magic_calc7(x, y, z, w):
+    if x > 2. and y > 2.:
+        a = max(x, y, w)
+        b = 1.
+    elif x > 2.:
+        a = min(x, y)
+        b = 2. if y > 1. else 3.
+    else:
+        a = 0.
+        b = 4.
+    a += z
+    return (a, b)
+
+
+def test_vectorize_function():
+    """
+    Check that vectorized calc-style functions return what the original
+    functions return for each array element
+    """
+    from taxcalc.vectorize import vectorize_function
+    from taxcalc.functions import EITCamount
+    x = np.array([1., 3., 3., 0.5])
+    y = np.array([3., 3., 1., 0.5])
+    vmagic = vectorize_function(Magic_calc7)
+    (a, b) = vmagic(x, y, 10., 4.)
+    exp = [Magic_calc7(xi, yi, 10., 4.) for xi, yi in zip(x, y)]
+    assert np.array_equal(a, [ans[0] for ans in exp])
+    assert np.array_equal(b, [ans[1] for ans in exp])
+    # functions.py function with an if statement, using numba's py_func
+    earnings = np.arange(0., 60000., 2500.)
+    agi = earnings + 1000.
+    veitc = vectorize_function(EITCamount)
+    eitc = veitc(0.34, earnings, 3400., 18000., agi, 0.16)
+    exp = [EITCamount.py_func(0.34, e, 3400., 18000., g, 0.16)
+           for e, g in zip(earnings, agi)]
+    assert np.array_equal(eitc, exp)
+    # per-record parameter values are indexed for each record
+    from taxcalc.vectorize import parameter_item
+    values = np.array([[1., 2.], [3., 4.], [5., 6.]])
+    assert np.array_equal(parameter_item(values, 1), [2., 4., 6.])
+    assert np.array_equal(parameter_item(values, np.array([1, 0, 1])),
+                          [2., 3., 6.])
+    assert np.array_equal(parameter_item(values[0], np.array([1, 0, 1])),
+                          [2., 1., 2.])
+
+
+def Magic_calc8(x, y):
+    for _ in range(2):
+        x += y
+    return x
+
+
+def test_vectorize_function_raises_on_loop():
+    from taxcalc.vectorize import vectorize_function
+    with pytest.raises(ValueError):
+        vectorize_function(Magic_calc8)
+
+
+def Magic_calc9(w, x, y, z):
+    if x > y:
+        a = x * w
+    else:
+        a = y - z
+    b = a + y
+    return (a, b)
+
+
+def test_numpy_engine(monkeypatch):
+    """
+    Check that the numpy engine gives the same results as the numba engine
+    """
+    import taxcalc.decorators
+    magic9 = iterate_jit(parameters=['w'], nopython=True)(Magic_calc9)
+    pm = Foo()
+    pf = Foo()
+    pm.w = 2.
+    pf.x = np.array([1., 2., 3., 4., 5.])
+    pf.y = np.array([5., 4., 3., 2., 1.])
+    pf.z = np.array([1., 1., 0., 0., 2.])
+    pf.a = np.zeros((5,))
+    pf.b = np.zeros((5,))
+    answers = dict()
+    for engine in taxcalc.decorators.ENGINES:
+        monkeypatch.setattr(taxcalc.decorators, 'ENGINE', engine)
+        magic9(pm, pf)
+        answers[engine] = (pf.a.copy(), pf.b.copy())
+        pf.a[:] = 0.
+        pf.b[:] = 0.
+    assert np.array_equal(answers['numba'][0], [4., 3., 3., 8., 10.])
+    assert np.array_equal(answers['numba'][0], answers['numpy'][0])
+    assert np.array_equal(answers['numba'][1], answers['numpy'][1])
+
+
+def test_numpy_engine_calc_all(monkeypatch):
+    """
+    Check that calc_all and mtr give the same results with the numpy engine
+    as with the numba engine for all calculated variables, under current
+    law and under a reform that uses the benefit surtax, benefit cap and
+    new child tax credit branches
+    """
+    # pylint: disable=too-many-locals
+    import taxcalc.decorators
+    from taxcalc import Policy, Records, Calculator
+    rng = np.random.RandomState(123)
+    nrec = 500
+    mars = rng.choice([1, 2, 3, 4], size=nrec)
+    kids = rng.choice([0, 1, 2, 3], size=nrec)
+    data = DataFrame({'RECID': np.arange(1, nrec + 1), 'MARS': mars,
+                      'XTOT': np.where(mars == 2, 2, 1) + kids,
+                      'n24': kids, 'nu18': kids, 'EIC': kids,
+                      'nu05': np.minimum(kids, rng.choice([0, 1], nrec)),
+                      'age_head': rng.randint(18, 90, nrec),
+                      'age_spouse': np.where(mars == 2,
+                                             rng.randint(18, 90, nrec), 0),
+                      's006': rng.randint(100, 2000, nrec)})
+    wages_p = np.round(np.exp(rng.normal(10.5, 1.5, nrec)), 2)
+    wages_s = np.where(mars == 2, np.round(np.exp(rng.normal(10., 1.5,
+                                                              nrec)), 2), 0.)
+    data['e00200p'] = wages_p
+    data['e00200s'] = wages_s
+    data['e00200'] = wages_p + wages_s
+    business = np.round(rng.normal(0., 40000., nrec), 2)
+    data['e00900p'] = business
+    data['e00900'] = business
+    for varname, scale in [('e00300', 3000.), ('e00600', 8000.),
+                           ('p23250', 50000.), ('e02400', 9000.),
+                           ('e18400', 12000.), ('e18500', 6000.),
+                           ('e19200', 15000.), ('e19800', 6000.),
+                           ('e17500', 5000.), ('e32800', 3000.)]:
+        data[varname] = np.round(np.abs(rng.normal(0., scale, nrec)) *
+                                 (rng.rand(nrec) < 0.5), 2)
+    data['e00650'] = np.round(data['e00600'] * 0.8, 2)
+    reform = {2018: {'_ID_BenefitSurtax_trt': [0.3],
+                     '_ID_BenefitSurtax_crt': [0.02],
+                     '_ID_BenefitCap_rt': [0.4],
+                     '_CTC_new_c': [1200.],
+                     '_CTC_new_c_under5_bonus': [400.],
+                     '_CTC_new_rt': [0.3],
+                     '_CTC_new_ps': [[80000., 120000., 60000., 80000.,
+                                      80000.]],
+                     '_CTC_new_prt': [0.05],
+                     '_CTC_new_refund_limited': [True],
+                     '_CTC_new_refund_limit_payroll_rt': [0.5]}}
+    for policy_reform in [None, reform]:
+        results = dict()
+        for engine in taxcalc.decorators.ENGINES:
+            monkeypatch.setattr(taxcalc.decorators, 'ENGINE', engine)
+            pol = Policy()
+            if policy_reform:
+                pol.implement_reform(policy_reform)
+            rec = Records(data=data, weights=None, adjust_ratios=None)
+            calc = Calculator(policy=pol, records=rec, verbose=False)
+            calc.advance_to_year(2018)
+            calc.calc_all()
+            arrays = dict((varname, calc.array(varname).copy())
+                          for varname in Records.CALCULATED_VARS)
+            results[engine] = (arrays, calc.mtr('e00200p'),
+                               calc.mtr('e00900p'))
+        arrays, mtrs_wage, mtrs_business = results['numba']
+        if policy_reform:
+            assert np.any(arrays['surtax'] != 0.)
+            assert np.any(arrays['ctc_new'] != 0.)
+        for varname in Records.CALCULATED_VARS:
+            assert np.array_equal(arrays[varname],
+                                  results['numpy'][0][varname]), varname
+        for mtr1, mtr2 in zip(mtrs_wage + mtrs_business,
+                              results['numpy'][1] + results['numpy'][2]):
+            assert np.array_equal(mtr1, mtr2)
@@ -7,6 +7,8 @@ Tests of Tax-Calculator GrowFactors class.
 
 import os
 import tempfile
+import numpy as np
+import pandas as pd
 import pytest
 # pylint: disable=import-error
 from taxcalc import GrowFactors, Records, Policy
@@ -81,6 +83,33 @@ def test_proper_usage():
     assert val > 1.0
 
 
+def test_growfactors_from_dataframe():
+    """
+    Test GrowFactors object constructed from a DataFrame and updated by
+    the update_columns method.
+    """
+    gfdf = pd.read_csv(GrowFactors.FILE_PATH)
+    gfo = GrowFactors(gfdf)
+    assert gfo.gfdf.equals(GrowFactors().gfdf)
+    diffs = np.linspace(0.0, 0.01, 5)
+    gfo.update_columns(['AWAGE', 'ATXPY'], 2014, diffs)
+    assert gfo.factor_value('AWAGE', 2016) == gfdf['AWAGE'][5] + diffs[2]
+    assert gfo.factor_value('ATXPY', 2018) == gfdf['ATXPY'][7] + diffs[4]
+    assert gfo.factor_value('ATXPY', 2019) == gfdf['ATXPY'][8]
+    assert gfo.factor_value('ACPIU', 2016) == gfdf['ACPIU'][5]
+    gfo = GrowFactors(gfdf.set_index('YEAR'))
+    gfo.update_columns(['ASCHCI', 'ASCHCL'], 2013,
+                       [[0.01, -0.01], [0.02, -0.02]])
+    assert gfo.factor_value('ASCHCL', 2014) == gfdf['ASCHCL'][3] - 0.02
+    with pytest.raises(ValueError):
+        gfo.update_columns(['BADNAME'], 2013, [0.01])
+    with pytest.raises(ValueError):
+        gfo.update_columns(['AWAGE'], gfo.last_year, [0.01, 0.01])
+    gfo.factor_value('AWAGE', 2013)
+    with pytest.raises(ValueError):
+        gfo.update_columns(['AWAGE'], 2013, [0.01])
+
+
 def test_growfactors_csv_values():
     """
     Test numerical contents of growfactors.csv file.
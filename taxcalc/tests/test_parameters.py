@@ -6,8 +6,10 @@ Tests for Tax-Calculator ParametersBase class and JSON parameter files.
 # pylint --disable=locally-disabled test_parameters.py
 
 import os
+import copy
 import json
 import math
+import pickle
 import numpy as np
 import pytest
 # pylint: disable=import-error
@@ -46,6 +48,74 @@ def test_instantiation_and_usage():
         ParametersBase._expand_array(arr3d, False, False, True, [0.02], 1)
 
 
+def test_per_year_parameter_table():
+    """
+    Test that current-year parameter values come from the per-year
+    parameter table, which _update changes in place, that they are
+    ordinary instance attributes (so reading them is a plain attribute
+    lookup), and that current-year overrides last only until the next
+    set_year call.
+    """
+    # pylint: disable=protected-access,no-member
+    pol = Policy()
+    syr = pol.start_year
+    for year in range(syr, pol.end_year + 1):
+        pol.set_year(year)
+        idx = year - syr
+        assert pol.II_em == pol._II_em[idx]
+        assert np.array_equal(pol.II_brk2, pol._II_brk2[idx])
+        assert pol._II_em.base is not None
+    assert 'II_em' in vars(pol)
+    assert np.shares_memory(pol.II_brk2, pol._II_brk2)
+    pol.set_year(2019)
+    pol.implement_reform({2020: {'_II_em': [1000]}})
+    assert pol.current_year == 2019
+    assert pol.II_em == pol._II_em[2019 - syr]
+    assert pol.II_em != 1000
+    pol.II_em = 2000
+    assert pol.II_em == 2000
+    pol.set_year(2020)
+    assert pol.II_em == 1000
+    for pol2 in [copy.deepcopy(pol), pickle.loads(pickle.dumps(pol))]:
+        assert pol2.current_year == 2020
+        assert pol2.II_em == 1000
+        assert 'II_em' in vars(pol2)
+        pol2.implement_reform({2021: {'_II_em': [3000]}})
+        pol2.set_year(2021)
+        assert pol2.II_em == 3000
+        assert pol._II_em[2021 - syr] != 3000
+    with pytest.raises(AttributeError):
+        pol.unknown_parameter_name
+
+
+def test_params_dict_cache():
+    """
+    Test that the parsed DEFAULTS_FILENAME contents are cached and that
+    each call returns a dictionary that can be changed without changing
+    the cached contents.
+    """
+    # pylint: disable=protected-access
+    params1 = Policy._params_dict_from_json_file()
+    fname = Policy.DEFAULTS_FILENAME
+    assert fname in ParametersBase._DEFAULTS_CACHE
+    params2 = Policy._params_dict_from_json_file()
+    assert params1 == params2
+    assert params1 is not params2
+    assert params1['_II_em'] is not params2['_II_em']
+    params1['_II_em']['cpi_inflated'] = False
+    params1['_II_em']['value'] = [0.0]
+    params2['_STD']['value'][0][0] = 0.0
+    params2['_STD']['col_label'].append('extra')
+    del params1['_STD']
+    params2 = Policy._params_dict_from_json_file()
+    params3 = Policy._params_dict_from_json_file()
+    assert params3 == params2
+    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), fname)
+    with open(path) as pfile:
+        assert params3 == json.load(pfile)
+    assert list(Policy.default_data()) == list(params3)
+
+
 @pytest.mark.parametrize("fname",
                          [("behavior.json"),
                           ("consumption.json"),
@@ -308,6 +378,47 @@ def test_expand_2d_partial_expand():
     assert np.allclose(res, exp, atol=0.01, rtol=0.0)
 
 
+def test_expand_group_matches_scalar_expansion():
+    """
+    Check that inflating many parameters at once gives exactly the same
+    values as inflating each value one year at a time.
+    """
+    nyrs = 12
+    irates = [0.0213, 0.0155, 0.0288, 0.0172, 0.0245, 0.0199, 0.0201,
+              0.0230, 0.0227, 0.0222, 0.0226, 0.0228]
+    x1d = np.array([1050.0, 1060.0])
+    x2d = np.array([[9325.0, 18650.0, 9.e99],
+                    [9525.0, 19050.0, 8.9e99]])
+
+    def scalar_path(cur, first):
+        """
+        Return list of year-by-year inflated values beginning with cur.
+        """
+        path = []
+        for idx in range(first, nyrs):
+            cur *= (1. + irates[idx - 1])
+            cur = round(cur, 2) if cur < 9e99 else 9e99
+            path.append(cur)
+        return path
+
+    pbase = ParametersBase()
+    pbase.initialize(start_year=2017, num_years=nyrs)
+    expanded = {'_x1d': x1d.copy(), '_x2d': x2d.copy()}
+    pbase._expand_group(expanded, ['_x1d', '_x2d'], 2, irates)
+    assert expanded['_x1d'].shape == (nyrs,)
+    assert expanded['_x2d'].shape == (nyrs, 3)
+    assert np.array_equal(expanded['_x1d'][2:], scalar_path(x1d[-1], 2))
+    for col in range(3):
+        assert np.array_equal(expanded['_x2d'][2:, col],
+                              scalar_path(x2d[-1, col], 2))
+    res1d = ParametersBase._expand_1D(x1d, inflate=True,
+                                      inflation_rates=irates, num_years=nyrs)
+    res2d = ParametersBase._expand_2D(x2d, inflate=True,
+                                      inflation_rates=irates, num_years=nyrs)
+    assert np.array_equal(res1d, expanded['_x1d'])
+    assert np.array_equal(res2d, expanded['_x2d'])
+
+
 @pytest.mark.parametrize('json_filename',
                          ['current_law_policy.json',
                           'behavior.json',
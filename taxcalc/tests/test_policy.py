@@ -8,6 +8,7 @@ import tempfile
 import numpy as np
 from numpy.testing import assert_allclose
 import pytest
+import taxcalc
 from taxcalc import Policy, Calculator
 
 
@@ -600,6 +601,50 @@ def test_order_of_cpi_and_level_reforms():
         assert mte[2017 - syr] == 500000
 
 
+def test_cached_policy(tmpdir, monkeypatch):
+    """
+    Test that Policy.cached returns independent copies of reformed Policy
+    objects with the same parameter values as newly constructed objects,
+    using both the in-memory and the on-disk caches.
+    """
+    # pylint: disable=protected-access
+    reform = {2016: {'_SS_Earnings_c': [500000],
+                     '_SS_Earnings_c_cpi': False}}
+    ppo = Policy()
+    ppo.implement_reform(reform)
+    cache_dir = os.path.join(str(tmpdir), 'policy_cache')
+    Policy._CACHE.clear()
+    cached1 = Policy.cached(reform, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    cached2 = Policy.cached(reform, cache_dir=cache_dir)
+    assert cached1 is not cached2
+    assert cached2.current_year == cached2.start_year
+    for cached in [cached1, cached2]:
+        for name in ppo._vals:
+            assert np.array_equal(getattr(cached, name), getattr(ppo, name))
+    # changing a copy does not change the cached Policy object
+    cached1.implement_reform({2018: {'_SS_Earnings_c_cpi': True}})
+    assert cached1._vals['_SS_Earnings_c']['cpi_inflated']
+    assert not cached2._vals['_SS_Earnings_c']['cpi_inflated']
+    cached3 = Policy.cached(reform)
+    assert not cached3._vals['_SS_Earnings_c']['cpi_inflated']
+    assert np.array_equal(cached3._SS_Earnings_c, ppo._SS_Earnings_c)
+    # the pickled Policy object is used when the in-memory cache is empty
+    Policy._CACHE.clear()
+    cached4 = Policy.cached(reform, cache_dir=cache_dir)
+    assert np.array_equal(cached4._SS_Earnings_c, ppo._SS_Earnings_c)
+    # a different reform is cached separately
+    clp = Policy.cached()
+    assert clp._SS_Earnings_c[2017 - clp.start_year] < 500000
+    with pytest.raises(ValueError):
+        Policy.cached(reform, gfactors=list())
+    # a different taxcalc version does not use the pickled Policy objects
+    key = Policy._cache_key(reform, None)
+    monkeypatch.setattr(taxcalc, '__version__', 'other')
+    assert Policy._cache_key(reform, None) != key
+    Policy._CACHE.clear()
+
+
 def test_misspecified_reforms():
     """
     Demonstrate pitfalls of careless specification of policy reforms.
@@ -23,6 +23,7 @@ import pandas as pd
 # pylint: disable=import-error
 from taxcalc import Policy, Records, Calculator, nonsmall_diffs
 from taxcalc import run_nth_year_taxcalc_model
+from taxcalc.utils import table_deviation
 
 
 @pytest.mark.requires_pufcsv
@@ -314,6 +315,30 @@ def test_credit_reforms(puf_subsample):
     assert itax3 < itax1  # because nonrefundable credits lower revenues some
 
 
+@pytest.mark.requires_pufcsv
+def test_compact_storage_accuracy(puf_subsample):
+    """
+    Check that the float input variables stored as float32 by compact
+    Records storage are small enough in puf.csv for float32 rounding to be
+    less than one cent, and that compact storage leaves taxes unchanged
+    to within one dollar for each filing unit
+    """
+    Records.read_var_info()
+    for vname, dtype in Records.COMPACT_DTYPES.items():
+        if dtype == np.float32 and vname in puf_subsample:
+            assert np.abs(puf_subsample[vname]).max() < 2.**18
+    varlist = ['c00100', 'iitax', 'payrolltax', 'aftertax_income']
+    tables = list()
+    for compact in [False, True]:
+        rec = Records(data=puf_subsample, compact=compact)
+        calc = Calculator(policy=Policy(), records=rec)
+        calc.advance_to_year(2018)
+        calc.calc_all()
+        tables.append(calc.dataframe(varlist))
+    dev = table_deviation(tables[0], tables[1])
+    assert dev['max_abs_dev'].max() < 1.
+
+
 @pytest.mark.requires_pufcsv
 def test_puf_availability(tests_path, puf_path):
     """
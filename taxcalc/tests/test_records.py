@@ -3,12 +3,16 @@
 
 import os
 import json
+import copy
+import pickle
 import numpy as np
 from numpy.testing import assert_array_equal
 import pandas as pd
 import pytest
 from io import StringIO
-from taxcalc import GrowFactors, Policy, Records, Calculator
+from taxcalc import GrowFactors, Policy, Records, Calculator, Consumption
+from taxcalc import ScenarioPolicy
+from taxcalc.utils import table_deviation
 
 
 def test_incorrect_Records_instantiation(cps_subsample):
@@ -92,6 +96,434 @@ def test_read_data(csv):
         Records(data=df)
 
 
+SMALL_CSV = (
+    u'RECID,MARS,XTOT,nu18,n24,EIC,age_head,age_spouse,e00200,e00200p,'
+    u'e00200s,e00300,e00600,e00650,e00900,e00900p,e00900s,e02000,e26270,'
+    u'e01500,e01700,e02400,p23250,e18400,e19200,s006\n'
+    u'1,1,1,0,0,0,34,0,45000,45000,0,120,0,0,0,0,0,0,0,'
+    u'0,0,0,0,2100,0,1500\n'
+    u'2,2,4,2,2,2,41,39,98000,61000,37000,300,2500,2000,-8000,-8000,0,'
+    u'3000,3000,0,0,0,1200,5400,9800,1200\n'
+    u'3,2,2,0,0,0,71,68,0,0,0,8800,12500,9000,0,0,0,-4000,-4000,'
+    u'42000,31000,36000,25000,7300,0,900\n'
+    u'4,4,3,2,2,2,29,0,21000,21000,0,0,0,0,6500,6500,0,0,0,'
+    u'0,0,0,0,600,0,2200\n'
+    u'5,1,1,0,0,0,55,0,410000,410000,0,21000,64000,58000,120000,120000,0,'
+    u'250000,250000,0,0,0,380000,38000,24000,300\n'
+    u'6,3,1,0,0,0,47,0,52000,52000,0,40,0,0,0,0,0,0,0,'
+    u'0,0,0,0,2800,0,700\n'
+)
+
+
+def test_column_block_storage():
+    data = pd.read_csv(StringIO(SMALL_CSV))
+    calcs = list()
+    for column_block in [False, True]:
+        rec = Records(data=data, weights=None, adjust_ratios=None,
+                      column_block=column_block)
+        assert rec.column_block == column_block
+        calc = Calculator(policy=Policy(), records=rec, verbose=False)
+        calc.advance_to_year(2018)
+        calc.calc_all()
+        calcs.append(calc)
+    # both storage modes produce identical results
+    for varname in Records.USABLE_READ_VARS | Records.CALCULATED_VARS:
+        assert_array_equal(calcs[0].array(varname), calcs[1].array(varname))
+    varlist = ['s006', 'e00200', 'iitax', 'payrolltax']
+    assert calcs[0].dataframe(varlist).equals(calcs[1].dataframe(varlist))
+    mtrs = [calc.mtr('e00200p') for calc in calcs]
+    for mtr0, mtr1 in zip(mtrs[0], mtrs[1]):
+        assert_array_equal(mtr0, mtr1)
+    # full-compensation adjustment uses unperturbed earnings at the cap
+    mtrs = list()
+    for calc in calcs:
+        cap = calc.policy_param('SS_Earnings_c')
+        e00200p = np.full_like(calc.array('e00200p'), cap - 0.005)
+        e00200p[0] = cap
+        calc.array('e00200', e00200p + calc.array('e00200s'))
+        calc.array('e00200p', e00200p)
+        mtrs.append(calc.mtr('e00200p', wrt_full_compensation=True))
+    for mtr0, mtr1 in zip(mtrs[0], mtrs[1]):
+        assert_array_equal(mtr0, mtr1)
+    # variables remain views of blocks after assignment and deep copying
+    rec = Records(data=data, weights=None, adjust_ratios=None,
+                  column_block=True)
+    e00200 = rec.e00200
+    rec.e00200 = rec.e00200 + 1.
+    assert rec.e00200 is e00200
+    rec_copy = copy.deepcopy(rec)
+    assert np.shares_memory(rec_copy.e00200, rec_copy.column_matrix(
+        ['e00200', 'e00200p']))
+    assert not np.shares_memory(rec_copy.e00200, rec.e00200)
+    assert_array_equal(rec_copy.e00200, rec.e00200)
+    assert rec.column_matrix(['e00200', 'MARS']) is None
+    # DataFrame made from a block view holds its own copy of the data
+    calc = Calculator(policy=Policy(), records=rec, verbose=False)
+    pdf = calc.dataframe(['e00200', 'e00200p'])
+    assert not np.shares_memory(pdf.values, rec.e00200)
+    pdf['e00200'] = 0.
+    assert_array_equal(rec.e00200, rec_copy.e00200)
+
+
+def test_columnar_data_directory(tmpdir):
+    data = pd.read_csv(StringIO(SMALL_CSV))
+    data['extraneous'] = 1
+    dirpath = os.path.join(str(tmpdir), 'small')
+    Records.write_columns(data, dirpath)
+    assert os.path.isfile(os.path.join(dirpath, 'e00200.npy'))
+    calcs = list()
+    for rec_data in [data, dirpath]:
+        rec = Records(data=rec_data, weights=None, adjust_ratios=None)
+        assert rec.IGNORED_VARS == set(['extraneous'])
+        calc = Calculator(policy=Policy(), records=rec, verbose=False)
+        calc.advance_to_year(2018)
+        calc.calc_all()
+        calcs.append(calc)
+    for varname in Records.USABLE_READ_VARS | Records.CALCULATED_VARS:
+        assert_array_equal(calcs[0].array(varname), calcs[1].array(varname))
+    # extrapolation does not change the column files
+    rec = Records(data=dirpath, weights=None, adjust_ratios=None)
+    assert_array_equal(rec.e00200, data['e00200'].values)
+    # column-block storage can be filled from a data directory
+    rec = Records(data=dirpath, weights=None, adjust_ratios=None,
+                  column_block=True)
+    assert_array_equal(rec.e00200, data['e00200'].values)
+    # invalid data are not written and incomplete directories are not read
+    data.loc[0, 'e00200p'] = 1.
+    with pytest.raises(ValueError):
+        Records.write_columns(data, os.path.join(str(tmpdir), 'bad'))
+    with pytest.raises(ValueError):
+        Records.write_columns(list(), os.path.join(str(tmpdir), 'bad'))
+    with pytest.raises(ValueError):
+        Records(data=str(tmpdir))
+
+
+def test_columns_match_source(tmpdir):
+    csvpath = os.path.join(str(tmpdir), 'small.csv')
+    dirpath = os.path.join(str(tmpdir), 'small')
+    with open(csvpath, 'w') as csvfile:
+        csvfile.write(SMALL_CSV)
+    assert not Records.columns_match_source(csvpath, dirpath)
+    Records.write_columns(csvpath, dirpath)
+    assert Records.columns_match_source(csvpath, dirpath)
+    # columns written from a DataFrame have no source file
+    Records.write_columns(pd.read_csv(csvpath), dirpath)
+    assert not Records.columns_match_source(csvpath, dirpath)
+    Records.write_columns(csvpath, dirpath)
+    # a changed CSV file makes the columns stale
+    data = pd.read_csv(csvpath)
+    data['e00200'] = data['e00200'] * 2.
+    data['e00200p'] = data['e00200p'] * 2.
+    data['e00200s'] = data['e00200s'] * 2.
+    data.to_csv(csvpath, index=False)
+    assert not Records.columns_match_source(csvpath, dirpath)
+    Records.write_columns(csvpath, dirpath)
+    assert Records.columns_match_source(csvpath, dirpath)
+    rec = Records(data=dirpath, weights=None, adjust_ratios=None)
+    assert_array_equal(rec.e00200, data['e00200'].values)
+
+
+def test_records_from_template():
+    data = pd.read_csv(StringIO(SMALL_CSV))
+    for column_block in [False, True]:
+        template = Records(data=data, weights=None,
+                           column_block=column_block)
+        rec = Records.from_template(template, gfactors=None)
+        assert rec.gfactors is None
+        assert rec.WT is template.WT
+        assert rec.ADJ is template.ADJ
+        assert rec.column_block == column_block
+        assert not np.shares_memory(rec.e00200, template.e00200)
+        rec = Records.from_template(template)
+        calc1 = Calculator(policy=Policy(), records=rec, verbose=False)
+        calc1.advance_to_year(2018)
+        calc1.calc_all()
+        rec.increment_year()
+        assert_array_equal(template.e00200, data['e00200'].values)
+        calc2 = Calculator(policy=Policy(), records=template, verbose=False)
+        calc2.advance_to_year(2018)
+        calc2.calc_all()
+        assert_array_equal(calc1.array('combined'), calc2.array('combined'))
+        with pytest.raises(ValueError):
+            Records.from_template(rec)
+        # template without grow factors can be given grow factors
+        template = Records(data=data, gfactors=None, weights=None,
+                           start_year=2013, column_block=column_block)
+        rec = Records.from_template(template, gfactors=GrowFactors())
+        assert template.gfactors is None
+        assert isinstance(rec.gfactors, GrowFactors)
+        rec.increment_year()
+        assert rec.current_year == 2014
+        assert_array_equal(template.e00200, data['e00200'].values)
+    with pytest.raises(ValueError):
+        Records.from_template(data)
+    with pytest.raises(ValueError):
+        Records.from_template(template, gfactors=list())
+
+
+def test_compact_storage():
+    data = pd.read_csv(StringIO(SMALL_CSV))
+    data['e03210'] = [0., 2500., 0., 1250.5, 0., 980.]
+    varlist = ['s006', 'c00100', 'iitax', 'payrolltax', 'aftertax_income']
+    tables = list()
+    mtrs = list()
+    for compact in [False, True]:
+        rec = Records(data=data, weights=None, compact=compact)
+        if compact:
+            assert rec.MARS.dtype == np.int8
+            assert rec.e03210.dtype == np.float32
+            assert rec.e00200.dtype == np.float64
+            assert rec.s006.dtype == np.float64
+            assert rec.c00100.dtype == np.float64
+            assert not rec.e00400.flags.writeable
+            assert rec.e00400 is rec.e00800
+            rec_copy = copy.deepcopy(rec)
+            assert rec_copy.e00400 is rec_copy.e00800
+            assert not rec_copy.e00400.flags.writeable
+        calc = Calculator(policy=Policy(), records=rec, verbose=False,
+                          consumption=Consumption())
+        calc.advance_to_year(2018)
+        calc.calc_all()
+        tables.append(calc.dataframe(varlist))
+        mtrs.append(calc.mtr('e00200p'))
+    # only float input variables with small statutory limits are float32
+    float32_vars = set(varname
+                       for varname, dtype in Records.COMPACT_DTYPES.items()
+                       if dtype == np.float32)
+    assert 'e03210' in float32_vars
+    assert float32_vars <= Records.USABLE_READ_VARS
+    assert 's006' not in float32_vars
+    dev = table_deviation(tables[0], tables[1])
+    assert list(dev.index) == varlist
+    assert dev['max_rel_dev'].max() < 1e-5
+    for mtr0, mtr1 in zip(mtrs[0], mtrs[1]):
+        assert np.allclose(mtr0, mtr1, rtol=0.0, atol=1e-6)
+    with pytest.raises(ValueError):
+        Records(data=data, weights=None, column_block=True, compact=True)
+
+
+def test_lazy_variable_allocation():
+    data = pd.read_csv(StringIO(SMALL_CSV))
+    rec = Records(data=data, weights=None)
+    # calculated variables are allocated when first used
+    assert 'c00100' not in vars(rec)
+    assert_array_equal(rec.c00100, np.zeros(rec.array_length))
+    assert 'c00100' in vars(rec)
+    rec_copy = copy.deepcopy(rec)
+    assert 'iitax' not in vars(rec_copy)
+    assert rec_copy.iitax.dtype == np.float64
+    assert rec_copy.exact.dtype == np.int32
+    with pytest.raises(AttributeError):
+        rec_copy.not_a_variable
+    # unread variables can share one read-only zeros array
+    rec_shared = Records(data=data, weights=None, share_zeros=True)
+    assert rec_shared.e00400 is rec_shared.e00800
+    assert not rec_shared.e00400.flags.writeable
+    assert rec_shared.FLPDYR.flags.writeable
+    assert len(pickle.dumps(rec_shared)) < len(pickle.dumps(rec))
+    calcs = list()
+    for recs in [rec, rec_shared]:
+        calc = Calculator(policy=Policy(), records=recs, verbose=False,
+                          consumption=Consumption())
+        calc.advance_to_year(2018)
+        calc.calc_all()
+        calcs.append(calc)
+    for varname in Records.USABLE_READ_VARS | Records.CALCULATED_VARS:
+        assert_array_equal(calcs[0].array(varname), calcs[1].array(varname))
+    calcs[1].array('e00400', np.ones(rec.array_length))
+    assert calcs[1].array('e00800').sum() == 0.
+
+
+def test_scratch_copy_and_benefit_surtax():
+    data = pd.read_csv(StringIO(SMALL_CSV))
+    reform = {2018: {'_ID_BenefitSurtax_crt': [0.0],
+                     '_ID_BenefitSurtax_trt': [0.5]}}
+    for column_block in [False, True]:
+        rec = Records(data=data, weights=None, column_block=column_block)
+        scratch = rec.scratch_copy()
+        assert scratch.e00200 is rec.e00200 or column_block
+        assert_array_equal(scratch.e00200, rec.e00200)
+        scratch.c00100 = scratch.c00100 + 1.
+        assert rec.c00100.sum() == 0.
+        pol = Policy()
+        pol.implement_reform(reform)
+        calc = Calculator(policy=pol, records=rec, verbose=False)
+        calc.advance_to_year(2018)
+        calc.calc_all()
+        assert calc.array('surtax').sum() > 0.
+        # benefit equals the one computed by rerunning a deep-copied
+        # Calculator with no haircut-limited itemized deductions
+        no_id_calc = copy.deepcopy(calc)
+        for name in ['ID_Medical_hc', 'ID_StateLocalTax_hc',
+                     'ID_RealEstate_hc', 'ID_Casualty_hc',
+                     'ID_Miscellaneous_hc', 'ID_InterestPaid_hc',
+                     'ID_Charity_hc']:
+            no_id_calc.policy_param(name, 1.)
+        no_id_calc._calc_one_year()
+        iitax = calc.array('iitax').copy()
+        no_id_iitax = calc._counterfactual_iitax(
+            {'ID_StateLocalTax_hc': 1., 'ID_InterestPaid_hc': 1.,
+             'ID_Medical_hc': 1., 'ID_RealEstate_hc': 1.,
+             'ID_Casualty_hc': 1., 'ID_Miscellaneous_hc': 1.,
+             'ID_Charity_hc': 1.}
+        )
+        assert_array_equal(no_id_iitax, no_id_calc.array('iitax'))
+        assert_array_equal(calc.array('iitax'), iitax)
+        assert calc.policy_param('ID_StateLocalTax_hc') == 0.
+
+
+def test_tiled_scenarios():
+    data = pd.read_csv(StringIO(SMALL_CSV))
+    reforms = [{},
+               {2018: {'_STD': [[9000, 18000, 9000, 13000, 18000]],
+                       '_II_rt7': [0.45]}},
+               {2018: {'_EITC_c': [[600, 4000, 6000, 7000]],
+                       '_ID_StateLocalTax_hc': [0.5]}}]
+    recs_list = list()
+    pols = list()
+    expected = list()
+    for idx, reform in enumerate(reforms):
+        scenario_data = data.copy()
+        scenario_data['e00300'] += 1000. * idx
+        rec = Records(data=scenario_data, weights=None)
+        pol = Policy()
+        pol.implement_reform(reform)
+        calc = Calculator(policy=pol, records=rec, verbose=False)
+        calc.advance_to_year(2018)
+        calc.calc_all()
+        expected.append(calc.array('combined').copy())
+        recs_list.append(rec)
+        pols.append(pol)
+    rec = Records.tile(recs_list)
+    assert rec.tile_lengths == (6, 6, 6)
+    assert_array_equal(rec.e00300[6:12], recs_list[1].e00300)
+    pol = ScenarioPolicy(pols, rec.tile_lengths)
+    assert pol.per_record_params == set(['STD', 'II_rt7', 'EITC_c',
+                                         'ID_StateLocalTax_hc'])
+    calc = Calculator(policy=pol, records=rec, verbose=False)
+    calc.advance_to_year(2018)
+    assert calc.policy_param('STD').shape == (18, 5)
+    calc.calc_all()
+    for combined, exp in zip(calc.scenario_arrays('combined'), expected):
+        assert_array_equal(combined, exp)
+    with pytest.raises(ValueError):
+        Records.tile([recs_list[0], Records(data=data, weights=None,
+                                            column_block=True)])
+    with pytest.raises(ValueError):
+        ScenarioPolicy(pols, (6, 6))
+    surtax_pol = Policy()
+    surtax_pol.implement_reform({2018: {'_ID_BenefitSurtax_crt': [0.0]}})
+    with pytest.raises(ValueError):
+        ScenarioPolicy([pols[0], surtax_pol], (6, 6))
+    with pytest.raises(ValueError):
+        pol.implement_reform(reforms[1])
+
+
+def test_seek_year_checkpoints(tmpdir, monkeypatch):
+    data = pd.read_csv(StringIO(SMALL_CSV))
+    checkpoint_dir = os.path.join(str(tmpdir), 'checkpoints')
+    template = Records(data=data, weights=None)
+    expected = Records.from_template(template)
+    for _ in range(2012, 2020):
+        expected.increment_year()
+    for seek_years in [[2016, 2019], [2019], [2014, 2019]]:
+        rec = Records.from_template(template)
+        for year in seek_years:
+            rec.seek_year(year, checkpoint_dir)
+        assert rec.current_year == 2019
+        for varname in Records.USABLE_READ_VARS:
+            assert_array_equal(getattr(rec, varname),
+                               getattr(expected, varname))
+        # the Policy object is advanced to the Records current_year
+        calc = Calculator(policy=Policy(), records=rec, verbose=False)
+        assert calc.current_year == 2019
+    assert len(os.listdir(checkpoint_dir)) == 8
+    # different grow factors use different checkpoints
+    rec = Records.from_template(template, gfactors=None)
+    rec.seek_year(2016, checkpoint_dir)
+    assert len(os.listdir(checkpoint_dir)) == 13
+    assert_array_equal(rec.e00200, template.e00200)
+    with pytest.raises(ValueError):
+        rec.seek_year(2015, checkpoint_dir)
+    rec = Records.from_template(template)
+    rec.increment_year()
+    with pytest.raises(ValueError):
+        rec.seek_year(2016, checkpoint_dir)
+    # checkpoints written with another checkpoint format are not used
+    # pylint: disable=protected-access
+    rec = Records.from_template(template)
+    rec.seek_year(2019, checkpoint_dir)
+    key = rec._checkpoint_key()
+    monkeypatch.setattr(Records, 'CHECKPOINT_FORMAT',
+                        Records.CHECKPOINT_FORMAT + 1)
+    assert rec._checkpoint_key() != key
+    rec = Records.from_template(template)
+    rec.seek_year(2012, checkpoint_dir)
+    assert len(os.listdir(checkpoint_dir)) == 14
+
+
+def _year_and_combined(calc1, calc2):
+    return (calc1.current_year, calc2.array('combined') -
+            calc1.array('combined'))
+
+
+def test_shared_memory_year_runner():
+    data = pd.read_csv(StringIO(SMALL_CSV))
+    for column_block in [False, True]:
+        rec = Records(data=data, weights=None, column_block=column_block)
+        shm, handle = rec.to_shared_memory()
+        try:
+            pickle.dumps(handle)
+            shared_rec, shared_shm = Records.from_shared_memory(handle)
+            assert_array_equal(shared_rec.e00200, rec.e00200)
+            assert_array_equal(shared_rec.s006, rec.s006)
+            assert not np.shares_memory(shared_rec.e00200, rec.e00200)
+            del shared_rec
+            shared_shm.close()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def make_calcs():
+        pol = Policy()
+        pol.implement_reform({2018: {'_II_rt7': [0.45]}})
+        return (Calculator(policy=Policy(), records=Records(
+            data=data, weights=None), verbose=False),
+                Calculator(policy=pol, records=Records(
+                    data=data, weights=None), verbose=False))
+    years = [2019, 2014, 2018]
+    expected = dict()
+    calc1, calc2 = make_calcs()
+    for year in sorted(years):
+        calc1.advance_to_year(year)
+        calc1.calc_all()
+        calc2.advance_to_year(year)
+        calc2.calc_all()
+        expected[year] = _year_and_combined(calc1, calc2)
+    # the years are calculated in this process unless max_workers > 1
+    for max_workers in [None, 2]:
+        results = Calculator.run_years(make_calcs, years, _year_and_combined,
+                                       max_workers=max_workers)
+        assert [result[0] for result in results] == years
+        for year, result in zip(years, results):
+            assert_array_equal(result[1], expected[year][1])
+
+
+def test_unpickle_before_var_info(monkeypatch):
+    """
+    Check that a Records object unpickled in a process in which no Records
+    object has been made (as in a spawned worker process) allocates its
+    calculated variables when they are first used.
+    """
+    rec = Records(data=pd.read_csv(StringIO(SMALL_CSV)), weights=None)
+    pickled = pickle.dumps(rec)
+    for name in ['CALCULATED_VARS', 'CHANGING_CALCULATED_VARS',
+                 'INTEGER_VARS', 'COMPACT_DTYPES']:
+        monkeypatch.setattr(Records, name, None)
+    unpickled = pickle.loads(pickled)
+    assert_array_equal(unpickled.c00100, np.zeros(unpickled.array_length))
+
+
 def test_for_duplicate_names():
     varnames = set()
     for varname in Records.USABLE_READ_VARS:
@@ -803,6 +803,12 @@ def test_bootstrap_se_ci():
     assert abs(bsd['se'] / 23.02 - 1) < 0.02
     assert abs(bsd['cilo'] / 45.9 - 1) < 0.02
     assert abs(bsd['cihi'] / 135.4 - 1) < 0.03
+    # batched samples give the same results as the reference mode
+    for batch_size, max_workers in [(1, None), (64, None), (300, 3)]:
+        bsd2 = bootstrap_se_ci(data, 123456789, 1000, np.mean, alpha=0.025,
+                               batch_size=batch_size,
+                               max_workers=max_workers)
+        assert bsd2 == bsd
 
 
 def test_table_columns_labels():
@@ -11,6 +11,7 @@ import os
 import math
 import json
 import collections
+import concurrent.futures
 import pkg_resources
 import numpy as np
 import pandas as pd
@@ -1368,25 +1369,67 @@ def delete_file(filename):
         os.remove(filename)
 
 
-def bootstrap_se_ci(data, seed, num_samples, statistic, alpha):
+def bootstrap_se_ci(data, seed, num_samples, statistic, alpha,
+                    batch_size=None, max_workers=None):
     """
     Return bootstrap estimate of standard error of statistic and
     bootstrap estimate of 100*(1-2*alpha)% confidence interval for statistic
     in a dictionary along with specified seed and nun_samples (B) and alpha.
+    When batch_size is None (the reference mode), all num_samples bootstrap
+    samples are drawn at once, which needs memory for two arrays with
+    num_samples*len(data) elements.  Otherwise, the samples are drawn in
+    batches of at most batch_size samples and only the statistic values are
+    kept, so memory use is bounded by the batch size; the samples are drawn
+    from the same random number stream in the same order, so the results
+    are the same as in the reference mode.  When max_workers is greater
+    than one, the statistic is computed for up to max_workers batches at a
+    time by a pool of threads (the samples are still drawn in order).
     """
     assert isinstance(data, np.ndarray)
     assert isinstance(seed, int)
     assert isinstance(num_samples, int)
     assert callable(statistic)  # function that computes statistic from data
     assert isinstance(alpha, float)
+    assert batch_size is None or (isinstance(batch_size, int) and
+                                  batch_size > 0)
     bsest = dict()
     bsest['seed'] = seed
-    np.random.seed(seed)  # pylint: disable=no-member
     dlen = len(data)
-    idx = np.random.randint(low=0, high=dlen,   # pylint: disable=no-member
-                            size=(num_samples, dlen))
-    samples = data[idx]
-    stat = statistic(samples, axis=1)
+    if batch_size is None:
+        np.random.seed(seed)  # pylint: disable=no-member
+        idx = np.random.randint(low=0, high=dlen,  # pylint: disable=no-member
+                                size=(num_samples, dlen))
+        samples = data[idx]
+        stat = statistic(samples, axis=1)
+    else:
+        prng = np.random.RandomState(seed)  # pylint: disable=no-member
+
+        def draw_indices(size):
+            """
+            Return data indices of the next size bootstrap samples, which
+            are always drawn by the calling thread to keep their order.
+            """
+            return prng.randint(low=0, high=dlen, size=(size, dlen))
+
+        sizes = [min(batch_size, num_samples - start)
+                 for start in range(0, num_samples, batch_size)]
+        if max_workers is None or max_workers <= 1:
+            stats = [statistic(data[draw_indices(size)], axis=1)
+                     for size in sizes]
+        else:
+            stats = list()
+            pending = collections.deque()
+            with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+                for size in sizes:
+                    # limit the number of batches held in memory
+                    if len(pending) >= max_workers:
+                        stats.append(pending.popleft().result())
+                    idx = draw_indices(size)
+                    pending.append(pool.submit(
+                        lambda idx: statistic(data[idx], axis=1), idx
+                    ))
+                stats.extend(future.result() for future in pending)
+        stat = np.concatenate(stats)
     bsest['B'] = num_samples
     bsest['se'] = np.std(stat, ddof=1)
     stat = np.sort(stat)
@@ -1396,6 +1439,41 @@ def bootstrap_se_ci(data, seed, num_samples, statistic, alpha):
     return bsest
 
 
+def table_deviation(table1, table2):
+    """
+    Return Pandas DataFrame indexed by the numeric columns that are in both
+    the table1 and table2 DataFrames (which must have the same shape) with
+    a max_abs_dev column containing the maximum absolute difference between
+    corresponding cells and a max_rel_dev column containing the maximum of
+    those differences relative to the absolute value of the table1 cell
+    (ignoring cells that are zero in table1).  Used, for example, to check
+    that tables computed using compact Records storage are close enough to
+    the same tables computed using full-precision storage.
+    """
+    assert isinstance(table1, pd.DataFrame)
+    assert isinstance(table2, pd.DataFrame)
+    assert table1.shape == table2.shape
+    columns = [col for col in table1.columns
+               if col in table2.columns and
+               np.issubdtype(table1[col].dtype, np.number) and
+               np.issubdtype(table2[col].dtype, np.number)]
+    max_abs_dev = list()
+    max_rel_dev = list()
+    for col in columns:
+        val1 = table1[col].values.astype(np.float64)
+        val2 = table2[col].values.astype(np.float64)
+        absdev = np.abs(val2 - val1)
+        max_abs_dev.append(np.max(absdev) if absdev.size > 0 else 0.)
+        nonzero = val1 != 0.
+        if np.any(nonzero):
+            max_rel_dev.append(np.max(absdev[nonzero] /
+                                      np.abs(val1[nonzero])))
+        else:
+            max_rel_dev.append(0.)
+    return pd.DataFrame({'max_abs_dev': max_abs_dev,
+                         'max_rel_dev': max_rel_dev}, index=columns)
+
+
 def dec_graph_data(dist_table1, dist_table2, year,
                    include_zero_incomes, include_negative_incomes):
     """
@@ -0,0 +1,356 @@
+"""
+Translate calc-style functions (see functions.py) into functions that do
+the same calculations on whole NumPy arrays instead of on one filing unit
+at a time.  These vectorized functions are the numpy engine used by the
+iterate_jit decorator (see decorators.py) when numba is not available.
+"""
+# CODING-STYLE CHECKS:
+# pycodestyle vectorize.py
+# pylint --disable=locally-disabled vectorize.py
+
+import ast
+import inspect
+import textwrap
+import numpy as np
+
+
+# builtin and math functions replaced by their element-wise NumPy versions
+NUMPY_FUNCTIONS = {
+    'max': 'maximum',
+    'min': 'minimum',
+    'abs': 'absolute',
+    'round': 'round',
+    'float': 'float64',
+    'int': 'int64',
+    'ceil': 'ceil',
+    'floor': 'floor',
+    'sqrt': 'sqrt',
+    'exp': 'exp',
+    'log': 'log'
+}
+
+# name under which numpy is known in the translated functions
+NP_NAME = '_vec_np'
+
+# name under which the parameter_item function is known in the translated
+# functions, which use it for all subscripted expressions
+ITEM_NAME = '_vec_item'
+
+# cache of vectorized versions of calc-style functions
+_VECTORIZED = dict()
+
+
+def vectorize_function(func):
+    """
+    Return a version of the calc-style function func that takes NumPy
+    arrays (or scalars) as arguments and returns what func would return
+    for each array element.  Each if statement is executed for all array
+    elements, and the values assigned within each of its branches are
+    kept only for the elements satisfying the branch condition.  Other
+    calc-style functions called by func (decorated with jit) are also
+    vectorized.
+
+    Raises
+    ------
+    ValueError:
+        if func contains a statement that cannot be vectorized
+        (such as a loop or a return statement inside an if statement).
+    """
+    func = getattr(func, 'py_func', func)
+    if func in _VECTORIZED:
+        return _VECTORIZED[func]
+    source = textwrap.dedent(inspect.getsource(func))
+    fdef = ast.parse(source).body[0]
+    assert isinstance(fdef, ast.FunctionDef)
+    fglobals = dict(func.__globals__)
+    fglobals[NP_NAME] = np
+    fglobals[ITEM_NAME] = parameter_item
+    translator = _Translator(func.__name__, fglobals)
+    defined = set(arg.arg for arg in fdef.args.args)
+    fdef.body = translator.statements(fdef.body, None, defined)
+    fdef.decorator_list = []
+    module = ast.fix_missing_locations(ast.Module(body=[fdef],
+                                                  type_ignores=[]))
+    code = compile(module, '<vectorized {}>'.format(func.__name__), 'exec')
+    exec(code, fglobals)  # pylint: disable=exec-used
+    vfunc = fglobals[func.__name__]
+    _VECTORIZED[func] = vfunc
+    return vfunc
+
+
+def parameter_item(values, index):
+    """
+    Return the element of the parameter values array at the specified
+    index (a number or an array with one number for each record) for each
+    record.  A per-record parameter (see ScenarioPolicy) has an extra
+    first dimension with one set of parameter values for each record.
+    """
+    if np.ndim(values) < 2:
+        return values[index]
+    if np.ndim(index) == 0:
+        return values[:, index]
+    return values[np.arange(len(values)), index]
+
+
+def make_vectorized_apply_function(func, num_out_args):
+    """
+    Return an apply-style function that does the same thing as the
+    apply-style function returned by decorators.make_apply_function
+    (taking out arrays followed by in arrays and parameters, and filling
+    and returning the out arrays) using the vectorized version of func.
+    """
+    vfunc = vectorize_function(func)
+
+    def ap_func(*args):
+        """
+        ap_func function nested in make_vectorized_apply_function.
+        """
+        out_arrays = args[:num_out_args]
+        # values in elements excluded by an if statement condition may
+        # overflow or divide by zero without affecting the results
+        with np.errstate(all='ignore'):
+            results = vfunc(*args[num_out_args:])
+        if num_out_args == 1:
+            results = (results,)
+        for out_array, result in zip(out_arrays, results):
+            out_array[:] = result
+        if num_out_args == 1:
+            return out_arrays[0]
+        return out_arrays
+    return ap_func
+
+
+def _np_attribute(attr):
+    """
+    Return expression node for attribute attr of numpy.
+    """
+    return ast.Attribute(value=ast.Name(id=NP_NAME, ctx=ast.Load()),
+                         attr=attr, ctx=ast.Load())
+
+
+def _np_call(attr, args):
+    """
+    Return expression node calling numpy function attr with args.
+    """
+    return ast.Call(func=_np_attribute(attr), args=args, keywords=[])
+
+
+class _ExpressionTranslator(ast.NodeTransformer):
+    """
+    Replace the scalar-only operations in an expression with element-wise
+    NumPy operations and calls of calc-style functions with calls of their
+    vectorized versions.
+    """
+    def __init__(self, fname, fglobals):
+        self.fname = fname
+        self.fglobals = fglobals
+        self.vectorized_names = set()
+
+    def visit_Call(self, node):  # pylint: disable=invalid-name
+        """
+        Translate function calls.
+        """
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Name):
+            name = node.func.id
+            if name in self.vectorized_names:
+                return node
+            called = self.fglobals.get(name)
+            if hasattr(called, 'py_func'):
+                self.fglobals[name] = vectorize_function(called)
+                self.vectorized_names.add(name)
+                return node
+        elif (isinstance(node.func, ast.Attribute) and
+              isinstance(node.func.value, ast.Name) and
+              node.func.value.id == 'math'):
+            name = node.func.attr
+        else:
+            name = None
+        if name not in NUMPY_FUNCTIONS:
+            msg = '{}: cannot vectorize call {}'
+            raise ValueError(msg.format(self.fname, ast.unparse(node)))
+        func = NUMPY_FUNCTIONS[name]
+        if func in ('maximum', 'minimum') and len(node.args) > 2:
+            expr = node.args[0]
+            for arg in node.args[1:]:
+                expr = _np_call(func, [expr, arg])
+            return expr
+        return _np_call(func, node.args)
+
+    def visit_BoolOp(self, node):  # pylint: disable=invalid-name
+        """
+        Translate and/or expressions.
+        """
+        self.generic_visit(node)
+        if isinstance(node.op, ast.And):
+            func = 'logical_and'
+        else:
+            func = 'logical_or'
+        expr = node.values[0]
+        for value in node.values[1:]:
+            expr = _np_call(func, [expr, value])
+        return expr
+
+    def visit_UnaryOp(self, node):  # pylint: disable=invalid-name
+        """
+        Translate not expressions.
+        """
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return _np_call('logical_not', [node.operand])
+        return node
+
+    def visit_Compare(self, node):  # pylint: disable=invalid-name
+        """
+        Translate chained comparisons.
+        """
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        left = node.left
+        expr = None
+        for oper, right in zip(node.ops, node.comparators):
+            comp = ast.Compare(left=left, ops=[oper], comparators=[right])
+            expr = comp if expr is None else _np_call('logical_and',
+                                                      [expr, comp])
+            left = right
+        return expr
+
+    def visit_Subscript(self, node):  # pylint: disable=invalid-name
+        """
+        Translate subscripted parameters.
+        """
+        self.generic_visit(node)
+        if not isinstance(node.ctx, ast.Load):
+            msg = '{}: cannot vectorize subscript assignment {}'
+            raise ValueError(msg.format(self.fname, ast.unparse(node)))
+        return ast.Call(func=ast.Name(id=ITEM_NAME, ctx=ast.Load()),
+                        args=[node.value, node.slice], keywords=[])
+
+    def visit_IfExp(self, node):  # pylint: disable=invalid-name
+        """
+        Translate conditional expressions.
+        """
+        self.generic_visit(node)
+        return _np_call('where', [node.test, node.body, node.orelse])
+
+
+class _Translator(object):
+    """
+    Translate the statements of a calc-style function.
+    """
+    def __init__(self, fname, fglobals):
+        self.fname = fname
+        self.expressions = _ExpressionTranslator(fname, fglobals)
+        self.num_masks = 0
+
+    def expression(self, node):
+        """
+        Return translated expression node.
+        """
+        return self.expressions.visit(node)
+
+    def new_mask(self, value):
+        """
+        Return name of a new mask variable and the statement assigning
+        the specified value to it.
+        """
+        self.num_masks += 1
+        name = '_vec_mask{}'.format(self.num_masks)
+        stmt = ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())],
+                          value=value)
+        return name, stmt
+
+    @staticmethod
+    def assign(name, value, mask, defined):
+        """
+        Return statement assigning value to variable name for the elements
+        included in mask (all elements when mask is None).
+        """
+        if mask is not None and name in defined:
+            value = _np_call('where', [ast.Name(id=mask, ctx=ast.Load()),
+                                       value,
+                                       ast.Name(id=name, ctx=ast.Load())])
+        defined.add(name)
+        return ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())],
+                          value=value)
+
+    def statements(self, stmts, mask, defined):
+        """
+        Return list of translated statements executed for the elements
+        included in mask (all elements when mask is None), where defined
+        is the set of names of variables assigned before the statements.
+        """
+        translated = list()
+        for stmt in stmts:
+            if isinstance(stmt, ast.Pass):
+                continue
+            if (isinstance(stmt, ast.Expr) and
+                    isinstance(stmt.value, ast.Constant)):
+                continue  # docstring
+            if isinstance(stmt, ast.Assign):
+                translated.extend(self.assignment(stmt, mask, defined))
+            elif (isinstance(stmt, ast.AugAssign) and
+                  isinstance(stmt.target, ast.Name)):
+                name = stmt.target.id
+                value = ast.BinOp(left=ast.Name(id=name, ctx=ast.Load()),
+                                  op=stmt.op, right=stmt.value)
+                translated.append(self.assign(name, self.expression(value),
+                                              mask, defined))
+            elif isinstance(stmt, ast.If):
+                translated.extend(self.if_statement(stmt, mask, defined))
+            elif isinstance(stmt, ast.Return) and mask is None:
+                stmt.value = self.expression(stmt.value)
+                translated.append(stmt)
+            else:
+                msg = '{}: cannot vectorize statement {}'
+                raise ValueError(msg.format(self.fname, ast.unparse(stmt)))
+        return translated
+
+    def assignment(self, stmt, mask, defined):
+        """
+        Return list of translated statements for an assignment statement.
+        """
+        if len(stmt.targets) != 1:
+            msg = '{}: cannot vectorize multiple assignment {}'
+            raise ValueError(msg.format(self.fname, ast.unparse(stmt)))
+        target = stmt.targets[0]
+        value = self.expression(stmt.value)
+        if isinstance(target, ast.Name):
+            return [self.assign(target.id, value, mask, defined)]
+        if (isinstance(target, ast.Tuple) and
+                all(isinstance(elt, ast.Name) for elt in target.elts)):
+            tmp_name, tmp_stmt = self.new_mask(value)
+            stmts = [tmp_stmt]
+            for idx, elt in enumerate(target.elts):
+                item = ast.Subscript(value=ast.Name(id=tmp_name,
+                                                    ctx=ast.Load()),
+                                     slice=ast.Constant(value=idx),
+                                     ctx=ast.Load())
+                stmts.append(self.assign(elt.id, item, mask, defined))
+            return stmts
+        msg = '{}: cannot vectorize assignment {}'
+        raise ValueError(msg.format(self.fname, ast.unparse(stmt)))
+
+    def if_statement(self, stmt, mask, defined):
+        """
+        Return list of translated statements for an if statement, which
+        execute both branches, each for the elements satisfying its
+        condition.
+        """
+        cond_name, cond_stmt = self.new_mask(self.expression(stmt.test))
+        stmts = [cond_stmt]
+        cond = ast.Name(id=cond_name, ctx=ast.Load())
+        not_cond = _np_call('logical_not', [cond])
+        if mask is not None:
+            outer = ast.Name(id=mask, ctx=ast.Load())
+            cond = _np_call('logical_and', [outer, cond])
+            not_cond = _np_call('logical_and', [outer, not_cond])
+        body_mask, body_stmt = self.new_mask(cond)
+        stmts.append(body_stmt)
+        stmts.extend(self.statements(stmt.body, body_mask, defined))
+        if stmt.orelse:
+            else_mask, else_stmt = self.new_mask(not_cond)
+            stmts.append(else_stmt)
+            stmts.extend(self.statements(stmt.orelse, else_mask, defined))
+        return stmts
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+This file provides the functions that Calculator.run_years calls for each
+year of the distributional tables. Unlike the other code files, it is
+imported by main_executor.py instead of being executed in its namespace, so
+that the worker processes used when YEAR_WORKERS is set in main_executor.py
+can import these functions without running main_executor.py again.
+Everything these functions use besides their calculators is passed to them
+as arguments (using functools.partial), except the burden assumptions and
+the changes in corporate tax liabilities in assumptions.py.
+
+The code files that contain only assumptions and function definitions are
+executed in the namespace of this module, so that the functions they define
+can be used here and in the worker processes.
+"""
+import os
+import copy
+import concurrent.futures
+import functools
+import itertools
+import numpy as np
+import pandas as pd
+from taxcalc import *
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+for codefile in ['assumptions.py', 'distributional_code.py',
+                 'progressivity_code.py', 'business_distribution_code.py',
+                 'labor_model.py']:
+    exec(open(os.path.join(CODE_DIR, codefile)).read())
+
+
+def writeYearTables(calc1, calc2, rerankby, rescaleby, exclude, screen):
+    """
+    Writes the level and change tables for the current year of the
+    calculators (see indiv_tables_code.py).
+    """
+    year = calc1.current_year
+    masks = makeMasks(calc1)
+    tableL = levelTable_km(calc1, calc2, rerankby, rescaleby, exclude,
+                           screen, masks)
+    tableC = changeTable_km(calc1, calc2, rerankby, rescaleby, exclude,
+                            screen, masks)
+    tableL.to_csv('indiv_dist_tables/tableL' + str(year) + '.csv', index=False)
+    tableC.to_csv('indiv_dist_tables/tableC' + str(year) + '.csv', index=False)
+
+def writeFullDistTable(calc1, calc2, equity, dshare, wtshare, npsplit,
+                       slgsplit, rerankby, rescaleby, exclude, screen):
+    """
+    Writes the distributional table of fullDistComparison for the current
+    year of the calculators (see business_tables_code.py).
+    """
+    year = calc1.current_year
+    dtab = fullDistComparison(calc1, calc2, year,
+                              equity, dshare, wtshare,
+                              npsplit, slgsplit,
+                              rerankby, rescaleby, exclude, screen)
+    dtab.to_csv('business_dist_tables/mainfullstatic' + str(year) + '.csv',
+                index=False)
+
+def writeDynamicDistTable(calc1, calc2, calc2D, equity, dshare, wtshare,
+                          npsplit, slgsplit, rerankby, rescaleby, exclude,
+                          screen):
+    """
+    Writes the static and dynamic distributional table for the current year
+    of the calculators (see dynamic_distribution_code.py).
+    """
+    year = calc1.current_year
+    baseline = makeBaselineContext(calc1, year, rerankby, rescaleby, exclude,
+                                   screen, calculated=True)
+    allocator = makeBurdenAllocator(baseline["calc"],
+                                    advanceEquity(equity, year),
+                                    dshare, wtshare, baseline["mtr_ira"])
+    static_table1 = applyBtaxDistribution(calc1, calc2, year,
+                                          equity, dshare, wtshare,
+                                          npsplit, slgsplit,
+                                          rerankby, rescaleby, exclude, screen,
+                                          baseline, allocator)
+    dynamic_table1 = applyBtaxDistribution(calc1, calc2D, year,
+                                           equity, dshare, wtshare,
+                                           npsplit, slgsplit,
+                                           rerankby, rescaleby, exclude,
+                                           screen, baseline, allocator)
+    combined_table1 = static_table1.merge(dynamic_table1, on="Income group")
+    combined_table1.to_csv('dynamic_tables/dynamicdist' + str(year) + '.csv')
+
+def scenarioDistTable(labels, calc1, calc2, *calcsD, equity, dshare, wtshare,
+                      npsplit, slgsplit, rerankby, rescaleby, exclude,
+                      screen):
+    """
+    Returns the static distributional table for the current year of calc1
+    and calc2 combined with the dynamic table for each calculator in calcsD,
+    whose columns are labeled using the scenario label in labels (see
+    dynamicDistScenarios in dynamic_distribution_code.py).
+    """
+    year = calc1.current_year
+    baseline = makeBaselineContext(calc1, year, rerankby, rescaleby, exclude,
+                                   screen, calculated=True)
+    allocator = makeBurdenAllocator(baseline["calc"],
+                                    advanceEquity(equity, year),
+                                    dshare, wtshare, baseline["mtr_ira"])
+    table = applyBtaxDistribution(calc1, calc2, year,
+                                  equity, dshare, wtshare,
+                                  npsplit, slgsplit,
+                                  rerankby, rescaleby, exclude, screen,
+                                  baseline, allocator)
+    table.columns = ['Income group'] + ['Static, ' + col
+                                        for col in table.columns[1:]]
+    for label, calcD in zip(labels, calcsD):
+        dtable = applyBtaxDistribution(calc1, calcD, year,
+                                       equity, dshare, wtshare,
+                                       npsplit, slgsplit,
+                                       rerankby, rescaleby, exclude, screen,
+                                       baseline, allocator)
+        dtable.columns = ['Income group'] + [label + ', ' + col
+                                             for col in dtable.columns[1:]]
+        table = table.merge(dtable, on="Income group")
+    return table